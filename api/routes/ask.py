@@ -2,23 +2,59 @@
 Ask Route - Main RAG inference endpoint.
 
 Method: POST
-Body: AskRequest
-Work: Runs complete query pipeline
+Body: AskRequest (AskBatchRequest for /ask/batch)
+Work: Runs complete query pipeline (/ask/stream streams the answer as server-sent events)
+
+Each endpoint has a sync view (WSGI) and an async view over the
+QueryEngine's async methods (ASGI, selected by API_ASYNC_VIEWS in urls.py).
 """
+import os
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, AsyncIterator, Iterable, Optional, Tuple, Type, Union
 
-from django.http import JsonResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-import json
+from pydantic import BaseModel, ValidationError
+
+from .responses import json_response, sse_event
 
-from schema.ask_request import AskRequest
-from schema.ask_response import AskResponse
+from schema.ask_request import AskRequest, AskBatchRequest
+from schema.ask_response import AskResponse, AskBatchResponse
 from rag.query_engine import get_query_engine
 
 logger = logging.getLogger(__name__)
 
+# Route to the async views (set by backend/asgi.py). Under WSGI every async
+# view would get a fresh event loop, and with it a fresh LLM connection pool.
+API_ASYNC_VIEWS = os.getenv("API_ASYNC_VIEWS", "false").lower() in ("1", "true", "yes")
+
+
+def _sse_response(events: Union[Iterable[bytes], AsyncIterator[bytes]]) -> StreamingHttpResponse:
+    """Wrap encoded server-sent events in an unbuffered text/event-stream response."""
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Stop nginx from buffering the stream
+    return response
+
+
+def _parse_ask_request(request, schema: Type[BaseModel] = AskRequest) -> Tuple[Optional[Any], Optional[HttpResponse]]:
+    """Validate the request body as schema; returns (parsed, None) or (None, 400 response)."""
+    # Parse and validate request body in one pass (pydantic-core)
+    try:
+        return schema.model_validate_json(request.body), None
+    except ValidationError as e:
+        if any(err.get("type") == "json_invalid" for err in e.errors()):
+            return None, json_response(
+                {"error": "Invalid JSON in request body"},
+                status=400
+            )
+        return None, json_response(
+            {"error": f"Invalid request: {str(e)}"},
+            status=400
+        )
+
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -43,23 +79,9 @@ def ask(request):
         }
     """
     try:
-        # Parse request body
-        try:
-            body = json.loads(request.body)
-        except json.JSONDecodeError:
-            return JsonResponse(
-                {"error": "Invalid JSON in request body"},
-                status=400
-            )
-        
-        # Validate request
-        try:
-            ask_request = AskRequest(**body)
-        except Exception as e:
-            return JsonResponse(
-                {"error": f"Invalid request: {str(e)}"},
-                status=400
-            )
+        ask_request, error_response = _parse_ask_request(request)
+        if error_response is not None:
+            return error_response
         
         logger.info(f"Received query: {ask_request.query[:100]}...")
         
@@ -67,19 +89,53 @@ def ask(request):
         query_engine = get_query_engine()
         response = query_engine.answer_question(ask_request)
         
-        # Convert Pydantic model to dict for JSON response
-        response_dict = response.dict()
+        logger.info(
+            f"Query answered: {len(response.answer)} chars, "
+            f"{len(response.sources)} sources, {response.latency_ms:.0f}ms"
+        )
+        
+        # Pydantic model is serialized directly via model_dump_json
+        return json_response(response, status=200)
+        
+    except Exception as e:
+        logger.exception(f"Error in /ask endpoint: {e}")
+        return json_response(
+            {
+                "error": "Internal server error",
+                "message": str(e)
+            },
+            status=500
+        )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def aask(request):
+    """
+    Async variant of ask (same /api/v1/ask contract) for ASGI.
+    
+    Awaits QueryEngine.aanswer_question, so slow LLM calls do not hold a
+    worker thread while other requests wait.
+    """
+    try:
+        ask_request, error_response = _parse_ask_request(request)
+        if error_response is not None:
+            return error_response
+        
+        logger.info(f"Received query: {ask_request.query[:100]}...")
+        
+        response = await get_query_engine().aanswer_question(ask_request)
         
         logger.info(
             f"Query answered: {len(response.answer)} chars, "
             f"{len(response.sources)} sources, {response.latency_ms:.0f}ms"
         )
         
-        return JsonResponse(response_dict, status=200)
+        return json_response(response, status=200)
         
     except Exception as e:
         logger.exception(f"Error in /ask endpoint: {e}")
-        return JsonResponse(
+        return json_response(
             {
                 "error": "Internal server error",
                 "message": str(e)
@@ -87,3 +143,162 @@ def ask(request):
             status=500
         )
 
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def ask_stream(request):
+    """
+    Streaming RAG endpoint: /api/v1/ask/stream
+    
+    Same request body as /ask. Responds with text/event-stream: a
+    "sources" event first, then "token" events carrying pieces of the
+    answer as the LLM generates them, then "done" (or "error").
+    
+        event: sources
+        data: {"event": "sources", "sources": [...], "chunks_retrieved": 3}
+        
+        event: token
+        data: {"event": "token", "text": "The reading"}
+        
+        event: done
+        data: {"event": "done", "latency_ms": 1532.5, "model_used": "gpt-4"}
+    
+    This view streams under WSGI only: ASGI Django buffers a sync iterator
+    until it is exhausted, so ASGI deployments route to aask_stream.
+    """
+    try:
+        ask_request, error_response = _parse_ask_request(request)
+        if error_response is not None:
+            return error_response
+        
+        logger.info(f"Received streaming query: {ask_request.query[:100]}...")
+        
+        query_engine = get_query_engine()
+        events = (
+            sse_event(event["event"], event)
+            for event in query_engine.stream_answer(ask_request)
+        )
+        return _sse_response(events)
+        
+    except Exception as e:
+        logger.exception(f"Error in /ask/stream endpoint: {e}")
+        return json_response(
+            {
+                "error": "Internal server error",
+                "message": str(e)
+            },
+            status=500
+        )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def aask_stream(request):
+    """
+    Async variant of ask_stream (same /api/v1/ask/stream events) for ASGI.
+    
+    Streams QueryEngine.astream_answer through an async iterator, which
+    ASGI Django sends event by event.
+    """
+    try:
+        ask_request, error_response = _parse_ask_request(request)
+        if error_response is not None:
+            return error_response
+        
+        logger.info(f"Received streaming query: {ask_request.query[:100]}...")
+        
+        async def events() -> AsyncIterator[bytes]:
+            async for event in get_query_engine().astream_answer(ask_request):
+                yield sse_event(event["event"], event)
+        
+        return _sse_response(events())
+        
+    except Exception as e:
+        logger.exception(f"Error in /ask/stream endpoint: {e}")
+        return json_response(
+            {
+                "error": "Internal server error",
+                "message": str(e)
+            },
+            status=500
+        )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def ask_batch(request):
+    """
+    Batch RAG endpoint: /api/v1/ask/batch
+    
+    Answers up to 32 questions in one call: queries are embedded together
+    and retrieval and generation run concurrently.
+    
+    Request body:
+        {
+            "requests": [
+                {"query": "What is the reading club about?", "top_k": 3},
+                {"query": "When does the club meet?"}
+            ]
+        }
+    
+    Response:
+        {
+            "responses": [{"answer": "...", "sources": [...], ...}, ...],
+            "latency_ms": 2105.3
+        }
+    """
+    try:
+        batch_request, error_response = _parse_ask_request(request, AskBatchRequest)
+        if error_response is not None:
+            return error_response
+        
+        logger.info(f"Received batch of {len(batch_request.requests)} queries")
+        
+        start_time = time.time()
+        query_engine = get_query_engine()
+        responses = query_engine.answer_batch(batch_request.requests)
+        response = AskBatchResponse(responses=responses, latency_ms=(time.time() - start_time) * 1000)
+        
+        logger.info(f"Batch answered: {len(responses)} responses, {response.latency_ms:.0f}ms")
+        
+        return json_response(response, status=200)
+        
+    except Exception as e:
+        logger.exception(f"Error in /ask/batch endpoint: {e}")
+        return json_response(
+            {
+                "error": "Internal server error",
+                "message": str(e)
+            },
+            status=500
+        )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def aask_batch(request):
+    """Async variant of ask_batch (same /api/v1/ask/batch contract) for ASGI."""
+    try:
+        batch_request, error_response = _parse_ask_request(request, AskBatchRequest)
+        if error_response is not None:
+            return error_response
+        
+        logger.info(f"Received batch of {len(batch_request.requests)} queries")
+        
+        start_time = time.time()
+        responses = await get_query_engine().aanswer_batch(batch_request.requests)
+        response = AskBatchResponse(responses=responses, latency_ms=(time.time() - start_time) * 1000)
+        
+        logger.info(f"Batch answered: {len(responses)} responses, {response.latency_ms:.0f}ms")
+        
+        return json_response(response, status=200)
+        
+    except Exception as e:
+        logger.exception(f"Error in /ask/batch endpoint: {e}")
+        return json_response(
+            {
+                "error": "Internal server error",
+                "message": str(e)
+            },
+            status=500
+        )
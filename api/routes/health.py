@@ -5,16 +5,41 @@ Method: GET
 Purpose: Verify system state
 """
 import logging
+import time
 from typing import Dict, Any
 
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 
-from vectorstore.vector_store import get_vector_store
-from rag.retriever import Retriever
+from rag.retriever import get_retriever
+from embeddings.embedder import get_stats as get_embedding_stats
 
 logger = logging.getLogger(__name__)
 
+# Vector store stats are reused for a few seconds so frequent probes share one call
+STATS_TTL_SECONDS = 5.0
+_stats_cache: Dict[str, Any] = {"stats": None, "expires_at": 0.0}
+
+
+def _get_store_stats() -> Dict[str, Any]:
+    """
+    Return the vector store type and chunk count, cached for STATS_TTL_SECONDS.
+    
+    Uses the retriever's long-lived store and its cheap count(), so a probe
+    never opens a new store or fetches the collection (unlike get_stats()).
+    """
+    now = time.monotonic()
+    if _stats_cache["stats"] is not None and now < _stats_cache["expires_at"]:
+        return _stats_cache["stats"]
+    store = get_retriever().vector_store
+    stats = {
+        "store_type": type(store).__name__.lower().removesuffix("store") or "unknown",
+        "count": store.count(),
+    }
+    _stats_cache["stats"] = stats
+    _stats_cache["expires_at"] = now + STATS_TTL_SECONDS
+    return stats
+
 
 @require_http_methods(["GET"])
 def health(request):
@@ -26,6 +51,9 @@ def health(request):
     - Data has been indexed
     - System is ready to answer queries
     
+    Query params:
+        deep=1: also run a live retrieval test against the vector store
+    
     Response:
         {
             "status": "healthy",
@@ -44,10 +72,11 @@ def health(request):
             "errors": []
         }
         
+        deep = request.GET.get("deep") == "1"
+        
         # Check vector store
         try:
-            store = get_vector_store()
-            stats = store.get_stats()
+            stats = _get_store_stats()
             
             health_status["vector_store"] = {
                 "type": stats.get("store_type", "unknown"),
@@ -72,10 +101,18 @@ def health(request):
             health_status["errors"].append(f"Vector store error: {str(e)}")
             health_status["status"] = "unhealthy"
         
-        # Test retrieval (optional, can be slow)
-        if health_status["ready"]:
+        # Report embedding cache stats
+        try:
+            health_status["embeddings"] = get_embedding_stats()
+        except Exception as e:
+            logger.warning(f"Embedding stats unavailable: {e}")
+        
+        # Test retrieval (opt-in via ?deep=1, can be slow)
+        if not deep:
+            health_status["retrieval_test"] = "skipped"
+        elif health_status["ready"]:
             try:
-                retriever = Retriever()
+                retriever = get_retriever()
                 # Quick test with dummy query
                 test_embedding = [0.1] * 384  # Dummy vector
                 test_results = retriever.search(test_embedding, top_k=1)
@@ -0,0 +1,62 @@
+"""
+JSON helpers for API routes.
+
+Uses orjson for request parsing and response serialization when it is
+installed (faster, and serializes numpy arrays natively); falls back to
+the stdlib json module otherwise.
+"""
+import json
+from typing import Any
+
+from django.http import HttpResponse, JsonResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def parse_json(body: bytes) -> Any:
+    """
+    Parse a JSON request body.
+    
+    Raises:
+        json.JSONDecodeError: If the body is not valid JSON
+            (orjson.JSONDecodeError is a subclass)
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _default(obj: Any) -> Any:
+    """Serialize Pydantic models that orjson does not know about."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one server-sent event whose data line is JSON."""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        payload = json.dumps(data, default=_default).encode("utf-8")
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + payload + b"\n\n"
+
+
+def json_response(data: Any, status: int = 200) -> HttpResponse:
+    """Build a JSON HttpResponse from a dict (or Pydantic model)."""
+    if hasattr(data, "model_dump_json"):
+        # Pydantic v2 serializes straight to JSON without an intermediate dict
+        return HttpResponse(data.model_dump_json(), status=status, content_type="application/json")
+    if ORJSON_AVAILABLE:
+        return HttpResponse(
+            orjson.dumps(data, default=_default, option=orjson.OPT_SERIALIZE_NUMPY),
+            status=status,
+            content_type="application/json"
+        )
+    if hasattr(data, "model_dump"):
+        data = data.model_dump(mode="json")
+    return JsonResponse(data, status=status)
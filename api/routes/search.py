@@ -8,12 +8,13 @@ import logging
 import json
 from typing import Dict, Any
 
-from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 
+from .responses import parse_json, json_response
+
 from embeddings.embedder import embed_query
-from rag.retriever import Retriever
+from rag.retriever import get_retriever
 
 logger = logging.getLogger(__name__)
 
@@ -48,9 +49,9 @@ def search(request):
     try:
         # Parse request body
         try:
-            body = json.loads(request.body)
+            body = parse_json(request.body)
         except json.JSONDecodeError:
-            return JsonResponse(
+            return json_response(
                 {"error": "Invalid JSON in request body"},
                 status=400
             )
@@ -59,7 +60,7 @@ def search(request):
         top_k = body.get("top_k", 5)
         
         if not query:
-            return JsonResponse(
+            return json_response(
                 {"error": "Query is required"},
                 status=400
             )
@@ -73,13 +74,13 @@ def search(request):
         query_embedding = embed_query(query)
         
         if not query_embedding:
-            return JsonResponse(
+            return json_response(
                 {"error": "Failed to generate query embedding"},
                 status=500
             )
         
         # Retrieve chunks
-        retriever = Retriever()
+        retriever = get_retriever()
         retrieved_chunks = retriever.search(query_embedding, top_k=top_k)
         
         # Format results
@@ -100,11 +101,11 @@ def search(request):
         
         logger.info(f"Search completed: {len(results)} results")
         
-        return JsonResponse(response, status=200)
+        return json_response(response, status=200)
         
     except Exception as e:
         logger.exception(f"Error in /search endpoint: {e}")
-        return JsonResponse(
+        return json_response(
             {
                 "error": "Internal server error",
                 "message": str(e)
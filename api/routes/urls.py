@@ -4,8 +4,11 @@ URL configuration for API routes.
 from django.urls import path
 from . import ask, search, health
 
+# Async views under ASGI (see ask.API_ASYNC_VIEWS)
 urlpatterns = [
-    path('ask', ask.ask, name='ask'),
+    path('ask', ask.aask if ask.API_ASYNC_VIEWS else ask.ask, name='ask'),
+    path('ask/stream', ask.aask_stream if ask.API_ASYNC_VIEWS else ask.ask_stream, name='ask-stream'),
+    path('ask/batch', ask.aask_batch if ask.API_ASYNC_VIEWS else ask.ask_batch, name='ask-batch'),
     path('search', search.search, name='search'),
     path('health', health.health, name='health'),
 ]
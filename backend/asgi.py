@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Serve /ask, /ask/stream and /ask/batch with the async views (api/routes/ask.py);
+# /ask/stream only streams event by event through an async view under ASGI
+os.environ.setdefault('API_ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
+
+# Load the embedding model and vector store (and, with QUERY_ENGINE_WARMUP_LLM,
+# the LLM connection) in each server process before its first request
+from rag.query_engine import warmup_query_engine  # noqa: E402
+
+warmup_query_engine()
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Load the embedding model and vector store (and, with QUERY_ENGINE_WARMUP_LLM,
+# the LLM connection) in each server process before its first request
+from rag.query_engine import warmup_query_engine  # noqa: E402
+
+warmup_query_engine()
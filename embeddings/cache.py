@@ -0,0 +1,134 @@
+"""
+Embedding Cache - Persist chunk embeddings across ingestion runs.
+
+Purpose: Skip the embedding model for chunk texts embedded on an earlier run
+Input: Chunk text hashes (BLAKE2b-128 of the exact text)
+Output: float16 embedding vectors, or None on a miss
+Used by: embedder.py (embed_texts_cached)
+
+Vectors are stored in a local sqlite database keyed by (model, text hash),
+so switching embedding models never serves stale vectors.
+"""
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .model import EMBEDDING_MODEL, EMBEDDING_ONNX_INT8, USE_REMOTE
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "./data/embed_cache")
+EMBED_CACHE_DB = os.getenv("EMBED_CACHE_DB", str(Path(EMBED_CACHE_DIR) / "embeddings.sqlite"))
+_SQLITE_MAX_PARAMS = 500  # Hashes per SELECT ... IN (...)
+
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def model_key() -> str:
+    """Name of the embedding model in use, including variants that change the vectors."""
+    if USE_REMOTE:
+        return f"remote:{EMBEDDING_MODEL}"
+    return f"local:{EMBEDDING_MODEL}{':int8' if EMBEDDING_ONNX_INT8 else ''}"
+
+
+def text_hash(text: str) -> bytes:
+    """128-bit BLAKE2b digest of text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Open the cache database on first use (lock held)."""
+    global _conn
+    if _conn is None:
+        Path(EMBED_CACHE_DB).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(EMBED_CACHE_DB, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash BLOB NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash)) WITHOUT ROWID"
+        )
+        _conn = conn
+    return _conn
+
+
+def get_cached_many(hashes: Sequence[bytes], model: Optional[str] = None) -> Dict[bytes, np.ndarray]:
+    """
+    Look up cached embeddings.
+
+    Args:
+        hashes: Text hashes (see text_hash)
+        model: Model key (defaults to model_key())
+
+    Returns:
+        Dict of hash -> float16 vector for the hashes found
+    """
+    model = model or model_key()
+    found: Dict[bytes, np.ndarray] = {}
+    hashes = list(dict.fromkeys(hashes))
+    with _lock:
+        conn = _get_conn()
+        for i in range(0, len(hashes), _SQLITE_MAX_PARAMS):
+            part = hashes[i:i + _SQLITE_MAX_PARAMS]
+            rows = conn.execute(
+                f"SELECT text_hash, dim, vector FROM embeddings WHERE model = ? "
+                f"AND text_hash IN ({','.join('?' * len(part))})",
+                [model, *part]
+            ).fetchall()
+            for h, dim, blob in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float16, count=dim)
+    return found
+
+
+def put_cached_many(hashes: Sequence[bytes], vectors: np.ndarray, model: Optional[str] = None) -> None:
+    """
+    Store embeddings (one row of vectors per hash) as float16.
+
+    Args:
+        hashes: Text hashes (see text_hash)
+        vectors: (N, D) array, one row per hash
+        model: Model key (defaults to model_key())
+    """
+    if not len(hashes):
+        return
+    model = model or model_key()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float16)
+    dim = int(vectors.shape[1])
+    with _lock:
+        conn = _get_conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                ((model, h, dim, row.tobytes()) for h, row in zip(hashes, vectors))
+            )
+
+
+def get_cached(text_hash: bytes, model: Optional[str] = None) -> Optional[List[float]]:
+    """Cached embedding for one text hash, or None."""
+    vector = get_cached_many([text_hash], model).get(text_hash)
+    return None if vector is None else vector.astype(np.float32).tolist()
+
+
+def put_cached(text_hash: bytes, vector: Sequence[float], model: Optional[str] = None) -> None:
+    """Cache the embedding for one text hash."""
+    put_cached_many([text_hash], np.asarray(vector, dtype=np.float32).reshape(1, -1), model)
+
+
+def clear(model: Optional[str] = None) -> None:
+    """Delete cached embeddings for one model, or for all models if model is None."""
+    with _lock:
+        conn = _get_conn()
+        with conn:
+            if model is None:
+                conn.execute("DELETE FROM embeddings")
+            else:
+                conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
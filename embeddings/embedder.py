@@ -3,26 +3,40 @@ Embedder - Convert text chunks into embedding vectors.
 
 Purpose: Convert every chunk into embedding vector of size 768/1024/1536
 Input: "This is paragraph one..."
-Output: ChunkSchema object with embedding
+Output: ChunkRecord object with embedding
 Returns to: vector_store.py
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union
+from collections import OrderedDict
 import os
 import time
+import atexit
+import functools
+import json
+import hashlib
+import importlib.util
+import struct
 import logging
+import threading
 from pathlib import Path
 
-from .model import EmbeddingClient
+import numpy as np
+
+from .model import EmbeddingClient, l2_normalize
+from . import cache as embed_cache
+
+# Numba is heavy to import and only needed for fallback vectors, so it loads on first use
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
 
 try:
-    from schema.retrieval_schema import ChunkSchema
+    from schema.retrieval_schema import ChunkRecord
 except ImportError:
     # Fallback for different project structures
     try:
-        from ..schema.retrieval_schema import ChunkSchema
+        from ..schema.retrieval_schema import ChunkRecord
     except ImportError:
         # If schema is not available, use dict-based approach
-        ChunkSchema = None
+        ChunkRecord = None
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +45,10 @@ BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))  # Batch size for embe
 EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "./data/embed_cache")
 CACHE_EXPIRY_SECONDS = float(os.getenv("EMBED_CACHE_EXPIRY_SECONDS", str(7 * 24 * 60 * 60)))  # One week
 EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))  # Max cached query embeddings
+QUERY_CACHE_VECTORS = "query_cache.f16"  # Packed (n, dim) float16 vectors
+QUERY_CACHE_KEYS = "query_cache.keys.jsonl"  # Header line + one key per vector row
+STREAM_WINDOW = int(os.getenv("EMBED_STREAM_WINDOW", str(BATCH_SIZE * 8)))  # Texts per streamed block
 
 # Create cache directory
 try:
@@ -40,21 +58,178 @@ except Exception as e:
 
 # Initialize embedding client (singleton)
 _client = None
+_client_lock = threading.Lock()
 
 
 def _get_client() -> EmbeddingClient:
-    """Get or create embedding client singleton."""
+    """Get or create embedding client singleton (created once even under concurrent first calls)."""
     global _client
     if _client is None:
-        _client = EmbeddingClient()
+        with _client_lock:
+            if _client is None:
+                _client = EmbeddingClient()
     return _client
 
 
+def _stable_fingerprint(text: str) -> int:
+    """
+    Deterministic 64-bit fingerprint of a string.
+    
+    Unlike hash(), this is stable across processes (PYTHONHASHSEED), so it
+    is safe for persisted cache keys and reproducible fallback seeds.
+    """
+    return struct.unpack("<Q", hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest())[0]
+
+
+class _QueryEmbedCache:
+    """
+    Thread-safe TTL + LRU cache for query embeddings.
+
+    Keys are stable 64-bit fingerprints of the normalized (stripped, lowercased) query,
+    values are (inserted_at, vector) tuples. The cache is persisted to
+    EMBED_CACHE_DIR as a packed float16 file (written through np.memmap in
+    one flush) plus a JSON-lines key index, so a restarted process starts
+    warm with a single bulk read.
+    """
+
+    def __init__(self, max_size: int = EMBED_CACHE_SIZE, ttl_seconds: float = CACHE_EXPIRY_SECONDS,
+                 cache_dir: Optional[Path] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        cache_dir = Path(cache_dir or EMBED_CACHE_DIR)
+        self.vectors_path = cache_dir / QUERY_CACHE_VECTORS
+        self.keys_path = cache_dir / QUERY_CACHE_KEYS
+        self._data: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query: str) -> int:
+        """Build a cache key from the normalized query string."""
+        return _stable_fingerprint(query.strip().lower())
+
+    def get(self, key: int) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            inserted_at, vector = entry
+            # time.monotonic() does not survive restarts, so persisted entries use wall time
+            if time.time() - inserted_at > self.ttl_seconds:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return vector.tolist()
+
+    def put(self, key: int, vector: List[float]) -> None:
+        if not vector:
+            return
+        with self._lock:
+            self._data[key] = (time.time(), np.asarray(vector, dtype=np.float32))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def load(self) -> None:
+        """Load persisted entries, dropping any that have already expired."""
+        if not (self.keys_path.exists() and self.vectors_path.exists()):
+            return
+        try:
+            with self.keys_path.open("r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                rows = [json.loads(line) for line in f if line.strip()]
+            count, dim = int(header["count"]), int(header["dim"])
+            if not count or len(rows) != count:
+                return
+            mm = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(count, dim))
+            # One bulk copy so the file is not held open (and can be replaced on save)
+            vectors = np.array(mm, dtype=np.float32)
+            del mm
+            now = time.time()
+            with self._lock:
+                for row, vector in zip(rows, vectors):
+                    if now - row["ts"] <= self.ttl_seconds:
+                        self._data[int(row["key"])] = (row["ts"], vector)
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+            logger.info(f"Loaded {len(self._data)} cached query embeddings from {self.vectors_path}")
+        except Exception as e:
+            logger.warning(f"Could not load query embedding cache {self.vectors_path}: {e}")
+
+    def save(self) -> None:
+        """Persist current entries so the next process starts warm."""
+        with self._lock:
+            items = list(self._data.items())
+        if not items:
+            return
+        try:
+            dim = items[0][1][1].shape[0]
+            items = [item for item in items if item[1][1].shape[0] == dim]
+            tmp_vectors = self.vectors_path.with_suffix(".tmp")
+            mm = np.memmap(tmp_vectors, dtype=np.float16, mode="w+", shape=(len(items), dim))
+            mm[:] = np.stack([vector for _, (_, vector) in items])
+            mm.flush()
+            del mm
+            tmp_keys = self.keys_path.with_suffix(".tmp")
+            with tmp_keys.open("w", encoding="utf-8") as f:
+                f.write(json.dumps({"count": len(items), "dim": dim}) + "\n")
+                for key, (inserted_at, _) in items:
+                    f.write(json.dumps({"key": key, "ts": inserted_at}) + "\n")
+            os.replace(tmp_vectors, self.vectors_path)
+            os.replace(tmp_keys, self.keys_path)
+        except Exception as e:
+            logger.warning(f"Could not save query embedding cache {self.vectors_path}: {e}")
+
+
+_query_cache = _QueryEmbedCache()
+_query_cache.load()
+atexit.register(_query_cache.save)
+
+
+def preload_client() -> EmbeddingClient:
+    """
+    Create the embedding client (loading the local model) in this process.
+    
+    Call before a run starts so the model load (and any failure to load it)
+    happens up front rather than when the first batch reaches the embed
+    stage. Parse workers never embed, so they do not need the model.
+    """
+    return _get_client()
+
+
+def get_stats() -> Dict[str, Any]:
+    """Return query embedding cache statistics."""
+    return {"query_cache": _query_cache.get_stats()}
+
+
 def embed_query(query: str) -> List[float]:
     """
     Embed a single query string.
     
     Convenience method for embedding user queries during retrieval.
+    Repeated queries are served from an in-process LRU cache. Fallback
+    vectors (from a failed embedding call) are returned but not cached.
     
     Args:
         query: Query string to embed
@@ -66,63 +241,346 @@ def embed_query(query: str) -> List[float]:
         logger.warning("Empty query provided to embed_query")
         return []
     
-    embeddings = embed_texts([query.strip()])
-    if embeddings and len(embeddings) > 0:
-        return embeddings[0]
-    return []
+    key = _query_cache.make_key(query)
+    cached = _query_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    matrix, failed = embed_texts_np([query.strip()], return_failed=True)
+    embedding = matrix[0].tolist()
+    if not failed[0]:
+        _query_cache.put(key, embedding)
+    return embedding
 
 
-def embed_texts(texts: List[str]) -> List[List[float]]:
+def embed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    Embed several query strings with one batch call.
+    
+    Same results and cache as embed_query() per query, but all uncached
+    queries go to the model together.
+    
+    Args:
+        queries: Query strings to embed
+        
+    Returns:
+        One embedding per query, in order ([] for empty queries)
+    """
+    results: List[List[float]] = [[] for _ in queries]
+    missing: Dict[int, Tuple[str, List[int]]] = {}  # cache key -> (text, positions)
+    for i, query in enumerate(queries):
+        if not query or not query.strip():
+            continue
+        key = _query_cache.make_key(query)
+        cached = _query_cache.get(key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            missing.setdefault(key, (query.strip(), []))[1].append(i)
+    
+    if missing:
+        matrix, failed = embed_texts_np([text for text, _ in missing.values()], return_failed=True)
+        for (key, (_, positions)), embedding, row_failed in zip(missing.items(), matrix.tolist(), failed):
+            if not row_failed:
+                _query_cache.put(key, embedding)
+            for i in positions:
+                results[i] = embedding
+    return results
+
+
+def embed_texts(texts: List[str], dedupe: bool = True) -> List[List[float]]:
     """
     Embed a list of text strings into vectors.
     
     Args:
         texts: List of text strings to embed
+        dedupe: Embed each distinct text only once (default: True)
         
     Returns:
         List of embedding vectors (each is List[float])
     """
     if not texts:
         return []
+    return embed_texts_np(texts, dedupe=dedupe).tolist()
+
+
+def embed_texts_np(
+    texts: List[str],
+    dedupe: bool = True,
+    batch_size: Optional[int] = None,
+    return_failed: bool = False
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Embed a list of text strings into a 2D numpy array.
+    
+    Args:
+        texts: List of text strings to embed
+        dedupe: Embed each distinct text only once and scatter the
+            results back to every position (default: True)
+        batch_size: Texts per embedding request (defaults to EMBEDDING_BATCH_SIZE)
+        return_failed: Also return a bool mask of rows that hold fallback
+            vectors because their batch failed (callers must not cache those)
+        
+    Returns:
+        float32 array of shape (len(texts), dim), or (array, failed mask)
+        if return_failed
+    """
+    if not texts:
+        matrix = np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+        return (matrix, np.zeros(0, dtype=bool)) if return_failed else matrix
+    
+    matrix, failed = _embed_texts_masked(texts, dedupe, batch_size)
+    return (matrix, failed) if return_failed else matrix
+
+
+def _embed_texts_masked(
+    texts: List[str],
+    dedupe: bool,
+    batch_size: Optional[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """embed_texts_np body: (float32 matrix, failed-row mask)."""
+    if dedupe:
+        unique_map: Dict[str, int] = {}
+        unique_texts: List[str] = []
+        inv: List[int] = []
+        for t in texts:
+            if t not in unique_map:
+                unique_map[t] = len(unique_texts)
+                unique_texts.append(t)
+            inv.append(unique_map[t])
+        if len(unique_texts) < len(texts):
+            logger.debug(f"Deduplicated {len(texts)} texts to {len(unique_texts)} unique")
+            matrix, failed = _embed_batches(unique_texts, batch_size)
+            return matrix[inv], failed[inv]
     
-    results = []
+    return _embed_batches(texts, batch_size)
+
+
+def _length_order(texts: List[str]) -> np.ndarray:
+    """Indices that sort texts by length (stable), for batching similar lengths together."""
+    return np.argsort(np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)), kind="stable")
+
+
+def _embed_batches(texts: List[str], batch_size: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embed texts batch by batch, substituting fallback vectors for failed batches.
+    
+    Texts are batched in length order so each batch pads to a similar
+    length; rows are returned in the original order.
+    
+    Returns:
+        (float32 array of shape (len(texts), dim), bool mask of fallback rows)
+    """
+    batch_size = batch_size or BATCH_SIZE
+    blocks = []
+    failed_blocks = []
     n = len(texts)
+    order = _length_order(texts) if n > batch_size else None
+    if order is not None:
+        texts = [texts[i] for i in order]
+    batches = [texts[i:i + batch_size] for i in range(0, n, batch_size)]
+    
+    logger.debug(f"Embedding {n} texts in {len(batches)} batches of {batch_size}")
+    
+    try:
+        outputs = _get_client().embed_many_np(batches)
+    except Exception as e:
+        logger.exception(f"Embedding client error: {e}")
+        outputs = [e] * len(batches)
+    
+    for batch_num, (batch, vecs) in enumerate(zip(batches, outputs), 1):
+        if isinstance(vecs, Exception):
+            logger.error(f"Embedding API error for batch {batch_num}: {vecs}")
+            # Fallback: use hash-based embeddings
+            logger.warning("Using fallback hash-based embeddings for failed batch")
+            blocks.append(_fallback_vectors_batch(batch))
+            failed_blocks.append(np.ones(len(batch), dtype=bool))
+            continue
+        
+        # Validate embeddings
+        failed = np.zeros(len(batch), dtype=bool)
+        if vecs.shape[0] != len(batch):
+            logger.error(f"Embedding count mismatch: expected {len(batch)}, got {vecs.shape[0]}")
+            # Fallback for missing embeddings
+            dim = vecs.shape[1] if vecs.ndim == 2 else EMBEDDING_DIMENSION
+            missing = batch[vecs.shape[0]:]
+            vecs = vecs.reshape(-1, dim)[:len(batch)]
+            if missing:
+                vecs = np.vstack([vecs, _fallback_vectors_batch(missing, dim)])
+                failed[len(batch) - len(missing):] = True
+        
+        blocks.append(vecs)
+        failed_blocks.append(failed)
+    
+    matrix = np.vstack(blocks)
+    failed = np.concatenate(failed_blocks)
+    if order is None:
+        return matrix, failed
+    out = np.empty_like(matrix)
+    out[order] = matrix
+    out_failed = np.empty_like(failed)
+    out_failed[order] = failed
+    return out, out_failed
+
+
+def embed_texts_matrix(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    return_failed: bool = False
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Embed texts into a contiguous float16 matrix.
     
-    logger.debug(f"Embedding {n} texts in batches of {BATCH_SIZE}")
+    Storing embeddings as one (N, D) float16 array instead of nested
+    Python lists cuts memory roughly 14x and keeps vectors BLAS-ready.
     
-    for i in range(0, n, BATCH_SIZE):
-        batch = texts[i:i + BATCH_SIZE]
+    Args:
+        texts: List of text strings to embed
+        batch_size: Texts per embedding request (defaults to EMBEDDING_BATCH_SIZE)
+        return_failed: Also return the fallback-row mask (see embed_texts_np)
+        
+    Returns:
+        float16 array of shape (len(texts), dim), or (array, failed mask)
+        if return_failed
+    """
+    matrix, failed = embed_texts_np(texts, batch_size=batch_size, return_failed=True)
+    matrix = np.ascontiguousarray(matrix, dtype=np.float16)
+    return (matrix, failed) if return_failed else matrix
+
+
+def embed_texts_batched(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    return_failed: bool = False
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Embed a flat list of texts, letting a local model do the batching.
+    
+    Local models get the whole list in one encode(batch_size=...) call, so
+    sentence-transformers can length-sort and pad across all texts with no
+    per-batch Python work. Remote embeddings, or a failed local call, go
+    through the per-request batching of embed_texts_matrix instead. No
+    dedupe: callers pass unique texts.
+    
+    Args:
+        texts: List of text strings to embed
+        batch_size: Texts per forward pass / request (defaults to EMBEDDING_BATCH_SIZE)
+        return_failed: Also return the fallback-row mask (see embed_texts_np)
         
+    Returns:
+        float16 array of shape (len(texts), dim), or (array, failed mask)
+        if return_failed
+    """
+    if not texts:
+        matrix = np.empty((0, EMBEDDING_DIMENSION), dtype=np.float16)
+        return (matrix, np.zeros(0, dtype=bool)) if return_failed else matrix
+    
+    client = _get_client()
+    if not client.use_remote:
         try:
-            client = _get_client()
-            vecs = client.embed(batch)
-            
-            # Validate embeddings
-            if len(vecs) != len(batch):
-                logger.error(f"Embedding count mismatch: expected {len(batch)}, got {len(vecs)}")
-                # Fallback for missing embeddings
-                for text in batch[len(vecs):]:
-                    vecs.append(_fallback_vector(text))
-            
-            results.extend(vecs)
-            
+            vectors = client.embed_np(texts, batch_size=batch_size or BATCH_SIZE)
+            if vectors.shape[0] == len(texts):
+                matrix = np.ascontiguousarray(vectors, dtype=np.float16)
+                return (matrix, np.zeros(len(texts), dtype=bool)) if return_failed else matrix
+            logger.error(f"Embedding count mismatch: expected {len(texts)}, got {vectors.shape[0]}")
         except Exception as e:
-            logger.exception(f"Embedding API error for batch {i//BATCH_SIZE + 1}: {e}")
-            # Fallback: use hash-based embeddings
-            logger.warning("Using fallback hash-based embeddings for failed batch")
-            vecs = [_fallback_vector(t) for t in batch]
-            results.extend(vecs)
+            logger.exception(f"Local embedding failed, retrying per batch: {e}")
+    return embed_texts_matrix(texts, batch_size=batch_size, return_failed=return_failed)
+
+
+def embed_texts_cached(texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+    """
+    embed_texts_batched backed by the persistent embedding cache.
+    
+    Texts embedded on an earlier run (same model, same exact text) are read
+    from the cache; only the rest reach the model, and their vectors are
+    stored for next time. Fallback vectors from failed batches are not
+    cached. A cache error just means everything is embedded.
+    
+    Args:
+        texts: List of text strings to embed (unique)
+        batch_size: Texts per forward pass / request (defaults to EMBEDDING_BATCH_SIZE)
         
-        # Small delay to avoid overwhelming the API
-        if i + BATCH_SIZE < n:
-            time.sleep(0.01)
+    Returns:
+        float16 array of shape (len(texts), dim)
+    """
+    if not texts:
+        return np.empty((0, EMBEDDING_DIMENSION), dtype=np.float16)
     
-    return results
+    hashes = [embed_cache.text_hash(t) for t in texts]
+    try:
+        cached = embed_cache.get_cached_many(hashes)
+    except Exception as e:
+        logger.warning(f"Embedding cache unavailable: {e}")
+        return embed_texts_batched(texts, batch_size=batch_size)
+    
+    missing = [i for i, h in enumerate(hashes) if h not in cached]
+    if not missing:
+        return np.stack([cached[h] for h in hashes])
+    
+    vectors, failed = embed_texts_batched([texts[i] for i in missing], batch_size=batch_size, return_failed=True)
+    dim = vectors.shape[1]
+    fresh = ~failed
+    try:
+        embed_cache.put_cached_many([hashes[i] for i in np.flatnonzero(fresh)], vectors[fresh])
+    except Exception as e:
+        logger.warning(f"Could not write embedding cache: {e}")
+    if len(missing) == len(texts):
+        return vectors
+    
+    logger.debug(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} hits")
+    matrix = np.empty((len(texts), dim), dtype=np.float16)
+    matrix[missing] = vectors
+    hits = [i for i, h in enumerate(hashes) if h in cached]
+    matrix[hits] = np.stack([cached[hashes[i]] for i in hits])
+    return matrix
+
+
+def embed_texts_iter(texts: List[str], window: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Embed texts block by block, yielding results as each block completes.
+    
+    Keeps memory at O(window x D) instead of O(N x D) so callers can
+    write each block out before the next is computed.
+    
+    Args:
+        texts: List of text strings to embed
+        window: Texts per yielded block (defaults to EMBED_STREAM_WINDOW)
+        
+    Yields:
+        (start_index, float32 array of shape (block_len, dim))
+    """
+    window = window or STREAM_WINDOW
+    for start in range(0, len(texts), window):
+        yield start, embed_texts_np(texts[start:start + window])
 
 
-def embed_chunks(chunks: List[Dict[str, Any]]) -> List[Any]:
+def embed_chunks_iter(chunks: List[Dict[str, Any]], window: Optional[int] = None) -> Iterator[List[Any]]:
     """
-    Embed chunks and return ChunkSchema objects.
+    Streaming variant of embed_chunks: yields ChunkRecord lists per block.
+    
+    Args:
+        chunks: List of chunk dictionaries (see embed_chunks)
+        window: Chunks per yielded block (defaults to EMBED_STREAM_WINDOW)
+        
+    Yields:
+        List of ChunkRecord objects for each block
+    """
+    texts = [chunk.get("text", "") for chunk in chunks]
+    for start, vectors in embed_texts_iter(texts, window):
+        block = chunks[start:start + vectors.shape[0]]
+        yield _to_chunk_schemas(block, np.ascontiguousarray(vectors, dtype=np.float16))
+
+
+def embed_chunks(
+    chunks: List[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    cache: bool = False,
+    int8: bool = False,
+    post_table: Optional[Any] = None
+) -> List[Any]:
+    """
+    Embed chunks and return ChunkRecord objects.
     
     Args:
         chunks: List of chunk dictionaries with:
@@ -130,9 +588,21 @@ def embed_chunks(chunks: List[Dict[str, Any]]) -> List[Any]:
             - text: str
             - chunk_index: int
             - meta: dict (optional, will be enriched)
+            - _post_meta: dict (optional, shared post-level meta; used instead
+              of meta and combined with chunk_index)
+        batch_size: Texts per embedding request (defaults to EMBEDDING_BATCH_SIZE;
+            larger batches amortize per-call overhead on GPUs)
+        cache: Reuse and store vectors in the persistent embedding cache
+            (see embed_texts_cached)
+        int8: Return int8 embeddings with a per-vector scale
+            (embedding_int8/embedding_scale, a quarter of the float32 size)
+            instead of float32 row views, for holding many chunks in memory
+        post_table: PostMetaTable to collect post metadata in; chunks with
+            _post_meta then reference a row (post_ref) instead of carrying
+            their own meta. Pass the same table to insert_chunks.
             
     Returns:
-        List of ChunkSchema objects with embeddings
+        List of ChunkRecord objects with embeddings
     """
     if not chunks:
         return []
@@ -140,32 +610,117 @@ def embed_chunks(chunks: List[Dict[str, Any]]) -> List[Any]:
     # Extract texts for embedding
     texts = [chunk.get("text", "") for chunk in chunks]
     
-    # Get embeddings
-    embeddings = embed_texts(texts)
+    # Get embeddings as one float16 matrix
+    if cache:
+        matrix = embed_texts_cached(texts, batch_size=batch_size)
+    else:
+        matrix = embed_texts_matrix(texts, batch_size=batch_size)
     
-    if len(embeddings) != len(chunks):
+    if matrix.shape[0] != len(chunks):
         logger.error(
-            f"Embedding count mismatch: {len(embeddings)} embeddings for {len(chunks)} chunks"
+            f"Embedding count mismatch: {matrix.shape[0]} embeddings for {len(chunks)} chunks"
         )
-        # Pad with fallback if needed
-        while len(embeddings) < len(chunks):
-            idx = len(embeddings)
-            embeddings.append(_fallback_vector(chunks[idx].get("text", "")))
+        # Pad with fallback if needed (one vectorized call for all missing rows)
+        if matrix.shape[0] < len(chunks):
+            miss_texts = [chunk.get("text", "") for chunk in chunks[matrix.shape[0]:]]
+            miss_vecs = _fallback_vectors_batch(miss_texts, matrix.shape[1])
+            matrix = np.vstack([matrix, miss_vecs.astype(np.float16)])
+    
+    chunk_schemas = _to_chunk_schemas(chunks, matrix, int8=int8, post_table=post_table)
+    logger.info(f"Successfully embedded {len(chunk_schemas)}/{len(chunks)} chunks")
+    return chunk_schemas
+
+
+def chunk_meta(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the stored metadata dict for one chunk.
+    
+    Uses the shared post meta plus chunk_index when the chunk has
+    _post_meta, otherwise a copy of its meta. All embeddings are
+    unit-length, so the meta is marked normalized and retrieval can skip
+    renormalization.
+    """
+    post_meta = chunk.get("_post_meta")
+    if post_meta is not None:
+        meta = {**post_meta, "chunk_index": chunk.get("chunk_index", 0)}
+    else:
+        meta = chunk.get("meta", {}).copy()
+    meta["normalized"] = True
+    return meta
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric int8 quantization with one scale per row.
     
-    # Create ChunkSchema objects or dicts
+    Args:
+        matrix: (N, D) float array
+        
+    Returns:
+        (int8 array of shape (N, D), float32 scales of shape (N,)) with
+        matrix ~= q * scales[:, None]
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return q, scales
+
+
+def dequantize_int8(q: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Inverse of quantize_int8: float32 array of shape (N, D)."""
+    return q.astype(np.float32) * scales[:, None]
+
+
+def _to_chunk_schemas(
+    chunks: List[Dict[str, Any]],
+    matrix: np.ndarray,
+    int8: bool = False,
+    post_table: Optional[Any] = None
+) -> List[Any]:
+    """
+    Pair chunks with rows of an embedding matrix as ChunkRecord objects (or dicts).
+    
+    The matrix is converted to float32 once; each chunk's embedding is a
+    row view into it, so vectors stay one contiguous (N, D) buffer. With
+    int8, ChunkRecords get int8 bytes and a per-vector scale instead. With
+    a post_table, each post's shared _post_meta is added to it once and
+    its ChunkRecords hold the row (post_ref) instead of a meta dict.
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    q, scales = quantize_int8(matrix) if int8 and ChunkRecord else (None, None)
+    if not ChunkRecord:
+        post_table = None
+    post_refs: Dict[int, int] = {}  # id(_post_meta) -> row in post_table
+    
+    # Create ChunkRecord objects or dicts
     chunk_schemas = []
-    for chunk, embedding in zip(chunks, embeddings):
+    for i, (chunk, embedding) in enumerate(zip(chunks, matrix)):
         try:
-            # Ensure meta dict exists
-            meta = chunk.get("meta", {}).copy()
+            post_meta = chunk.get("_post_meta") if post_table is not None else None
+            if post_meta is not None:
+                post_ref = post_refs.get(id(post_meta))
+                if post_ref is None:
+                    # Same marker chunk_meta() adds
+                    post_ref = post_refs[id(post_meta)] = post_table.add({**post_meta, "normalized": True})
+                meta = {}
+            else:
+                post_ref = None
+                meta = chunk_meta(chunk)
             
-            # Create ChunkSchema if available, otherwise use dict
-            if ChunkSchema:
-                chunk_schema = ChunkSchema(
+            # Create ChunkRecord if available, otherwise use dict
+            if ChunkRecord:
+                if q is not None:
+                    vector = {"embedding_int8": q[i].tobytes(), "embedding_scale": float(scales[i])}
+                else:
+                    vector = {"embedding": embedding}
+                chunk_schema = ChunkRecord(
                     chunk_id=chunk.get("chunk_id", ""),
                     text=chunk.get("text", ""),
-                    embedding=embedding,
-                    meta=meta
+                    meta=meta,
+                    post_ref=post_ref,
+                    chunk_index=chunk.get("chunk_index", 0),
+                    **vector
                 )
             else:
                 # Fallback to dict format
@@ -182,23 +737,94 @@ def embed_chunks(chunks: List[Dict[str, Any]]) -> List[Any]:
             # Skip invalid chunks
             continue
     
-    logger.info(f"Successfully embedded {len(chunk_schemas)}/{len(chunks)} chunks")
     return chunk_schemas
 
 
-def _fallback_vector(text: str, dim: int = None) -> List[float]:
+# 64-bit LCG (Knuth MMIX constants) used to fill fallback vectors from a seed
+_LCG_MUL = np.uint64(6364136223846793005)
+_LCG_INC = np.uint64(1442695040888963407)
+_LCG_SHIFT = np.uint64(33)
+_LCG_MASK = np.uint64(0xFFFFFF)
+
+
+def _lcg_fill_numpy(seeds: np.ndarray, out: np.ndarray) -> None:
+    """Fill out[i, :] from seeds[i], vectorized across rows (uint64 math wraps)."""
+    s = seeds.copy()
+    for j in range(out.shape[1]):
+        s = s * _LCG_MUL + _LCG_INC
+        out[:, j] = ((s >> _LCG_SHIFT) & _LCG_MASK) / float(_LCG_MASK)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_lcg_fill():
+    """The fill kernel: Numba-compiled on first call when available, else _lcg_fill_numpy."""
+    if not NUMBA_AVAILABLE:
+        return _lcg_fill_numpy
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return _lcg_fill_numpy
+    
+    @njit(parallel=True, cache=True)
+    def _lcg_fill(seeds, out):
+        for i in prange(seeds.shape[0]):
+            s = seeds[i]
+            for j in range(out.shape[1]):
+                s = s * _LCG_MUL + _LCG_INC
+                out[i, j] = ((s >> _LCG_SHIFT) & _LCG_MASK) / 16777215.0
+    return _lcg_fill
+
+
+@functools.lru_cache(maxsize=4)
+def _fallback_maker(dim: int):
+    """
+    Return a fallback-vector generator specialized for one dimension.
+    
+    Only a couple of dimensions are ever used (384 local, 1536 remote), so
+    the per-dim setup is hoisted out of the call. The fill kernel is Numba
+    compiled when available, otherwise a vectorized numpy equivalent that
+    produces identical values.
+    """
+    fill = _get_lcg_fill()
+    
+    def make(seeds: np.ndarray) -> np.ndarray:
+        out = np.empty((seeds.shape[0], dim), dtype=np.float32)
+        fill(seeds, out)
+        return l2_normalize(out)
+    return make
+
+
+def _fallback_vectors_batch(texts: List[str], dim: int = None) -> np.ndarray:
+    """
+    Generate fallback embeddings for many texts in one kernel call.
+    
+    Args:
+        texts: Input texts
+        dim: Dimension of embedding (defaults to EMBEDDING_DIMENSION)
+        
+    Returns:
+        float32 array of shape (len(texts), dim)
+    """
+    dim = dim or EMBEDDING_DIMENSION
+    seeds = np.fromiter((_stable_fingerprint(t) for t in texts), dtype=np.uint64, count=len(texts))
+    return _fallback_maker(int(dim))(seeds)
+
+
+def _fallback_vector(text: str, dim: int = None) -> np.ndarray:
     """
     Generate a deterministic hash-based embedding as fallback.
 
     This is used when the embedding API fails. It's not semantically meaningful
-    but provides a consistent vector representation.
+    but provides a consistent vector representation. The generator is seeded
+    from a blake2b fingerprint, so the vector is stable across processes
+    (unlike hash()) and matches the batch path for the same text.
 
     Args:
         text: Input text
         dim: Dimension of embedding (defaults to EMBEDDING_DIMENSION)
 
     Returns:
-        List of floats representing a pseudo-embedding
+        float32 numpy array representing a pseudo-embedding
     """
     # Use the configured embedding dimension
     # IMPORTANT: Must match the dimension used when indexing the vector store
@@ -207,13 +833,4 @@ def _fallback_vector(text: str, dim: int = None) -> List[float]:
         # The vector store was indexed with 384 dimensions, so we must match that
         dim = EMBEDDING_DIMENSION
 
-    h = abs(hash(text)) % (10**9)
-
-    # Generate deterministic vector from hash
-    vector = []
-    for i in range(dim):
-        # Use hash bits to generate values
-        bit_shift = (h >> (i % 31)) % 100
-        vector.append(bit_shift / 100.0)
-
-    return vector
+    return _fallback_vectors_batch([text], dim)[0]
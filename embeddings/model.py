@@ -1,7 +1,21 @@
 # It loads your embedding ML model (local or remote) and exposes a simple embed() function.
 
 import os, logging
-from typing import List
+import importlib.util
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+# httpx loads only when remote embeddings are used (EmbeddingClient construction)
+HTTPX_AVAILABLE = importlib.util.find_spec("httpx") is not None
+httpx = None  # the module, once _import_httpx() has run
+
+__all__ = ["EmbeddingClient", "USE_REMOTE", "EMBEDDING_DIMENSION", "l2_normalize"]
+
 logger = logging.getLogger(__name__)
 
 USE_REMOTE = os.getenv("USE_REMOTE_EMBEDDING", "False") == "True"
@@ -12,6 +26,58 @@ AIPIPE_API_KEY = os.getenv("AIPIPE_API_KEY")
 if not os.getenv("USE_REMOTE_EMBEDDING") and AIPIPE_BASE_URL and AIPIPE_API_KEY:
     USE_REMOTE = True
 
+# Compile the local transformer with torch.compile (PyTorch 2.x) at load time
+EMBEDDING_TORCH_COMPILE = os.getenv("EMBEDDING_TORCH_COMPILE", "False") == "True"
+
+# Run the local model as a dynamically int8-quantized ONNX graph (requires optimum[onnxruntime])
+EMBEDDING_ONNX_INT8 = os.getenv("EMBEDDING_ONNX_INT8", "False") == "True"
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "./data/embed_cache")
+
+# Texts per forward pass of the local model
+LOCAL_ENCODE_BATCH = int(os.getenv("EMBED_LOCAL_BATCH_SIZE", "64"))
+
+# Worker threads for embedding batches in parallel (torch/ORT release the GIL)
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "4"))
+
+# Concurrent in-flight requests when embedding many batches remotely
+REMOTE_EMBED_CONCURRENCY = int(os.getenv("EMBED_REMOTE_CONCURRENCY", "8"))
+
+# Adaptive (AIMD) throttle for the remote API: no delay while healthy, doubling
+# backoff on 429/503, halved again after a run of successful requests
+THROTTLE_STATUSES = (429, 503)
+REMOTE_EMBED_MAX_RETRIES = int(os.getenv("EMBED_REMOTE_MAX_RETRIES", "3"))
+_rate_state = {"delay": 0.0, "successes": 0}
+_rate_lock = threading.Lock()
+
+def _current_delay() -> float:
+    with _rate_lock:
+        return _rate_state["delay"]
+
+def _record_throttled() -> float:
+    with _rate_lock:
+        _rate_state["delay"] = min(1.0, max(0.05, _rate_state["delay"] * 2))
+        _rate_state["successes"] = 0
+        return _rate_state["delay"]
+
+def _record_success() -> None:
+    with _rate_lock:
+        _rate_state["successes"] += 1
+        if _rate_state["delay"] and _rate_state["successes"] >= 10:
+            halved = _rate_state["delay"] * 0.5
+            _rate_state["delay"] = halved if halved >= 0.05 else 0.0
+            _rate_state["successes"] = 0
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None  # enables HTTP/2 in httpx
+
+
+def _import_httpx():
+    """Import httpx on first use and return it."""
+    global httpx
+    if httpx is None:
+        import httpx as _httpx
+        httpx = _httpx
+    return httpx
+
 # Default to local model - OpenAI model names won't work with SentenceTransformer
 # If you want to use OpenAI embeddings, set USE_REMOTE_EMBEDDING=True and configure AIPIPE
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")  # default local model
@@ -33,48 +99,206 @@ else:
     # Local SentenceTransformer models are typically 384 dimensions
     EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384"))
 
-# Local model (SentenceTransformers)
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place so cosine similarity reduces to a dot product."""
+    vectors /= np.linalg.norm(vectors, axis=-1, keepdims=True) + 1e-12
+    return vectors
+
+# Local model (SentenceTransformers), loaded once per process
 _local_model = None
+_local_model_lock = threading.Lock()
 def _init_local_model():
     global _local_model
     if _local_model is None:
-        try:
-            from sentence_transformers import SentenceTransformer
-        except Exception as e:
-            logger.error("sentence-transformers not installed: %s", e)
-            raise
-        _local_model = SentenceTransformer(EMBEDDING_MODEL)
+        # Concurrent first calls (embed worker threads) must not each load the model
+        with _local_model_lock:
+            if _local_model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except Exception as e:
+                    logger.error("sentence-transformers not installed: %s", e)
+                    raise
+                model = SentenceTransformer(EMBEDDING_MODEL)
+                if EMBEDDING_TORCH_COMPILE:
+                    _compile_local_model(model)
+                _local_model = model
     return _local_model
 
+def _compile_local_model(model) -> None:
+    """Fuse the transformer graph with torch.compile; keeps the eager model on failure."""
+    try:
+        import torch
+        major = int(torch.__version__.split(".")[0])
+        if major < 2:
+            logger.warning("torch.compile requires PyTorch 2.x (found %s); skipping", torch.__version__)
+            return
+        model[0].auto_model = torch.compile(model[0].auto_model, backend="inductor", dynamic=True)
+        logger.info("Compiled local embedding model with torch.compile")
+    except Exception as e:
+        logger.warning("torch.compile failed, using eager model: %s", e)
+
+class _OnnxInt8Encoder:
+    """
+    Dynamic int8 ONNX Runtime encoder reproducing SentenceTransformer's
+    mean pooling + L2 normalization. The quantized model is cached under
+    EMBED_CACHE_DIR so only the first process start pays for export.
+    """
+    QUANTIZED_FILE = "model_quantized.onnx"
+    MAX_SEQ_LENGTH = 256
+
+    def __init__(self, model_name: str, save_dir: Path):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        hf_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        if not (save_dir / self.QUANTIZED_FILE).exists():
+            logger.info("Quantizing %s to int8 ONNX at %s", hf_name, save_dir)
+            fp32_model = ORTModelForFeatureExtraction.from_pretrained(hf_name, export=True)
+            quantizer = ORTQuantizer.from_pretrained(fp32_model)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=True)
+            quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(hf_name).save_pretrained(save_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(save_dir, file_name=self.QUANTIZED_FILE)
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        # Length-sorted batches pad less, as in SentenceTransformer.encode
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        texts = [texts[i] for i in order]
+        blocks = []
+        for i in range(0, len(texts), batch_size):
+            enc = self.tokenizer(
+                texts[i:i + batch_size], padding=True, truncation=True,
+                max_length=self.MAX_SEQ_LENGTH, return_tensors="np",
+            )
+            hidden = np.asarray(self.model(**enc).last_hidden_state, dtype=np.float32)
+            mask = enc["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.linalg.norm(pooled, axis=1, keepdims=True) + 1e-12
+            blocks.append(pooled)
+        pooled = np.vstack(blocks)
+        out = np.empty_like(pooled)
+        out[order] = pooled
+        return out
+
+
+# None = not tried yet, False = unavailable (fall back to sentence-transformers)
+_onnx_encoder = None
+def _init_onnx_encoder():
+    global _onnx_encoder
+    if _onnx_encoder is None:
+        with _local_model_lock:
+            if _onnx_encoder is None:
+                try:
+                    _onnx_encoder = _OnnxInt8Encoder(EMBEDDING_MODEL, Path(EMBED_CACHE_DIR) / "minilm-int8")
+                    logger.info("Using int8 ONNX Runtime encoder for %s", EMBEDDING_MODEL)
+                except Exception as e:
+                    logger.warning("int8 ONNX encoder unavailable, using sentence-transformers: %s", e)
+                    _onnx_encoder = False
+    return _onnx_encoder or None
+
 class EmbeddingClient:
     def __init__(self):
         self.use_remote = USE_REMOTE and AIPIPE_BASE_URL and AIPIPE_API_KEY
         if self.use_remote:
-            import httpx
-            self._http = httpx.Client(timeout=30)
+            if not HTTPX_AVAILABLE:
+                raise ImportError("httpx is required for remote embeddings. Install with: pip install httpx")
+            _import_httpx()
+            # One pooled client and worker pool for the client's lifetime, so
+            # every batch reuses warm keep-alive (or HTTP/2) connections
+            limits = httpx.Limits(max_keepalive_connections=16, max_connections=32)
+            self._http = httpx.Client(http2=HTTP2_AVAILABLE, limits=limits, timeout=30)
+            self._remote_pool = ThreadPoolExecutor(
+                max_workers=REMOTE_EMBED_CONCURRENCY, thread_name_prefix="embed-remote"
+            )
             logger.info("EmbeddingClient: using remote AIPipe embeddings")
+        elif EMBEDDING_ONNX_INT8 and _init_onnx_encoder():
+            logger.info("EmbeddingClient: using local int8 ONNX model %s", EMBEDDING_MODEL)
         else:
             _init_local_model()
             logger.info("EmbeddingClient: using local sentence-transformers model %s", EMBEDDING_MODEL)
 
     def embed(self, texts: List[str]) -> List[List[float]]:
+        # single C-level conversion at the JSON/list boundary
+        return self.embed_np(texts).tolist()
+
+    def embed_np(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Embed texts into a 2D float32 array of shape (len(texts), dim).
+
+        batch_size sets the local model's forward-pass size (default
+        EMBED_LOCAL_BATCH_SIZE); remote requests send texts as one call.
+        """
         if self.use_remote:
-            return self._remote_embed(texts)
-        return self._local_embed(texts)
+            return l2_normalize(np.asarray(self._remote_embed(texts), dtype=np.float32))
+        return self._local_embed(texts, batch_size or LOCAL_ENCODE_BATCH)
 
-    def _local_embed(self, texts: List[str]) -> List[List[float]]:
+    def embed_many_np(self, batches: List[List[str]]) -> List[Union[np.ndarray, Exception]]:
+        """
+        Embed several batches, returning one array per batch in order.
+
+        Remote batches are issued concurrently (up to EMBED_REMOTE_CONCURRENCY)
+        on the client's long-lived worker pool and pooled HTTP client;
+        otherwise a small thread pool overlaps batches. A batch that fails is
+        returned as its exception so the caller can fall back per batch.
+        """
+        def _safe_embed(batch: List[str]) -> Union[np.ndarray, Exception]:
+            try:
+                return self.embed_np(batch)
+            except Exception as e:
+                return e
+
+        if self.use_remote and len(batches) > 1:
+            # map preserves batch order
+            return list(self._remote_pool.map(_safe_embed, batches))
+        if len(batches) == 1 or EMBED_WORKERS <= 1:
+            return [_safe_embed(b) for b in batches]
+        with ThreadPoolExecutor(max_workers=min(EMBED_WORKERS, len(batches))) as ex:
+            # map preserves batch order
+            return list(ex.map(_safe_embed, batches))
+
+    def _local_embed(self, texts: List[str], batch_size: int = LOCAL_ENCODE_BATCH) -> np.ndarray:
+        if EMBEDDING_ONNX_INT8:
+            encoder = _init_onnx_encoder()
+            if encoder is not None:
+                return encoder.encode(texts, batch_size=batch_size)
         model = _init_local_model()
-        vectors = model.encode(texts, show_progress_bar=False, convert_to_numpy=False)
-        # convert numpy arrays to lists if needed
-        return [v.tolist() if hasattr(v, "tolist") else list(v) for v in vectors]
+        vectors = model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return np.asarray(vectors, dtype=np.float32)
 
-    def _remote_embed(self, texts: List[str]) -> List[List[float]]:
+    def _remote_request(self, texts: List[str]):
         # OpenAI-compatible embeddings API via AIPipe
         url = f"{AIPIPE_BASE_URL.rstrip('/')}/embeddings"
         headers = {"Authorization": f"Bearer {AIPIPE_API_KEY}"}
         payload = {"model": EMBEDDING_MODEL, "input": texts}
-        resp = self._http.post(url, json=payload, headers=headers)
+        return url, payload, headers
+
+    def _remote_embed(self, texts: List[str]) -> List[List[float]]:
+        url, payload, headers = self._remote_request(texts)
+        for attempt in range(REMOTE_EMBED_MAX_RETRIES + 1):
+            delay = _current_delay()
+            if delay:
+                time.sleep(delay)
+            resp = self._http.post(url, json=payload, headers=headers)
+            if resp.status_code in THROTTLE_STATUSES and attempt < REMOTE_EMBED_MAX_RETRIES:
+                logger.warning("Embedding API throttled (%s), backing off %.2fs", resp.status_code, _record_throttled())
+                continue
+            break
         resp.raise_for_status()
+        _record_success()
         data = resp.json()
         embeddings = [item["embedding"] for item in data.get("data", [])]
         return embeddings
+
+    def close(self) -> None:
+        """Release the remote HTTP connections and worker threads (no-op for local models)."""
+        if self.use_remote:
+            self._remote_pool.shutdown(wait=False)
+            self._http.close()
@@ -1,6 +1,7 @@
 
 import argparse
 from .index_rebuilder import run_full_reindex
+from embeddings.embedder import preload_client
 import logging
 logging.basicConfig(level=logging.INFO)
 
@@ -10,6 +11,8 @@ def main():
     parser.add_argument("--min-posts", type=int, default=None)
     parser.add_argument("--force", action="store_true")
     args = parser.parse_args()
+    # Load the embedding model before the reindex starts rather than mid-run
+    preload_client()
     res = run_full_reindex(category=args.category, min_posts=args.min_posts, force=args.force)
     print("Reindex result:", res)
 
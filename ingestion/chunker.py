@@ -6,24 +6,60 @@ Input: A single cleaned text string
 Output: List of chunk dictionaries with text and chunk_index
 Returns to: embedder.py
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import itertools
 import os
+import threading
 import uuid
 import logging
 
 import re
 
+import numpy as np
+
 try:
     from nltk.tokenize import sent_tokenize
     NLTK_AVAILABLE = True
 except ImportError:
     NLTK_AVAILABLE = False
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # Configuration
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "400"))  # Approximate words per chunk
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "50"))  # Overlap in words
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", str(os.cpu_count() or 1)))  # Parallel chunking workers
+CHUNK_PARALLEL_MIN_DOCS = int(os.getenv("CHUNK_PARALLEL_MIN_DOCS", "32"))  # Below this, chunk serially
+
+# Sentence endings (. ! ?) followed by whitespace, kept as separate split items
+_SENTENCE_END_RE = re.compile(r'([.!?]+\s+)')
+
+
+def _reset_chunk_ids() -> None:
+    """Start a fresh chunk id sequence (per process, re-run in forked workers)."""
+    global _CHUNK_ID_PREFIX, _chunk_seq
+    _CHUNK_ID_PREFIX = f"{uuid.uuid4().hex}_"
+    _chunk_seq = itertools.count()
+
+
+_reset_chunk_ids()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_chunk_ids)
+
+
+def _next_chunk_id() -> str:
+    """Chunk id unique within the index: one random prefix per process plus a counter."""
+    return f"{_CHUNK_ID_PREFIX}{next(_chunk_seq)}"
 
 
 def _simple_sentence_tokenize(text: str) -> List[str]:
@@ -32,7 +68,7 @@ def _simple_sentence_tokenize(text: str) -> List[str]:
     Uses regex to split on sentence boundaries.
     """
     # Split on sentence endings (. ! ?) followed by space or newline
-    sentences = re.split(r'([.!?]+\s+)', text)
+    sentences = _SENTENCE_END_RE.split(text)
     # Recombine sentences with their punctuation
     result = []
     for i in range(0, len(sentences) - 1, 2):
@@ -44,13 +80,153 @@ def _simple_sentence_tokenize(text: str) -> List[str]:
     return [s.strip() for s in result if s.strip()]
 
 
-def split_into_chunks(
+@lru_cache(maxsize=None)
+def _get_punkt(lang: str = "english"):
+    """
+    Load the Punkt sentence tokenizer once per language.
+    
+    NLTK >= 3.8.2 rebuilds the tokenizer on every sent_tokenize() call,
+    so we keep our own instance and call .tokenize() directly.
+    """
+    try:
+        # NLTK >= 3.8.2 (punkt_tab resources)
+        from nltk.tokenize import PunktTokenizer
+        return PunktTokenizer(lang)
+    except ImportError:
+        import nltk
+        return nltk.data.load(f"tokenizers/punkt/{lang}.pickle")
+
+
+@lru_cache(maxsize=1024)
+def _cached_sent_tokenize(text: str) -> Tuple[str, ...]:
+    """Sentence-tokenize text, memoized for repeated posts and quoted replies."""
+    try:
+        return tuple(_get_punkt().tokenize(text))
+    except LookupError:
+        # Punkt resource layout differs from what we expect; let NLTK resolve it
+        return tuple(sent_tokenize(text))
+
+
+# Rows emitted by the packing kernel: (kind, lo, hi, carry_start)
+#   _PACK_SENTENCES: carry words + sentences[lo:hi]
+#   _PACK_CARRY:     carry words only (flushed before a long sentence)
+#   _PACK_LONG:      sentences[lo] split by words
+# Carry words are always the flat word range [carry_start, pref[lo]).
+_PACK_SENTENCES = 0
+_PACK_CARRY = 1
+_PACK_LONG = 2
+
+
+def _pack_py(counts: List[int], chunk_size: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    """Pure-Python packing kernel (bisect over prefix sums)."""
+    n = len(counts)
+    # pref[j] = number of words in sentences[:j]
+    pref = [0]
+    for c in counts:
+        pref.append(pref[-1] + c)
+    # Sentences that must be split by words always end the chunk before them
+    long_idx = [j for j, c in enumerate(counts) if c >= chunk_size]
+    
+    rows = []
+    lo = 0
+    carry = 0
+    while lo < n:
+        k = bisect_left(long_idx, lo)
+        stop = long_idx[k] if k < len(long_idx) else n
+        # Last sentence boundary that keeps carry + sentences[lo:hi] within chunk_size
+        hi = min(bisect_right(pref, carry + chunk_size) - 1, stop)
+        
+        if hi == lo:
+            if lo != stop:
+                # Overlap leaves no room for the next sentence; start it fresh
+                carry = pref[lo]
+                continue
+            if carry < pref[lo]:
+                rows.append((_PACK_CARRY, lo, lo, carry))
+            rows.append((_PACK_LONG, lo, lo + 1, pref[lo]))
+            lo += 1
+            carry = pref[lo]
+            continue
+        
+        rows.append((_PACK_SENTENCES, lo, hi, carry))
+        if hi == n or hi == stop or overlap <= 0:
+            carry = pref[hi]
+        else:
+            # Last `overlap` words of the chunk just emitted
+            carry = max(pref[hi] - overlap, carry)
+        lo = hi
+    return rows
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _pack(counts, chunk_size, overlap):
+        n = counts.shape[0]
+        pref = np.zeros(n + 1, dtype=np.int64)
+        for i in range(n):
+            pref[i + 1] = pref[i] + counts[i]
+        next_long = np.empty(n + 1, dtype=np.int64)
+        next_long[n] = n
+        for i in range(n - 1, -1, -1):
+            next_long[i] = i if counts[i] >= chunk_size else next_long[i + 1]
+        
+        # Each sentence yields at most one chunk row plus one carry flush
+        rows = np.empty((2 * n + 1, 4), dtype=np.int64)
+        r = 0
+        lo = 0
+        carry = 0
+        while lo < n:
+            stop = next_long[lo]
+            hi = np.searchsorted(pref, carry + chunk_size, side="right") - 1
+            if hi > stop:
+                hi = stop
+            
+            if hi == lo:
+                if lo != stop:
+                    carry = pref[lo]
+                    continue
+                if carry < pref[lo]:
+                    rows[r, 0] = 1
+                    rows[r, 1] = lo
+                    rows[r, 2] = lo
+                    rows[r, 3] = carry
+                    r += 1
+                rows[r, 0] = 2
+                rows[r, 1] = lo
+                rows[r, 2] = lo + 1
+                rows[r, 3] = pref[lo]
+                r += 1
+                lo += 1
+                carry = pref[lo]
+                continue
+            
+            rows[r, 0] = 0
+            rows[r, 1] = lo
+            rows[r, 2] = hi
+            rows[r, 3] = carry
+            r += 1
+            if hi == n or hi == stop or overlap <= 0:
+                carry = pref[hi]
+            elif pref[hi] - overlap > carry:
+                carry = pref[hi] - overlap
+            lo = hi
+        return rows[:r]
+
+
+def _pack_chunks(counts: List[int], chunk_size: int, overlap: int):
+    """Chunk boundaries for the given sentence word counts (Numba kernel when available)."""
+    if NUMBA_AVAILABLE:
+        return _pack(np.asarray(counts, dtype=np.int64), chunk_size, overlap).tolist()
+    return _pack_py(counts, chunk_size, overlap)
+
+
+def iter_chunks(
     text: str,
     chunk_size: int = None,
     overlap: int = None
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
     """
-    Split text into overlapping chunks.
+    Split text into overlapping chunks, yielding them one at a time.
     
     Strategy:
     1. Split text into sentences
@@ -62,20 +238,17 @@ def split_into_chunks(
         chunk_size: Target words per chunk (defaults to CHUNK_SIZE env var)
         overlap: Overlap in words between chunks (defaults to CHUNK_OVERLAP env var)
         
-    Returns:
-        List of chunk dictionaries:
-        [
-            {
-                "chunk_id": "uuid",
-                "chunk_index": 0,
-                "text": "chunk text...",
-                "meta": {}
-            },
-            ...
-        ]
+    Yields:
+        Chunk dictionaries:
+        {
+            "chunk_id": "<run-prefix>_<seq>",
+            "chunk_index": 0,
+            "text": "chunk text...",
+            "meta": {}
+        }
     """
     if not text or not text.strip():
-        return []
+        return
     
     chunk_size = chunk_size or CHUNK_SIZE
     overlap = overlap or CHUNK_OVERLAP
@@ -86,7 +259,7 @@ def split_into_chunks(
     # Tokenize into sentences
     if NLTK_AVAILABLE:
         try:
-            sentences = sent_tokenize(text)
+            sentences = list(_cached_sent_tokenize(text))
         except Exception as e:
             logger.warning(f"NLTK sent_tokenize failed: {e}, using fallback")
             sentences = _simple_sentence_tokenize(text)
@@ -94,110 +267,115 @@ def split_into_chunks(
         sentences = _simple_sentence_tokenize(text)
     
     if not sentences:
-        return []
+        return
+    
+    # Split every sentence into words once; counts drive the packing loop
+    tokens = [s.split() for s in sentences]
+    counts = [len(t) for t in tokens]
+    
+    # Flat word list; carried overlap words are a contiguous slice of it
+    words = [w for t in tokens for w in t]
+    pref = [0]
+    for c in counts:
+        pref.append(pref[-1] + c)
     
-    chunks = []
-    current_chunk_sentences = []
-    current_word_count = 0
     chunk_index = 0
     
     def create_chunk(sentences_list: List[str], idx: int) -> Dict[str, Any]:
         """Helper to create a chunk dictionary from sentences."""
-        if not sentences_list:
-            return None
-        
         chunk_text = " ".join(sentences_list)
         return {
-            "chunk_id": str(uuid.uuid4()),
+            "chunk_id": _next_chunk_id(),
             "chunk_index": idx,
             "text": chunk_text.strip(),
             "meta": {}
         }
     
-    i = 0
-    while i < len(sentences):
-        sentence = sentences[i]
-        sentence_word_count = len(sentence.split())
-        
-        # Handle case where a single sentence is longer than chunk_size
-        if sentence_word_count >= chunk_size:
-            # Flush current chunk if it has content
-            if current_chunk_sentences:
-                chunk = create_chunk(current_chunk_sentences, chunk_index)
-                if chunk:
-                    chunks.append(chunk)
-                    chunk_index += 1
-                current_chunk_sentences = []
-                current_word_count = 0
-            
+    for kind, lo, hi, carry in _pack_chunks(counts, chunk_size, overlap):
+        if kind == _PACK_LONG:
             # Split the long sentence by words
-            words = sentence.split()
-            word_idx = 0
-            while word_idx < len(words):
-                # Take chunk_size words
-                chunk_words = words[word_idx:word_idx + chunk_size]
-                chunk_text = " ".join(chunk_words)
-                
-                chunks.append({
-                    "chunk_id": str(uuid.uuid4()),
+            long_words = tokens[lo]
+            for word_idx in range(0, len(long_words), chunk_size - overlap):
+                yield {
+                    "chunk_id": _next_chunk_id(),
                     "chunk_index": chunk_index,
-                    "text": chunk_text,
+                    "text": " ".join(long_words[word_idx:word_idx + chunk_size]),
                     "meta": {}
-                })
+                }
                 chunk_index += 1
-                
-                # Move forward by (chunk_size - overlap) for overlap
-                word_idx += chunk_size - overlap
-                if word_idx >= len(words):
-                    break
-            
-            i += 1
             continue
         
-        # Check if adding this sentence would exceed chunk_size
-        if current_word_count + sentence_word_count <= chunk_size:
-            # Add sentence to current chunk
-            current_chunk_sentences.append(sentence)
-            current_word_count += sentence_word_count
-            i += 1
-        else:
-            # Flush current chunk
-            if current_chunk_sentences:
-                chunk = create_chunk(current_chunk_sentences, chunk_index)
-                if chunk:
-                    chunks.append(chunk)
-                    chunk_index += 1
-            
-            # Start new chunk with overlap
-            if overlap > 0 and current_chunk_sentences:
-                # Take last N words from previous chunk for overlap
-                overlap_words = []
-                for sent in reversed(current_chunk_sentences):
-                    words_in_sent = sent.split()
-                    remaining_overlap = overlap - len(overlap_words)
-                    if remaining_overlap <= 0:
-                        break
-                    
-                    # Take words from end of sentence
-                    take_count = min(len(words_in_sent), remaining_overlap)
-                    overlap_words = words_in_sent[-take_count:] + overlap_words
-                
-                if overlap_words:
-                    current_chunk_sentences = [" ".join(overlap_words)]
-                    current_word_count = len(overlap_words)
-                else:
-                    current_chunk_sentences = []
-                    current_word_count = 0
-            else:
-                current_chunk_sentences = []
-                current_word_count = 0
-    
-    # Flush remaining chunk
-    if current_chunk_sentences:
-        chunk = create_chunk(current_chunk_sentences, chunk_index)
-        if chunk:
-            chunks.append(chunk)
-    
-    logger.debug(f"Created {len(chunks)} chunks from text of {len(text)} characters")
+        parts = [" ".join(words[carry:pref[lo]])] if carry < pref[lo] else []
+        parts.extend(sentences[lo:hi])
+        yield create_chunk(parts, chunk_index)
+        chunk_index += 1
+
+
+def split_into_chunks(
+    text: str,
+    chunk_size: int = None,
+    overlap: int = None
+) -> List[Dict[str, Any]]:
+    """
+    Split text into overlapping chunks.
+    
+    List-returning wrapper around iter_chunks(); see it for the strategy.
+    
+    Args:
+        text: Input text to chunk
+        chunk_size: Target words per chunk (defaults to CHUNK_SIZE env var)
+        overlap: Overlap in words between chunks (defaults to CHUNK_OVERLAP env var)
+        
+    Returns:
+        List of chunk dictionaries
+    """
+    chunks = list(iter_chunks(text, chunk_size, overlap))
+    logger.debug(f"Created {len(chunks)} chunks from text of {len(text or '')} characters")
     return chunks
 
+
+def pool_context():
+    """
+    Multiprocessing context for CPU-bound worker pools.
+    
+    Fork is cheapest (workers inherit loaded modules copy-on-write) but is
+    only safe while this process is single-threaded; once other threads
+    exist (e.g. the ingestion stage threads) use forkserver instead.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods and threading.active_count() == 1:
+        return multiprocessing.get_context("fork")
+    if "forkserver" in methods:
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+def chunk_documents(texts: List[str]) -> List[List[Dict[str, Any]]]:
+    """
+    Split many documents into chunks in parallel.
+    
+    Uses a process pool (see pool_context for the start method) since NLTK
+    tokenization is CPU-bound; falls back to threads when NLTK is not
+    installed and to a plain loop for small inputs or if the pool fails.
+    
+    Args:
+        texts: Cleaned document texts
+        
+    Returns:
+        One list of chunk dictionaries per input text, in input order
+    """
+    workers = min(CHUNK_WORKERS, len(texts))
+    if workers <= 1 or len(texts) < CHUNK_PARALLEL_MIN_DOCS:
+        return [split_into_chunks(t) for t in texts]
+    
+    try:
+        if NLTK_AVAILABLE:
+            # About 4 tasks per worker: balances uneven documents, amortizes IPC
+            chunksize = max(1, len(texts) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as executor:
+                return list(executor.map(split_into_chunks, texts, chunksize=chunksize))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(split_into_chunks, texts))
+    except Exception as e:
+        logger.warning(f"Parallel chunking failed: {e}, chunking serially")
+        return [split_into_chunks(t) for t in texts]
@@ -26,6 +26,14 @@ SIGNATURE_PATTERNS = [
     r"^Subject:.*",
 ]
 
+# Pre-compiled patterns (compiled once at import)
+# All signature patterns as one alternation: a single match call per line
+_SIG_RE = re.compile("|".join(f"(?:{p})" for p in SIGNATURE_PATTERNS), re.IGNORECASE)
+_WS_RE = re.compile(r"[ \t]{2,}")
+# Deletes separator characters; a line that translates to "" was all separators
+_SEP_TABLE = str.maketrans("", "", "-*_")
+_DASH_RE = re.compile(r"[-_]{3,}")
+
 
 def remove_signatures(text: str) -> str:
     """
@@ -45,7 +53,8 @@ def remove_signatures(text: str) -> str:
     
     for line in lines:
         # Check if this line matches a signature pattern
-        if any(re.match(pat, line.strip(), re.IGNORECASE) for pat in SIGNATURE_PATTERNS):
+        stripped = line.strip()
+        if _SIG_RE.match(stripped):
             # Stop processing from this point (signature found)
             break
         cleaned_lines.append(line)
@@ -64,7 +73,7 @@ def collapse_whitespace(text: str) -> str:
         Text with collapsed whitespace
     """
     # Replace multiple spaces/tabs with single space
-    text = re.sub(r"[ \t]{2,}", " ", text)
+    text = _WS_RE.sub(" ", text)
     return text
 
 
@@ -72,13 +81,12 @@ def normalize_text(text: Optional[str]) -> str:
     """
     Main text normalization function.
     
-    Performs:
-    1. Strip leading/trailing whitespace
-    2. Remove signatures
-    3. Remove separator lines (---, ***, ___, etc.)
+    Performs in a single pass over the lines:
+    1. Trim each line and skip empty lines
+    2. Skip separator lines (---, ***, ___, etc.)
+    3. Stop at the first signature line
     4. Collapse whitespace
     5. Remove long sequences of dashes/underscores
-    6. Trim each line and remove empty lines
     
     Args:
         text: Raw text to normalize
@@ -89,38 +97,16 @@ def normalize_text(text: Optional[str]) -> str:
     if not text:
         return ""
     
-    # Step 1: Strip
-    normalized = text.strip()
-    
-    if not normalized:
-        return ""
-    
-    # Step 2: Remove signatures
-    normalized = remove_signatures(normalized)
-    
-    # Step 3: Remove separator lines (---, ***, ___, etc.)
-    lines = normalized.splitlines()
-    filtered_lines = []
-    for line in lines:
+    out = []
+    for line in text.splitlines():
         stripped = line.strip()
-        # Skip lines that are just dashes, asterisks, or underscores
-        if not re.match(r"^[\-\*_]{3,}$", stripped):
-            filtered_lines.append(line)
-    
-    normalized = "\n".join(filtered_lines)
-    
-    # Step 4: Collapse whitespace
-    normalized = collapse_whitespace(normalized)
-    
-    # Step 5: Remove long sequences of dashes/underscores
-    normalized = re.sub(r"[-_]{3,}", "", normalized)
-    
-    # Step 6: Trim each line and filter empty lines
-    final_lines = []
-    for line in normalized.splitlines():
-        trimmed = line.strip()
-        if trimmed:  # Only keep non-empty lines
-            final_lines.append(trimmed)
+        if not stripped or (len(stripped) >= 3 and not stripped.translate(_SEP_TABLE)):
+            continue
+        if _SIG_RE.match(stripped):
+            # Signature found, drop the rest of the text
+            break
+        cleaned = _DASH_RE.sub("", _WS_RE.sub(" ", stripped)).strip()
+        if cleaned:
+            out.append(cleaned)
     
-    return "\n".join(final_lines)
-
+    return "\n".join(out)
@@ -3,21 +3,45 @@ Fetch Discourse posts from API.
 
 Purpose: Download 500+ posts from Discourse API
 Input: None (uses DISCOURSE_URL, DISCOURSE_API_KEY from .env)
-Output: Python list of raw JSON posts
+Output: Python list of Post records
 Returns to: ingest_pipeline.py
 """
 import os
+import asyncio
+import hashlib
 import logging
 import time
 import json
+import dataclasses
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Iterator, AsyncIterator
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli  # noqa: F401  (lets requests/httpx decode "br" bodies)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 # Configuration from environment
 DISCOURSE_BASE_URL = os.getenv("DISCOURSE_BASE_URL")
+_BASE_URL = (DISCOURSE_BASE_URL or "").rstrip('/')
 DISCOURSE_API_KEY = os.getenv("DISCOURSE_API_KEY")
 DISCOURSE_API_USERNAME = os.getenv("DISCOURSE_API_USERNAME")
 DISCOURSE_CATEGORY = os.getenv("DISCOURSE_CATEGORY", "reading-club")
@@ -25,16 +49,168 @@ MIN_POSTS = int(os.getenv("DISCOURSE_MIN_POSTS", "500"))
 RATE_LIMIT = float(os.getenv("DISCOURSE_RATE_LIMIT_PER_SECOND", "2"))
 TIMEOUT = int(os.getenv("DISCOURSE_TIMEOUT_SECONDS", "30"))
 MAX_RETRIES = int(os.getenv("DISCOURSE_MAX_RETRIES", "3"))
+POOL_MAXSIZE = int(os.getenv("DISCOURSE_POOL_MAXSIZE", "20"))
+FETCH_CONCURRENCY = int(os.getenv("DISCOURSE_FETCH_CONCURRENCY", "8"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+KEEP_RAW_POST = os.getenv("KEEP_RAW_POST", "false").lower() in ("1", "true", "yes")
+PRETTY_DUMP = os.getenv("DISCOURSE_PRETTY_DUMP", "false").lower() in ("1", "true", "yes")
+# Only advertise brotli when we can decode it
+ACCEPT_ENCODING = "gzip, br" if BROTLI_AVAILABLE else "gzip"
+# Reuse fetched posts from disk for this long (dev loops); 0 disables the cache
+CACHE_TTL_HOURS = float(os.getenv("INGESTION_CACHE_TTL_HOURS", "0"))
+DISCOURSE_CACHE_DIR = os.getenv("DISCOURSE_CACHE_DIR", "./data/discourse_cache")
 
-# Optional: Save raw data for debugging
+# Optional: Save raw data for debugging (created on the first dump; point it
+# outside the source tree for test and dev runs)
 BASE_DIR = Path(__file__).resolve().parent.parent
-SAMPLE_DIR = BASE_DIR / "ingestion" / "sample_data"
-SAMPLE_DIR.mkdir(parents=True, exist_ok=True)
+SAMPLE_DIR = Path(os.getenv("DISCOURSE_SAMPLE_DIR", str(BASE_DIR / "ingestion" / "sample_data")))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Post:
+    """
+    One fetched Discourse post enriched with its topic's metadata.
+    
+    Slotted and immutable: downstream stages read fields by attribute
+    instead of dict lookups, and instances are smaller to hold and pickle.
+    """
+    id: int
+    topic_id: int
+    post_number: int = 0
+    content: str = ""
+    created_at: str = ""
+    updated_at: str = ""
+    username: str = ""
+    name: str = ""
+    title: str = ""
+    slug: str = ""
+    url: str = ""
+    raw_post: Optional[Dict[str, Any]] = None  # Only kept with KEEP_RAW_POST
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Post":
+        """
+        Build a Post from a dict (e.g. cached JSON), ignoring unknown keys.
+        
+        Raises:
+            ValueError: If the record has no id or topic_id
+        """
+        missing = [f for f in ("id", "topic_id") if data.get(f) in (None, "")]
+        if missing:
+            raise ValueError(f"Post record is missing {', '.join(missing)}")
+        return cls(**{k: v for k, v in data.items() if k in _POST_FIELDS})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict form (raw_post omitted when not kept)."""
+        data = {f: getattr(self, f) for f in _POST_FIELDS}
+        if data["raw_post"] is None:
+            del data["raw_post"]
+        return data
+
+
+_POST_FIELDS = tuple(f.name for f in dataclasses.fields(Post))
+
+
+def _url(endpoint: str) -> str:
+    return f"{_BASE_URL}/{endpoint.lstrip('/')}"
+
+
+def _parse_json(content: bytes) -> Dict[str, Any]:
+    """Decode a JSON response body, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _dump_posts(out_file: Path, posts: List[Post]) -> None:
+    """Write posts as JSON; compact orjson unless DISCOURSE_PRETTY_DUMP is set."""
+    records = [post.to_dict() for post in posts]
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if PRETTY_DUMP else 0)
+        with open(out_file, 'wb') as f:
+            f.write(orjson.dumps(records, option=option))
+    else:
+        with open(out_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2 if PRETTY_DUMP else None, ensure_ascii=False)
+
+
+def _cache_path(category_slug: str, min_posts: int) -> Path:
+    """Cache file for one (site, category, min_posts) fetch."""
+    key = hashlib.sha1(f"{_BASE_URL}|{category_slug}|{min_posts}".encode("utf-8")).hexdigest()
+    return Path(DISCOURSE_CACHE_DIR) / f"{key}.json"
+
+
+def _load_cached_posts(category_slug: str, min_posts: int) -> Optional[List[Post]]:
+    """Return cached posts if the cache is enabled and fresh, else None."""
+    if CACHE_TTL_HOURS <= 0:
+        return None
+    path = _cache_path(category_slug, min_posts)
+    try:
+        age = time.time() - path.stat().st_mtime
+    except OSError:
+        return None
+    if age > CACHE_TTL_HOURS * 3600:
+        return None
+    try:
+        posts = [Post.from_dict(record) for record in _parse_json(path.read_bytes())]
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable fetch cache {path}: {e}")
+        return None
+    logger.info(f"Loaded {len(posts)} cached posts from {path} ({age / 3600:.1f}h old)")
+    return posts
+
+
+def _save_cached_posts(category_slug: str, min_posts: int, posts: List[Post]) -> None:
+    """Write posts to the fetch cache (atomically) if the cache is enabled."""
+    if CACHE_TTL_HOURS <= 0 or not posts:
+        return
+    path = _cache_path(category_slug, min_posts)
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _dump_posts(tmp, posts)
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning(f"Failed to write fetch cache {path}: {e}")
+
+
+# Shared HTTP session (keep-alive connection pool); created on first use
+_session: Optional[requests.Session] = None
+
+
+def _get_session() -> requests.Session:
+    """
+    Return the module-wide requests.Session.
+    
+    Connections are reused across requests, and retries with exponential
+    backoff (honouring Retry-After on 429/503) are handled by urllib3.
+    """
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=1,
+            status_forcelist=list(RETRY_STATUSES),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Api-Key": DISCOURSE_API_KEY,
+            "Api-Username": DISCOURSE_API_USERNAME or "system",
+            "Accept-Encoding": ACCEPT_ENCODING,
+        })
+        _session = session
+    return _session
 
 
 def _get(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
-    Internal helper: Send GET request to Discourse API with retry logic.
+    Internal helper: Send GET request to Discourse API.
+    
+    Retries and backoff are handled by the session's urllib3 Retry policy.
     
     Args:
         endpoint: API endpoint (e.g., "/t/123.json")
@@ -44,93 +220,73 @@ def _get(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, An
         JSON response as dict
         
     Raises:
-        RuntimeError: If all retries fail
+        RuntimeError: If the request fails after all retries
     """
     if not DISCOURSE_BASE_URL or not DISCOURSE_API_KEY:
         raise ValueError("DISCOURSE_BASE_URL and DISCOURSE_API_KEY must be set")
     
-    headers = {
-        "Api-Key": DISCOURSE_API_KEY,
-        "Api-Username": DISCOURSE_API_USERNAME or "system",
-    }
-    
-    url = f"{DISCOURSE_BASE_URL.rstrip('/')}/{endpoint.lstrip('/')}"
-    
-    # Retry logic with exponential backoff
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            response = requests.get(
-                url=url,
-                headers=headers,
-                params=params,
-                timeout=TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 429:  # Rate limit
-                retry_after = int(response.headers.get("Retry-After", attempt * 2))
-                logger.warning(f"Rate limited. Waiting {retry_after}s before retry {attempt}/{MAX_RETRIES}")
-                time.sleep(retry_after)
-                continue
-            else:
-                logger.warning(
-                    f"Request failed with status {response.status_code}, "
-                    f"retrying ({attempt}/{MAX_RETRIES})..."
-                )
-                
-        except requests.exceptions.Timeout:
-            logger.warning(f"Request timeout, retrying ({attempt}/{MAX_RETRIES})...")
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Request error: {e}, retrying ({attempt}/{MAX_RETRIES})...")
-        
-        # Exponential backoff
-        time.sleep(min(1 + attempt, 10))
+    try:
+        response = _get_session().get(_url(endpoint), params=params, timeout=TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"Failed to fetch {endpoint} after {MAX_RETRIES} retries: {e}") from e
     
-    raise RuntimeError(f"Failed to fetch {endpoint} after {MAX_RETRIES} retries")
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to fetch {endpoint}: status {response.status_code}")
+    return _parse_json(response.content)
 
 
-def fetch_discourse_posts(
-    category: Optional[str] = None,
-    category_slug: Optional[str] = None,
-    min_posts: Optional[int] = None
-) -> List[Dict[str, Any]]:
-    """
-    Fetch posts from Discourse API.
-    
-    Returns a flat list of posts with enriched metadata:
-    [
-        {
-            "id": 123,
-            "topic_id": 12,
-            "content": "<p>Hello world...</p>",
-            "created_at": "...",
-            "url": "...",
-            "title": "...",
-            "slug": "...",
-            ...
-        },
-        ...
-    ]
+def _collect_topic_posts(
+    topic_json: Dict[str, Any],
+    topic_id: Any,
+    seen_post_ids: Set[int],
+    collected_posts: List[Post],
+    min_posts: int
+) -> None:
+    """Append enriched posts of one topic to collected_posts, stopping at min_posts."""
+    posts = topic_json.get("post_stream", {}).get("posts", [])
+    topic_title = topic_json.get("title", "")
+    topic_slug = topic_json.get("slug", "")
+    # Post URLs differ only by post number within a topic
+    topic_prefix = f"{_BASE_URL}/t/{topic_slug}/{topic_id}/"
     
-    Args:
-        category_slug: Category to fetch from (defaults to DISCOURSE_CATEGORY)
-        min_posts: Minimum number of posts to fetch (defaults to MIN_POSTS)
+    # Enrich each post with topic metadata
+    for post in posts:
+        post_id = post.get("id")
+        if not post_id or post_id in seen_post_ids:
+            continue
         
-    Returns:
-        List of post dictionaries
-    """
-    # Support both 'category' and 'category_slug' for compatibility
-    category_slug = category or category_slug or DISCOURSE_CATEGORY
-    min_posts = min_posts or MIN_POSTS
-    
-    logger.info(f"Starting fetch: category={category_slug}, min_posts={min_posts}")
-    
-    collected_posts: List[Dict[str, Any]] = []
-    seen_post_ids: set = set()
+        seen_post_ids.add(post_id)
+        
+        # Build enriched post record (raw post data kept only for debugging)
+        enriched_post = Post(
+            id=post_id,
+            topic_id=topic_id,
+            post_number=post.get("post_number", 0),
+            content=post.get("cooked") or post.get("raw") or "",
+            created_at=post.get("created_at", ""),
+            updated_at=post.get("updated_at", ""),
+            username=post.get("username", ""),
+            name=post.get("name", ""),
+            title=topic_title,
+            slug=topic_slug,
+            url=f"{topic_prefix}{post.get('post_number', 1)}",
+            raw_post=post if KEEP_RAW_POST else None,
+        )
+        
+        collected_posts.append(enriched_post)
+        
+        if len(collected_posts) >= min_posts:
+            break
+
+
+def _iter_discourse_sync(category_slug: str, min_posts: int) -> Iterator[Post]:
+    """Yield posts one topic at a time over the shared requests session."""
+    collected = 0
+    seen_post_ids: Set[int] = set()
+    seen_topic_ids: Set[int] = set()
     page = 0
     
-    while len(collected_posts) < min_posts:
+    while collected < min_posts:
         endpoint = f"/c/{category_slug}/l/latest.json"
         params = {"page": page}
         
@@ -145,8 +301,10 @@ def fetch_discourse_posts(
             # Fetch full details for each topic
             for topic_summary in topic_list:
                 topic_id = topic_summary.get("id")
-                if not topic_id:
+                if not topic_id or topic_id in seen_topic_ids:
+                    # Pinned/bumped topics can reappear on later pages
                     continue
+                seen_topic_ids.add(topic_id)
                 
                 try:
                     topic_json = _get(f"/t/{topic_id}.json")
@@ -154,42 +312,12 @@ def fetch_discourse_posts(
                     logger.exception(f"Error fetching topic {topic_id}: {e}")
                     continue
                 
-                posts = topic_json.get("post_stream", {}).get("posts", [])
-                topic_title = topic_json.get("title", "")
-                topic_slug = topic_json.get("slug", "")
-                base_url = DISCOURSE_BASE_URL.rstrip('/')
+                topic_posts: List[Post] = []
+                _collect_topic_posts(topic_json, topic_id, seen_post_ids, topic_posts, min_posts - collected)
+                collected += len(topic_posts)
+                yield from topic_posts
                 
-                # Enrich each post with topic metadata
-                for post in posts:
-                    post_id = post.get("id")
-                    if not post_id or str(post_id) in seen_post_ids:
-                        continue
-                    
-                    seen_post_ids.add(str(post_id))
-                    
-                    # Build enriched post record
-                    enriched_post = {
-                        "id": post_id,
-                        "topic_id": topic_id,
-                        "post_number": post.get("post_number", 0),
-                        "content": post.get("cooked") or post.get("raw") or "",
-                        "created_at": post.get("created_at", ""),
-                        "updated_at": post.get("updated_at", ""),
-                        "username": post.get("username", ""),
-                        "name": post.get("name", ""),
-                        "title": topic_title,
-                        "slug": topic_slug,
-                        "url": f"{base_url}/t/{topic_slug}/{topic_id}/{post.get('post_number', 1)}",
-                        # Keep raw post data for reference
-                        "raw_post": post
-                    }
-                    
-                    collected_posts.append(enriched_post)
-                    
-                    if len(collected_posts) >= min_posts:
-                        break
-                
-                if len(collected_posts) >= min_posts:
+                if collected >= min_posts:
                     break
             
             page += 1
@@ -200,16 +328,254 @@ def fetch_discourse_posts(
         except Exception as e:
             logger.exception(f"Error fetching page {page}: {e}")
             break
+
+
+class _AsyncRateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across all tasks."""
+    
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def _aget(
+    client: "httpx.AsyncClient",
+    limiter: _AsyncRateLimiter,
+    sem: asyncio.Semaphore,
+    endpoint: str,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Async GET with the same retry policy as the sync session (429/5xx, Retry-After)."""
+    for attempt in range(MAX_RETRIES + 1):
+        await limiter.wait()
+        try:
+            async with sem:
+                response = await client.get(_url(endpoint), params=params)
+        except httpx.HTTPError as e:
+            if attempt >= MAX_RETRIES:
+                raise RuntimeError(f"Failed to fetch {endpoint} after {MAX_RETRIES} retries: {e}") from e
+            await asyncio.sleep(2 ** attempt)
+            continue
+        
+        if response.status_code == 200:
+            return _parse_json(response.content)
+        if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+            logger.warning(f"Request to {endpoint} got {response.status_code}, retrying in {delay}s ({attempt + 1}/{MAX_RETRIES})")
+            await asyncio.sleep(delay)
+            continue
+        raise RuntimeError(f"Failed to fetch {endpoint}: status {response.status_code}")
+    raise RuntimeError(f"Failed to fetch {endpoint} after {MAX_RETRIES} retries")
+
+
+async def _iter_discourse_async(category_slug: str, min_posts: int) -> AsyncIterator[Post]:
+    """
+    Yield posts with the topics of each list page requested concurrently.
+    
+    Request starts are capped at RATE_LIMIT per second and at most
+    FETCH_CONCURRENCY requests are in flight, so latency overlaps without
+    exceeding the API rate.
+    """
+    if not DISCOURSE_BASE_URL or not DISCOURSE_API_KEY:
+        raise ValueError("DISCOURSE_BASE_URL and DISCOURSE_API_KEY must be set")
+    
+    headers = {
+        "Api-Key": DISCOURSE_API_KEY,
+        "Api-Username": DISCOURSE_API_USERNAME or "system",
+        "Accept-Encoding": ACCEPT_ENCODING,
+    }
+    limiter = _AsyncRateLimiter(RATE_LIMIT)
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    limits = httpx.Limits(max_keepalive_connections=FETCH_CONCURRENCY, max_connections=FETCH_CONCURRENCY)
+    
+    collected = 0
+    seen_post_ids: Set[int] = set()
+    seen_topic_ids: Set[int] = set()
+    page = 0
+    
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=TIMEOUT) as client:
+        while collected < min_posts:
+            endpoint = f"/c/{category_slug}/l/latest.json"
+            
+            try:
+                data = await _aget(client, limiter, sem, endpoint, params={"page": page})
+                topic_list = data.get("topic_list", {}).get("topics", [])
+                
+                if not topic_list:
+                    logger.info("No more topics found, stopping")
+                    break
+                
+                # Pinned/bumped topics can reappear on later pages
+                topic_ids = list(dict.fromkeys(
+                    t.get("id") for t in topic_list if t.get("id") and t.get("id") not in seen_topic_ids
+                ))
+                seen_topic_ids.update(topic_ids)
+                results = await asyncio.gather(
+                    *(_aget(client, limiter, sem, f"/t/{tid}.json") for tid in topic_ids),
+                    return_exceptions=True
+                )
+                
+                # Merge in list order so output matches the sequential fetch
+                page_posts: List[Post] = []
+                for topic_id, topic_json in zip(topic_ids, results):
+                    if isinstance(topic_json, Exception):
+                        logger.error(f"Error fetching topic {topic_id}: {topic_json}")
+                        continue
+                    
+                    _collect_topic_posts(topic_json, topic_id, seen_post_ids, page_posts, min_posts - collected)
+                    
+                    if collected + len(page_posts) >= min_posts:
+                        break
+                
+                collected += len(page_posts)
+                for post in page_posts:
+                    yield post
+                
+                page += 1
+                
+            except Exception as e:
+                logger.exception(f"Error fetching page {page}: {e}")
+                break
+
+
+async def _fetch_discourse_async(category_slug: str, min_posts: int) -> List[Post]:
+    """Collect _iter_discourse_async into a list."""
+    return [post async for post in _iter_discourse_async(category_slug, min_posts)]
+
+
+async def iter_discourse_posts(
+    category: Optional[str] = None,
+    category_slug: Optional[str] = None,
+    min_posts: Optional[int] = None
+) -> AsyncIterator[Post]:
+    """
+    Async generator variant of fetch_discourse_posts.
+    
+    Yields the same enriched posts page by page as they arrive, so callers
+    can start processing while later pages are still downloading. Unlike
+    fetch_discourse_posts it does not save a raw sample dump. Shares the
+    fetch cache (INGESTION_CACHE_TTL_HOURS); a stream is only cached once
+    it has been consumed to the end.
+    
+    Without httpx, the sequential requests fetch is advanced in a worker
+    thread so the event loop is not blocked.
+    
+    Args:
+        category_slug: Category to fetch from (defaults to DISCOURSE_CATEGORY)
+        min_posts: Minimum number of posts to fetch (defaults to MIN_POSTS)
+        
+    Yields:
+        Post records
+    """
+    category_slug = category or category_slug or DISCOURSE_CATEGORY
+    min_posts = min_posts or MIN_POSTS
+    
+    cached = _load_cached_posts(category_slug, min_posts)
+    if cached is not None:
+        for post in cached:
+            yield post
+        return
+    
+    logger.info(f"Starting streamed fetch: category={category_slug}, min_posts={min_posts}")
+    
+    fetched: List[Post] = []
+    if HTTPX_AVAILABLE:
+        async for post in _iter_discourse_async(category_slug, min_posts):
+            fetched.append(post)
+            yield post
+    else:
+        if not DISCOURSE_BASE_URL or not DISCOURSE_API_KEY:
+            raise ValueError("DISCOURSE_BASE_URL and DISCOURSE_API_KEY must be set")
+        posts = _iter_discourse_sync(category_slug, min_posts)
+        while True:
+            post = await asyncio.to_thread(next, posts, None)
+            if post is None:
+                break
+            fetched.append(post)
+            yield post
+    
+    _save_cached_posts(category_slug, min_posts, fetched)
+
+
+def fetch_discourse_posts(
+    category: Optional[str] = None,
+    category_slug: Optional[str] = None,
+    min_posts: Optional[int] = None
+) -> List[Post]:
+    """
+    Fetch posts from Discourse API.
+    
+    Returns a flat list of Post records with enriched metadata:
+    [
+        Post(
+            id=123,
+            topic_id=12,
+            content="<p>Hello world...</p>",
+            created_at="...",
+            url="...",
+            title="...",
+            slug="...",
+            ...
+        ),
+        ...
+    ]
+    (Post.to_dict() gives the plain dict form.)
+    
+    Topics are fetched concurrently with httpx when it is installed and no
+    event loop is already running; otherwise one at a time. With
+    INGESTION_CACHE_TTL_HOURS set, a fresh on-disk copy of an earlier fetch
+    with the same category and min_posts is returned instead.
+    
+    Args:
+        category_slug: Category to fetch from (defaults to DISCOURSE_CATEGORY)
+        min_posts: Minimum number of posts to fetch (defaults to MIN_POSTS)
+        
+    Returns:
+        List of Post records
+    """
+    # Support both 'category' and 'category_slug' for compatibility
+    category_slug = category or category_slug or DISCOURSE_CATEGORY
+    min_posts = min_posts or MIN_POSTS
+    
+    cached = _load_cached_posts(category_slug, min_posts)
+    if cached is not None:
+        return cached
+    
+    logger.info(f"Starting fetch: category={category_slug}, min_posts={min_posts}")
+    
+    use_async = HTTPX_AVAILABLE
+    if use_async:
+        try:
+            asyncio.get_running_loop()
+            use_async = False
+        except RuntimeError:
+            pass
+    
+    if use_async:
+        collected_posts = asyncio.run(_fetch_discourse_async(category_slug, min_posts))
+    else:
+        collected_posts = list(_iter_discourse_sync(category_slug, min_posts))
     
     # Optional: Save raw data for debugging
     if collected_posts:
         out_file = SAMPLE_DIR / f"discourse_raw_{int(time.time())}.json"
         try:
-            with open(out_file, 'w', encoding='utf-8') as f:
-                json.dump(collected_posts, f, indent=2, ensure_ascii=False)
+            SAMPLE_DIR.mkdir(parents=True, exist_ok=True)
+            _dump_posts(out_file, collected_posts)
             logger.info(f"Saved raw data to {out_file}")
         except Exception as e:
             logger.warning(f"Failed to save raw data: {e}")
+        _save_cached_posts(category_slug, min_posts, collected_posts)
     
     logger.info(
         f"Fetched {len(collected_posts)} posts from {category_slug} "
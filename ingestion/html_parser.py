@@ -6,15 +6,120 @@ Input: content="<p>Hello <b>World</b></p>"
 Output: "Hello World"
 Returns to: cleaner.py
 """
-from bs4 import BeautifulSoup
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import ftfy
 from cleantext import clean
 import re
 import logging
 
+try:
+    # Lexbor backend (selectolax >= 0.3); the older Modest HTMLParser is deprecated
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    # Only needed as the fallback backend when selectolax is missing
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+try:
+    # The two steps of clean()'s to_ascii pass that can change ASCII text
+    from cleantext.clean import fix_strange_quotes
+    from emoji import emojize
+    ASCII_CLEAN_FAST_PATH = True
+except ImportError:
+    ASCII_CLEAN_FAST_PATH = False
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# BeautifulSoup backend when selectolax is not installed
+_BS4_PARSER = "lxml" if LXML_AVAILABLE else "html.parser"
+
+# Non-content elements dropped before extracting text
+_STRIP_TAGS = ["img", "button", "form", "script", "style", "svg", "iframe", "nav", "header", "footer"]
+
+# Whitespace normalization patterns (compiled once at import)
+_MULTINL = re.compile(r"\n\s*\n+")
+_MULTISP = re.compile(r"[ \t]{2,}")
+
+
+def _parse_selectolax(cooked_html: str) -> Tuple[str, List[str], List[str]]:
+    """Extract (text, links, code_blocks) using the selectolax Lexbor C parser."""
+    tree = HTMLParser(cooked_html)
+    
+    # Extract code blocks first (before removing them)
+    code_blocks = []
+    for node in tree.css("pre, code"):
+        code_text = node.text(separator='\n')
+        if code_text.strip():
+            code_blocks.append(code_text)
+    tree.strip_tags(["pre", "code"])
+    
+    # Extract links before removing anchor tags
+    links = []
+    for a in tree.css("a"):
+        href = a.attributes.get("href")
+        if href:
+            links.append(href)
+        # Replace anchor with its text content
+        a.replace_with(a.text())
+    
+    # Remove non-content elements
+    tree.strip_tags(_STRIP_TAGS)
+    
+    root = tree.body or tree.root
+    text = root.text(separator='\n') if root is not None else ""
+    return text, links, code_blocks
+
+
+def _parse_bs4(cooked_html: str) -> Tuple[str, List[str], List[str]]:
+    """Extract (text, links, code_blocks) using BeautifulSoup (lxml if installed)."""
+    if not BS4_AVAILABLE:
+        raise ImportError("selectolax or beautifulsoup4 is required for HTML parsing")
+    soup = BeautifulSoup(cooked_html, _BS4_PARSER)
+    
+    # Single pass over all tags (materialized, since the tree is mutated)
+    code_blocks = []
+    links = []
+    dropped = []
+    for tag in soup.find_all(True):
+        if tag.decomposed:
+            # Inside a code block that was already removed
+            continue
+        name = tag.name
+        if name in ("pre", "code"):
+            # Extract code blocks (including nested ones) before removing them
+            for node in [tag] + tag.find_all(["pre", "code"]):
+                code_text = node.get_text('\n')
+                if code_text.strip():
+                    code_blocks.append(code_text)
+            tag.decompose()
+        elif name == "a":
+            href = tag.get("href")
+            if href:
+                links.append(href)
+            # Replace anchor with its text content
+            tag.replace_with(tag.get_text())
+        elif name in _STRIP_TAGS:
+            # Remove non-content elements after the walk so links inside them are still collected
+            dropped.append(tag)
+    
+    for tag in dropped:
+        tag.decompose()
+    
+    # Extract text with line breaks preserved
+    return soup.get_text(separator='\n'), links, code_blocks
+
 
 def html_to_text(cooked_html: str) -> Dict[str, Any]:
     """
@@ -39,57 +144,40 @@ def html_to_text(cooked_html: str) -> Dict[str, Any]:
         }
     
     try:
-        # Fix encoding issues
-        cooked_html = ftfy.fix_text(cooked_html)
-        
-        soup = BeautifulSoup(cooked_html, "html.parser")
-        
-        # Extract code blocks first (before removing them)
-        code_blocks = []
-        for pre in soup.find_all(['pre', 'code']):
-            code_text = pre.get_text('\n')
-            if code_text.strip():
-                code_blocks.append(code_text)
-        
-        # Remove code blocks from DOM
-        for tag in soup.find_all(["pre", "code"]):
-            tag.decompose()
-        
-        # Extract links before removing anchor tags
-        links = []
-        for a in soup.find_all("a"):
-            href = a.get("href")
-            if href:
-                # Resolve relative URLs
-                if href.startswith('/'):
-                    # Could prepend base URL here if needed
-                    pass
-                links.append(href)
-            # Replace anchor with its text content
-            a.replace_with(a.get_text())
-        
-        # Remove non-content elements
-        for tagname in ["img", "button", "form", "script", "style", "svg", "iframe", "nav", "header", "footer"]:
-            for tag in soup.find_all(tagname):
-                tag.decompose()
+        # Fix encoding issues (mojibake only occurs in non-ASCII input)
+        if not cooked_html.isascii():
+            cooked_html = ftfy.fix_text(cooked_html)
         
-        # Extract text with line breaks preserved
-        text = soup.get_text(separator='\n')
+        if SELECTOLAX_AVAILABLE:
+            text, links, code_blocks = _parse_selectolax(cooked_html)
+        else:
+            text, links, code_blocks = _parse_bs4(cooked_html)
         
         # Use cleantext library for additional cleaning (if available)
         # Note: cleantext API may vary by version, so we use basic cleaning
         try:
-            # Try with minimal parameters
-            text = clean(text)
+            # Unicode was already fixed by ftfy above, so skip clean()'s own ftfy pass
+            try:
+                if ASCII_CLEAN_FAST_PATH and text.isascii():
+                    # to_ascii runs emoji.demojize (a per-character Python
+                    # tokenizer, most of html_to_text's time) and unidecode,
+                    # both no-ops on ASCII; only its quote fix and emojize
+                    # can change ASCII text, so run just those
+                    text = clean(emojize(fix_strange_quotes(text), language="alias"), fix_unicode=False, to_ascii=False)
+                else:
+                    text = clean(text, fix_unicode=False)
+            except TypeError:
+                # Older cleantext without keyword options
+                text = clean(text)
         except Exception:
-            # If cleantext fails, just use the text as-is (already cleaned by BeautifulSoup)
+            # If cleantext fails, just use the text as-is (already cleaned by the HTML parser)
             pass
         
         # Normalize whitespace
         # Replace multiple newlines with double newline
-        text = re.sub(r"\n\s*\n+", "\n\n", text)
+        text = _MULTINL.sub("\n\n", text)
         # Replace multiple spaces/tabs with single space
-        text = re.sub(r"[ \t]{2,}", " ", text)
+        text = _MULTISP.sub(" ", text)
         # Remove leading/trailing whitespace
         text = text.strip()
         
@@ -46,13 +46,19 @@ def rebuild_index(
     logger.info("=" * 60)
     
     try:
+        # Open the store once; the pipeline reuses this instance and persists
+        # it once at the end
+        vector_store = get_vector_store(store_type=vector_store_type, bulk_mode=True)
+        
         # Step 1: Clear vector store if requested
         if force:
             logger.info("Clearing existing vector store...")
             try:
-                vector_store = get_vector_store(store_type=vector_store_type)
-                vector_store.clear()
-                logger.info("✓ Vector store cleared")
+                if vector_store.count() == 0:
+                    logger.info("✓ Vector store already empty")
+                else:
+                    vector_store.clear()
+                    logger.info("✓ Vector store cleared")
             except Exception as e:
                 logger.exception(f"Error clearing vector store: {e}")
                 # Continue anyway - ingestion will overwrite
@@ -64,7 +70,8 @@ def rebuild_index(
         result = run_ingestion_pipeline(
             category=category,
             min_posts=min_posts,
-            vector_store_type=vector_store_type
+            vector_store_type=vector_store_type,
+            vector_store=vector_store
         )
         
         # Add rebuild-specific metadata
@@ -7,28 +7,640 @@ Input: None (invoked manually or on server bootstrap)
 Output: Logs and final summary
 """
 import os
+import asyncio
+import hashlib
+import itertools
 import logging
+import re
 import time
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 
-from .fetch_discourse import fetch_discourse_posts
+import numpy as np
+
+try:
+    from tqdm.auto import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
+from .fetch_discourse import Post, iter_discourse_posts
 from .html_parser import html_to_text
 from .cleaner import normalize_text
-from .chunker import split_into_chunks
-from embeddings.embedder import embed_chunks
-from vectorstore.vector_store import get_vector_store, insert_chunks
+from .chunker import split_into_chunks, pool_context
+from embeddings.embedder import embed_texts_batched, embed_texts_cached, chunk_meta
+from vectorstore.vector_store import get_vector_store, insert_columns
 
 logger = logging.getLogger(__name__)
 
 # Configuration
-BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "100"))  # Process posts in batches
 MIN_POST_LENGTH = int(os.getenv("MIN_POST_LENGTH_WORDS", "8"))  # Skip posts shorter than this
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", str(os.cpu_count() or 1)))  # Parse/chunk processes
+PARALLEL_MIN_POSTS = int(os.getenv("INGESTION_PARALLEL_MIN_POSTS", "64"))  # Below this, parse serially
+POSTS_PER_TASK = 32  # Posts sent to a parse worker at a time
+# Embedding and inserts have different sweet spots: embed batches are bounded
+# by model/GPU memory, insert batches by the store's per-transaction cost
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))  # Chunks per embedding call
+INSERT_BATCH_SIZE = int(os.getenv("INSERT_BATCH_SIZE", "2000"))  # Chunks per vector store insert
+STAGE_QUEUE_SIZE = int(os.getenv("INGESTION_STAGE_QUEUE_SIZE", "4"))  # Batches buffered between stages
+FETCH_QUEUE_SIZE = int(os.getenv("INGESTION_FETCH_QUEUE_SIZE", "1000"))  # Downloaded posts buffered ahead of parsing
+DEDUPE_CHUNKS = os.getenv("INGESTION_DEDUPE_CHUNKS", "true").lower() in ("1", "true", "yes")  # Skip repeated chunk texts
+BULK_PRAGMAS = os.getenv("INGESTION_BULK_PRAGMAS", "true").lower() in ("1", "true", "yes")  # Relax store durability while inserting
+EMBED_CACHE = os.getenv("INGESTION_EMBED_CACHE", "true").lower() in ("1", "true", "yes")  # Reuse embeddings from earlier runs
+
+# Pipeline stages run on separate threads and share the stats dict
+_stats_lock = threading.Lock()
+_STAGE_POLL_SECONDS = 0.1  # How often a stage blocked on a queue checks for cancellation
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def _too_short(text: str, min_words: int) -> bool:
+    """
+    True if text has fewer than min_words words.
+    
+    Avoids text.split() on long posts: n words need at least 2n-1
+    characters, and the word scan stops after min_words matches.
+    """
+    if len(text) < 2 * min_words - 1:
+        return True
+    return sum(1 for _ in itertools.islice(_WORD_RE.finditer(text), min_words)) < min_words
+
+
+def _add_timing(timings: Dict[str, float], name: str, seconds: float) -> None:
+    """Accumulate seconds spent in one pipeline step."""
+    timings[name] = timings.get(name, 0.0) + seconds
+
+
+def _merge_timings(stats: Dict[str, Any], timings: Dict[str, float]) -> None:
+    """Add a batch of step timings into stats["timings"] (thread-safe)."""
+    with _stats_lock:
+        totals = stats.setdefault("timings", {})
+        for name, seconds in timings.items():
+            _add_timing(totals, name, seconds)
+
+
+def process_post(post: Union[Post, Dict[str, Any]], timings: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    Parse, clean and chunk one post (steps 2-4), returning enriched chunks.
+    
+    Top-level and free of shared state so it can run in worker processes.
+    Accepts a Post or a post dict in the same shape.
+    Returns an empty list for posts that are skipped (no content, too short).
+    If timings is given, seconds spent in HTML parsing, cleaning and
+    chunking are added to its "html", "clean" and "chunk" entries.
+    """
+    return process_posts([post], timings)[0]
+
+
+def process_posts(
+    posts: List[Union[Post, Dict[str, Any]]],
+    timings: Optional[Dict[str, float]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Parse, clean and chunk a batch of posts (steps 2-4) stage by stage.
+    
+    Each step runs over all posts still in play before the next one starts,
+    so per-post work is a list comprehension and each step is timed once
+    per batch. Same results as process_post() per post (one list of
+    enriched chunks per post, empty if skipped); raises on the first post
+    that fails.
+    """
+    posts = [Post.from_dict(post) if isinstance(post, dict) else post for post in posts]
+    results: List[List[Dict[str, Any]]] = [[] for _ in posts]
+    
+    # Skip messages are only formatted when debug logging is on
+    debug = logger.isEnabledFor(logging.DEBUG)
+    
+    def keep(live: List[int], texts: List[str], reason: str) -> Tuple[List[int], List[str]]:
+        kept = [(i, text) for i, text in zip(live, texts) if text and not _too_short(text, MIN_POST_LENGTH)]
+        if debug and len(kept) < len(live):
+            kept_ids = {i for i, _ in kept}
+            for i in live:
+                if i not in kept_ids:
+                    logger.debug(f"Skipping post {posts[i].id}: {reason}")
+        return [i for i, _ in kept], [text for _, text in kept]
+    
+    # Extracted text is never longer than ASCII markup (tags and entities
+    # only shrink), so posts that are short even as raw HTML skip parsing
+    live = []
+    for i, post in enumerate(posts):
+        html_content = post.content
+        if not html_content:
+            if debug:
+                logger.debug(f"Skipping post {post.id}: no content")
+        elif len(html_content) < 2 * MIN_POST_LENGTH - 1 and html_content.isascii():
+            if debug:
+                logger.debug(f"Skipping post {post.id}: too short")
+        else:
+            live.append(i)
+    
+    # Step 2: Parse HTML
+    t0 = time.perf_counter()
+    texts = [html_to_text(posts[i].content).get("text", "") for i in live]
+    if timings is not None:
+        _add_timing(timings, "html", time.perf_counter() - t0)
+    live, texts = keep(live, texts, "too short")
+    
+    # Step 3: Clean text
+    t0 = time.perf_counter()
+    cleaned = [normalize_text(text) for text in texts]
+    if timings is not None:
+        _add_timing(timings, "clean", time.perf_counter() - t0)
+    live, cleaned = keep(live, cleaned, "too short after cleaning")
+    
+    # Step 4: Chunk text
+    t0 = time.perf_counter()
+    chunk_lists = [split_into_chunks(text) for text in cleaned]
+    if timings is not None:
+        _add_timing(timings, "chunk", time.perf_counter() - t0)
+    
+    for i, chunks in zip(live, chunk_lists):
+        if not chunks:
+            if debug:
+                logger.debug(f"Skipping post {posts[i].id}: no chunks created")
+            continue
+        _enrich_chunks(posts[i], chunks)
+        results[i] = chunks
+    return results
+
+
+def process_posts_parallel(
+    posts: List[Union[Post, Dict[str, Any]]],
+    workers: Optional[int] = None
+) -> List[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """
+    process_posts spread over a process pool, for a batch known up front.
+    
+    Posts go to workers in about 4 slices per worker, enough to balance
+    uneven posts while keeping pickling/IPC per post small. Batches below
+    PARALLEL_MIN_POSTS, a single worker, or a pool that fails to start run
+    in this process. A post that fails does not fail its slice: the slice is
+    redone one post at a time (see _process_posts) and the post reports an
+    error message instead of chunks.
+    
+    Args:
+        posts: Posts or post dicts
+        workers: Worker processes (defaults to INGESTION_WORKERS)
+        
+    Returns:
+        One (enriched chunks, error message or None) pair per post, in input order
+    """
+    workers = min(workers or INGESTION_WORKERS, len(posts))
+    if workers <= 1 or len(posts) < PARALLEL_MIN_POSTS:
+        return _process_posts(posts)[0]
+    
+    size = max(1, len(posts) // (4 * workers))
+    slices = [posts[i:i + size] for i in range(0, len(posts), size)]
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context())
+    except Exception as e:
+        logger.warning(f"Could not start parse workers: {e}, processing posts serially")
+        return _process_posts(posts)[0]
+    with executor:
+        return [result for results, _ in executor.map(_process_posts, slices) for result in results]
+
+
+def _enrich_chunks(post: Post, chunks: List[Dict[str, Any]]) -> None:
+    """
+    Attach post metadata (and content ids with DEDUPE_CHUNKS) to a post's chunks.
+    
+    One meta dict per post, shared by all its chunks; chunk_meta() adds
+    chunk_index when building the final per-chunk meta.
+    """
+    post_meta = {
+        "post_id": str(post.id),
+        "topic_id": str(post.topic_id),
+        "url": post.url,
+        "title": post.title,
+        "timestamp": post.created_at,
+        "author": post.username or post.name,
+    }
+    for chunk in chunks:
+        chunk["_post_meta"] = post_meta
+        chunk["chunk_index"] = chunk.get("chunk_index", 0)
+        if DEDUPE_CHUNKS:
+            # Content-addressed id: repeats share an id, re-ingestion is idempotent
+            chunk["chunk_id"] = _content_id(chunk["text"])
+
+
+def _content_id(text: str) -> str:
+    """Stable chunk id from the chunk text (128-bit BLAKE2b, hex)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _process_post_safe(
+    post: Union[Post, Dict[str, Any]],
+    timings: Optional[Dict[str, float]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """process_post that reports failures as an error message instead of raising."""
+    try:
+        return process_post(post, timings), None
+    except Exception as e:
+        post_id = post.get("id") if isinstance(post, dict) else post.id
+        error_msg = f"Error processing post {post_id}: {e}"
+        logger.exception(error_msg)
+        return [], error_msg
+
+
+def _process_posts(
+    posts: List[Union[Post, Dict[str, Any]]]
+) -> Tuple[List[Tuple[List[Dict[str, Any]], Optional[str]]], Dict[str, float]]:
+    """
+    Run process_posts over a batch of posts (one task), returning per-post
+    (chunks, error) results and step timings.
+    
+    If any post fails, the batch is redone one post at a time with
+    _process_post_safe so only that post is reported as an error.
+    """
+    timings: Dict[str, float] = {}
+    try:
+        return [(chunks, None) for chunks in process_posts(posts, timings)], timings
+    except Exception:
+        timings = {}
+        return [_process_post_safe(post, timings) for post in posts], timings
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of up to size items from an iterable."""
+    it = iter(items)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_post_chunks(posts: Iterable[Post], stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Run process_post over a stream of posts, yielding enriched chunks in post order.
+    
+    Posts are processed in batches of POSTS_PER_TASK, spread over a process
+    pool (HTML parsing, regex cleaning and sentence tokenization are
+    CPU-bound pure Python) as they arrive, with a bounded number of tasks in
+    flight; streams shorter than
+    PARALLEL_MIN_POSTS, a single worker, or a pool failure fall back to
+    processing in this process.
+    
+    With DEDUPE_CHUNKS, chunks whose text (content id) was already yielded
+    are dropped before they reach embedding; quoted replies and boilerplate
+    repeat often in Discourse threads.
+    Updates stats["posts_processed"], stats["chunks_created"],
+    stats["chunks_duplicate"], stats["errors"] and the html/clean/chunk
+    entries of stats["timings"] (summed over workers) as it goes. Progress is
+    shown with a time-throttled tqdm bar on interactive terminals.
+    """
+    seen_ids = set()
+    # Redraws at most once a second; disable=None turns it off without a TTY
+    progress = tqdm(desc="ingest", unit="post", mininterval=1.0, disable=None) if TQDM_AVAILABLE else None
+    
+    def consume(results) -> Iterator[Dict[str, Any]]:
+        for chunks, error_msg in results:
+            if error_msg:
+                with _stats_lock:
+                    stats["errors"].append(error_msg)
+            elif chunks:
+                if DEDUPE_CHUNKS:
+                    unique = []
+                    for chunk in chunks:
+                        if chunk["chunk_id"] not in seen_ids:
+                            seen_ids.add(chunk["chunk_id"])
+                            unique.append(chunk)
+                else:
+                    unique = chunks
+                with _stats_lock:
+                    stats["posts_processed"] += 1
+                    stats["chunks_created"] += len(unique)
+                    stats["chunks_duplicate"] += len(chunks) - len(unique)
+                yield from unique
+            
+            if progress is not None:
+                progress.update()
+    
+    try:
+        yield from _process_stream(posts, consume, stats)
+    finally:
+        if progress is not None:
+            progress.close()
+
+
+def _process_stream(posts: Iterable[Post], consume, stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Feed posts to process_post (pooled or serial) and pass results through consume."""
+    posts = iter(posts)
+    head = list(itertools.islice(posts, PARALLEL_MIN_POSTS))
+    posts = itertools.chain(head, posts)
+    
+    if INGESTION_WORKERS > 1 and len(head) >= PARALLEL_MIN_POSTS:
+        try:
+            executor = ProcessPoolExecutor(max_workers=INGESTION_WORKERS, mp_context=pool_context())
+        except Exception as e:
+            logger.warning(f"Could not start parse workers: {e}, processing posts serially")
+        else:
+            with executor:
+                pending = deque()
+                for batch in _batched(posts, POSTS_PER_TASK):
+                    pending.append(executor.submit(_process_posts, batch))
+                    # Hand back finished tasks in order; cap the work in flight
+                    while pending and (pending[0].done() or len(pending) > 2 * INGESTION_WORKERS):
+                        results, timings = pending.popleft().result()
+                        _merge_timings(stats, timings)
+                        yield from consume(results)
+                while pending:
+                    results, timings = pending.popleft().result()
+                    _merge_timings(stats, timings)
+                    yield from consume(results)
+            return
+    
+    for batch in _batched(posts, POSTS_PER_TASK):
+        results, timings = _process_posts(batch)
+        _merge_timings(stats, timings)
+        yield from consume(results)
+
+
+def _to_columns(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Turn chunk dicts into a columnar batch: chunk_id, text and meta lists.
+    
+    Batches stay columnar from here to the vector store (embedding adds an
+    (N, D) "embedding" matrix), so no per-chunk schema objects are built.
+    """
+    return {
+        "chunk_id": [chunk["chunk_id"] for chunk in chunks],
+        "text": [chunk["text"] for chunk in chunks],
+        "meta": [chunk_meta(chunk) for chunk in chunks],
+    }
+
+
+def _slice_columns(columns: Dict[str, Any], start: int, stop: int) -> Dict[str, Any]:
+    """Rows start:stop of a columnar batch (the embedding slice is a view)."""
+    return {name: column[start:stop] for name, column in columns.items()}
+
+
+def _concat_columns(batches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Concatenate embedded columnar batches."""
+    if len(batches) == 1:
+        return batches[0]
+    columns = {name: list(itertools.chain.from_iterable(b[name] for b in batches)) for name in ("chunk_id", "text", "meta")}
+    columns["embedding"] = np.concatenate([b["embedding"] for b in batches])
+    return columns
+
+
+def _insert_embedded(vector_store: Any, columns: Dict[str, Any], stats: Dict[str, Any]) -> None:
+    """
+    Insert an embedded columnar batch into the vector store in INSERT_BATCH_SIZE slices.
+    
+    Updates stats["chunks_inserted"] and stats["errors"].
+    """
+    for i in range(0, len(columns["chunk_id"]), INSERT_BATCH_SIZE):
+        batch = _slice_columns(columns, i, i + INSERT_BATCH_SIZE)
+        try:
+            result = insert_columns(vector_store, batch["chunk_id"], batch["text"], batch["embedding"], batch["meta"])
+            inserted = result.get("inserted", 0)
+            with _stats_lock:
+                stats["chunks_inserted"] += inserted
+            logger.debug(f"  Inserted {inserted} chunks")
+        except Exception as e:
+            error_msg = f"Error inserting batch of {len(batch['chunk_id'])} chunks: {e}"
+            logger.exception(error_msg)
+            with _stats_lock:
+                stats["errors"].append(error_msg)
+
+
+def _tune_for_bulk(vector_store: Any) -> bool:
+    """
+    Relax the vector store's durability settings for the bulk insert.
+    
+    Only stores exposing tune_for_bulk_load() (Chroma's sqlite PRAGMAs) are
+    affected; FAISS has nothing to tune. Returns True if settings changed.
+    """
+    if not BULK_PRAGMAS:
+        return False
+    tune = getattr(vector_store, "tune_for_bulk_load", None)
+    if tune is None:
+        return False
+    try:
+        return bool(tune())
+    except Exception as e:
+        logger.warning(f"Could not tune vector store for bulk load: {e}")
+        return False
+
+
+def _restore_after_bulk(vector_store: Any) -> None:
+    """Undo _tune_for_bulk()."""
+    try:
+        vector_store.restore_after_bulk_load()
+    except Exception as e:
+        logger.warning(f"Could not restore vector store settings: {e}")
+
+
+def _stream_posts(category: Optional[str], min_posts: Optional[int], stats: Dict[str, Any]) -> Iterator[Post]:
+    """
+    Yield Discourse posts as they are downloaded.
+    
+    The async fetch runs on its own thread and event loop and hands posts
+    over through a queue, so parsing starts with the first page instead of
+    after the whole download. Fetch errors are re-raised here.
+    At most FETCH_QUEUE_SIZE posts are buffered, so a slow parse stage
+    pauses the download; closing the generator early (e.g. after a stage
+    failed) stops the fetch thread and waits for it to exit.
+    Updates stats["posts_fetched"] and stats["timings"]["fetch"] (wall time
+    of the download).
+    """
+    post_q: "queue.Queue[Optional[Post]]" = queue.Queue(maxsize=FETCH_QUEUE_SIZE)
+    stop = threading.Event()
+    failure: List[BaseException] = []
+    
+    async def pump() -> None:
+        async for post in iter_discourse_posts(category=category, min_posts=min_posts):
+            # Wait for room without blocking the event loop's in-flight requests
+            while True:
+                if stop.is_set():
+                    return
+                try:
+                    post_q.put_nowait(post)
+                    break
+                except queue.Full:
+                    await asyncio.sleep(_STAGE_POLL_SECONDS)
+    
+    def fetch() -> None:
+        t0 = time.perf_counter()
+        try:
+            asyncio.run(pump())
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            _merge_timings(stats, {"fetch": time.perf_counter() - t0})
+            while not stop.is_set():
+                try:
+                    post_q.put(None, timeout=_STAGE_POLL_SECONDS)
+                    break
+                except queue.Full:
+                    pass
+    
+    thread = threading.Thread(target=fetch, name="ingest-fetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            post = post_q.get()
+            if post is None:
+                break
+            with _stats_lock:
+                stats["posts_fetched"] += 1
+            yield post
+    finally:
+        stop.set()
+        thread.join()
+    if failure:
+        raise failure[0]
+
+
+def _run_stages(posts: Iterable[Post], vector_store: Any, stats: Dict[str, Any]) -> int:
+    """
+    Run parse -> embed -> insert as three threads connected by bounded queues.
+    
+    posts may be a lazy stream; it is consumed by the parse stage.
+    
+    Parsing (HTML/regex), embedding (model inference) and inserts (vector
+    store I/O) use different resources, so running them concurrently keeps
+    each busy. A None item marks the end of a stage's output.
+    Busy time of the embed and insert stages (excluding queue waits) is
+    added to stats["timings"]["embed"] and stats["timings"]["insert"].
+    
+    If a stage raises, a shared cancel event stops the other two (queue
+    waits poll it instead of blocking forever) and the first error is
+    re-raised here once all three have exited.
+    
+    Returns:
+        Number of chunks embedded
+    """
+    parse_q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+    insert_q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+    cancel = threading.Event()
+    failures: List[BaseException] = []
+    
+    def put(q: queue.Queue, item: Optional[Dict[str, Any]]) -> bool:
+        # False if the pipeline was cancelled before the item fit
+        while not cancel.is_set():
+            try:
+                q.put(item, timeout=_STAGE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def get(q: queue.Queue) -> Optional[Dict[str, Any]]:
+        # None (end of input) once the pipeline is cancelled
+        while not cancel.is_set():
+            try:
+                return q.get(timeout=_STAGE_POLL_SECONDS)
+            except queue.Empty:
+                pass
+        return None
+    
+    def stage(fn):
+        def run():
+            try:
+                return fn()
+            except BaseException as e:
+                with _stats_lock:
+                    failures.append(e)
+                cancel.set()
+                raise
+        return run
+    
+    @stage
+    def parse_stage() -> None:
+        try:
+            buffer = deque()
+            for chunk in _iter_post_chunks(posts, stats):
+                buffer.append(chunk)
+                if len(buffer) >= EMBED_BATCH_SIZE:
+                    if not put(parse_q, _to_columns([buffer.popleft() for _ in range(EMBED_BATCH_SIZE)])):
+                        return
+            if buffer:
+                put(parse_q, _to_columns(list(buffer)))
+        finally:
+            put(parse_q, None)
+    
+    @stage
+    def embed_stage() -> int:
+        embedded_total = 0
+        try:
+            while True:
+                batch = get(parse_q)
+                if batch is None:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    embed = embed_texts_cached if EMBED_CACHE else embed_texts_batched
+                    batch["embedding"] = embed(batch["text"], batch_size=EMBED_BATCH_SIZE)
+                except Exception as e:
+                    error_msg = f"Error embedding batch of {len(batch['text'])} chunks: {e}"
+                    logger.exception(error_msg)
+                    with _stats_lock:
+                        stats["errors"].append(error_msg)
+                    continue
+                finally:
+                    _merge_timings(stats, {"embed": time.perf_counter() - t0})
+                embedded_total += batch["embedding"].shape[0]
+                if not put(insert_q, batch):
+                    break
+        finally:
+            put(insert_q, None)
+        return embedded_total
+    
+    @stage
+    def insert_stage() -> None:
+        # sqlite PRAGMAs are per connection and Chroma keeps one per thread,
+        # so tune on the thread that does the inserts
+        tuned = _tune_for_bulk(vector_store)
+        busy = 0.0
+        try:
+            # Regroup embed-sized batches into INSERT_BATCH_SIZE inserts
+            pending: List[Dict[str, Any]] = []
+            pending_rows = 0
+            while True:
+                embedded = get(insert_q)
+                if embedded is None:
+                    break
+                pending.append(embedded)
+                pending_rows += len(embedded["chunk_id"])
+                if pending_rows >= INSERT_BATCH_SIZE:
+                    t0 = time.perf_counter()
+                    columns = _concat_columns(pending)
+                    full = pending_rows - pending_rows % INSERT_BATCH_SIZE
+                    _insert_embedded(vector_store, _slice_columns(columns, 0, full), stats)
+                    pending = [_slice_columns(columns, full, pending_rows)] if full < pending_rows else []
+                    pending_rows -= full
+                    busy += time.perf_counter() - t0
+            if pending and not cancel.is_set():
+                t0 = time.perf_counter()
+                _insert_embedded(vector_store, _concat_columns(pending), stats)
+                busy += time.perf_counter() - t0
+        finally:
+            _merge_timings(stats, {"insert": busy})
+            if tuned:
+                _restore_after_bulk(vector_store)
+    
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="ingest") as executor:
+        parse_future = executor.submit(parse_stage)
+        embed_future = executor.submit(embed_stage)
+        insert_future = executor.submit(insert_stage)
+        for future in (parse_future, embed_future, insert_future):
+            future.exception()  # wait for every stage to exit
+    if failures:
+        raise failures[0]
+    return embed_future.result()
 
 
 def run_ingestion_pipeline(
     category: Optional[str] = None,
     min_posts: Optional[int] = None,
-    vector_store_type: Optional[str] = None
+    vector_store_type: Optional[str] = None,
+    vector_store: Optional[Any] = None
 ) -> Dict[str, Any]:
     """
     Run the complete ingestion pipeline.
@@ -45,6 +657,8 @@ def run_ingestion_pipeline(
         category: Discourse category slug (defaults to env var)
         min_posts: Minimum number of posts to fetch (defaults to env var)
         vector_store_type: "chroma" or "faiss" (defaults to env var)
+        vector_store: Already-opened store to insert into, preferably with
+            bulk_mode=True (opened that way from vector_store_type if not given)
         
     Returns:
         Dictionary with statistics:
@@ -53,10 +667,17 @@ def run_ingestion_pipeline(
             "posts_fetched": 500,
             "posts_processed": 480,
             "chunks_created": 1200,
+            "chunks_duplicate": 150,
             "chunks_inserted": 1200,
             "duration_seconds": 45.2,
+            "timings": {"fetch": 30.1, "html": 8.4, "clean": 1.2, "chunk": 2.5,
+                        "embed": 20.3, "insert": 4.0, "persist": 0.6},
             "errors": []
         }
+        timings holds seconds per step: fetch is download wall time,
+        html/clean/chunk are summed over parse workers, embed/insert
+        exclude time spent waiting on other stages. Stages overlap, so
+        they do not add up to duration_seconds.
     """
     start_time = time.time()
     stats = {
@@ -64,8 +685,10 @@ def run_ingestion_pipeline(
         "posts_fetched": 0,
         "posts_processed": 0,
         "chunks_created": 0,
+        "chunks_duplicate": 0,
         "chunks_inserted": 0,
         "duration_seconds": 0,
+        "timings": {name: 0.0 for name in ("fetch", "html", "clean", "chunk", "embed", "insert", "persist")},
         "errors": []
     }
     
@@ -75,133 +698,59 @@ def run_ingestion_pipeline(
         logger.info("Starting ingestion pipeline")
         logger.info("=" * 60)
         
-        logger.info("Step 1/6: Fetching posts from Discourse...")
-        posts = fetch_discourse_posts(category=category, min_posts=min_posts)
-        stats["posts_fetched"] = len(posts)
-        logger.info(f"✓ Fetched {len(posts)} posts")
-        
-        if not posts:
-            logger.warning("No posts fetched, aborting pipeline")
-            stats["status"] = "no_posts"
-            return stats
-        
         # Initialize vector store
-        logger.info("Initializing vector store...")
-        vector_store = get_vector_store(store_type=vector_store_type)
-        logger.info(f"✓ Vector store initialized: {type(vector_store).__name__}")
+        if vector_store is None:
+            logger.info("Initializing vector store...")
+            vector_store = get_vector_store(store_type=vector_store_type, bulk_mode=True)
+            logger.info(f"✓ Vector store initialized: {type(vector_store).__name__}")
         
-        # Process posts in batches
-        all_chunks = []
-        processed_count = 0
+        # Steps 1-6: posts stream in from Discourse while parse/clean/chunk,
+        # embed and insert run concurrently on batches of about
+        # EMBED_BATCH_SIZE chunks
+        logger.info("Step 1-6/6: Fetching and processing posts from Discourse...")
         
-        logger.info(f"Step 2-5/6: Processing {len(posts)} posts...")
+        posts = _stream_posts(category, min_posts, stats)
+        try:
+            embedded_total = _run_stages(posts, vector_store, stats)
+        finally:
+            # Stops the download if a stage failed before the stream was used up
+            posts.close()
         
-        for i, post in enumerate(posts):
-            try:
-                # Step 2: Parse HTML
-                html_content = post.get("content", "")
-                if not html_content:
-                    logger.debug(f"Skipping post {post.get('id')}: no content")
-                    continue
-                
-                parsed = html_to_text(html_content)
-                text = parsed.get("text", "")
-                
-                if not text or len(text.split()) < MIN_POST_LENGTH:
-                    logger.debug(f"Skipping post {post.get('id')}: too short")
-                    continue
-                
-                # Step 3: Clean text
-                cleaned_text = normalize_text(text)
-                
-                if not cleaned_text or len(cleaned_text.split()) < MIN_POST_LENGTH:
-                    logger.debug(f"Skipping post {post.get('id')}: too short after cleaning")
-                    continue
-                
-                # Step 4: Chunk text
-                chunks = split_into_chunks(cleaned_text)
-                
-                if not chunks:
-                    logger.debug(f"Skipping post {post.get('id')}: no chunks created")
-                    continue
-                
-                # Enrich chunks with metadata
-                for chunk in chunks:
-                    chunk["meta"] = {
-                        "post_id": str(post.get("id", "")),
-                        "topic_id": str(post.get("topic_id", "")),
-                        "url": post.get("url", ""),
-                        "title": post.get("title", ""),
-                        "timestamp": post.get("created_at", ""),
-                        "chunk_index": chunk.get("chunk_index", 0),
-                        "author": post.get("username") or post.get("name", ""),
-                    }
-                
-                all_chunks.extend(chunks)
-                processed_count += 1
-                
-                # Log progress
-                if (i + 1) % 50 == 0:
-                    logger.info(f"  Processed {i + 1}/{len(posts)} posts, created {len(all_chunks)} chunks so far...")
-                
-            except Exception as e:
-                error_msg = f"Error processing post {post.get('id')}: {e}"
-                logger.exception(error_msg)
-                stats["errors"].append(error_msg)
-                continue
+        logger.info(f"✓ Fetched {stats['posts_fetched']} posts")
+        
+        if not stats["posts_fetched"]:
+            logger.warning("No posts fetched, aborting pipeline")
+            stats["status"] = "no_posts"
+            return stats
         
-        stats["posts_processed"] = processed_count
-        stats["chunks_created"] = len(all_chunks)
-        logger.info(f"✓ Processed {processed_count} posts, created {len(all_chunks)} chunks")
+        logger.info(
+            f"✓ Processed {stats['posts_processed']} posts, created {stats['chunks_created']} chunks "
+            f"({stats['chunks_duplicate']} duplicates skipped)"
+        )
         
-        if not all_chunks:
+        if not stats["chunks_created"]:
             logger.warning("No chunks created, aborting pipeline")
             stats["status"] = "no_chunks"
             return stats
         
-        # Step 5: Generate embeddings (in batches)
-        logger.info("Step 5/6: Generating embeddings...")
-        embedded_chunks = embed_chunks(all_chunks)
-        logger.info(f"✓ Generated embeddings for {len(embedded_chunks)} chunks")
+        logger.info(f"✓ Generated embeddings for {embedded_total} chunks")
         
-        if len(embedded_chunks) != len(all_chunks):
+        if embedded_total != stats["chunks_created"]:
             logger.warning(
-                f"Embedding count mismatch: {len(embedded_chunks)} embedded vs {len(all_chunks)} chunks"
+                f"Embedding count mismatch: {embedded_total} embedded vs {stats['chunks_created']} chunks"
             )
         
-        # Step 6: Insert into vector store (in batches)
-        logger.info("Step 6/6: Inserting chunks into vector store...")
-        
-        inserted_total = 0
-        batch_num = 0
-        
-        for i in range(0, len(embedded_chunks), BATCH_SIZE):
-            batch = embedded_chunks[i:i + BATCH_SIZE]
-            batch_num += 1
-            
-            try:
-                result = insert_chunks(vector_store, batch)
-                inserted = result.get("inserted", 0)
-                inserted_total += inserted
-                
-                logger.debug(f"  Batch {batch_num}: inserted {inserted} chunks")
-                
-            except Exception as e:
-                error_msg = f"Error inserting batch {batch_num}: {e}"
-                logger.exception(error_msg)
-                stats["errors"].append(error_msg)
-                continue
-        
-        stats["chunks_inserted"] = inserted_total
-        
-        # Persist vector store
+        # Persist vector store (stores opened with bulk_mode write to disk only here)
+        t0 = time.perf_counter()
         try:
             vector_store.persist()
         except Exception as e:
             logger.warning(f"Failed to persist vector store: {e}")
+        _merge_timings(stats, {"persist": time.perf_counter() - t0})
         
         duration = time.time() - start_time
         stats["duration_seconds"] = round(duration, 2)
+        stats["timings"] = {name: round(seconds, 3) for name, seconds in stats["timings"].items()}
         
         # Final summary
         logger.info("=" * 60)
@@ -209,8 +758,12 @@ def run_ingestion_pipeline(
         logger.info(f"  Posts fetched: {stats['posts_fetched']}")
         logger.info(f"  Posts processed: {stats['posts_processed']}")
         logger.info(f"  Chunks created: {stats['chunks_created']}")
+        logger.info(f"  Duplicate chunks skipped: {stats['chunks_duplicate']}")
         logger.info(f"  Chunks inserted: {stats['chunks_inserted']}")
         logger.info(f"  Duration: {stats['duration_seconds']}s")
+        logger.info("  Time per step (stages overlap):")
+        for name, seconds in stats["timings"].items():
+            logger.info(f"    {name:<8} {seconds:>9.3f}s")
         if stats["errors"]:
             logger.warning(f"  Errors encountered: {len(stats['errors'])}")
         logger.info("=" * 60)
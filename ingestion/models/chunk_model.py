@@ -1,8 +1,12 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
 from typing import Dict, List, Any
 
-class ChunkEmbeddingModel(BaseModel):
+import numpy as np
+from numpy.typing import NDArray
+
+@dataclass(slots=True)
+class ChunkEmbeddingModel:
     chunk_id: str
     text: str
-    embedding: List[float]
+    embedding: NDArray[np.float32]  # contiguous vector, not a list of boxed floats
     metadata: Dict[str, Any]
@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from dataclasses import dataclass, field
 from typing import List, Optional
 
-class DiscoursePostModel(BaseModel):
+@dataclass(slots=True)
+class DiscoursePostModel:
     post_id: str
     topic_id: str
     topic_title: str
@@ -10,8 +11,6 @@ class DiscoursePostModel(BaseModel):
     url: str
     raw_html : str
     clean_text: str
-    links: List[str] = []
+    links: List[str] = field(default_factory=list)
     has_code: bool = False
-    code_blocks: List[str] = []
-
-    
+    code_blocks: List[str] = field(default_factory=list)
@@ -6,5 +6,6 @@ This module contains all components for the query pipeline:
 - retriever: Semantic search in vector DB
 - prompt_builder: Constructs RAG prompts
 - llm_client: LLM API client
+- semantic_cache: Answer cache for repeated/paraphrased queries
 """
 
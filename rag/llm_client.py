@@ -7,15 +7,26 @@ Output: Raw LLM answer
 Returned to: query_engine.py
 """
 import os
+import json
+import importlib.util
+import asyncio
 import logging
+import random
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+# httpx (and h2, its HTTP/2 support) load on the first LLMClient construction,
+# not when this module is imported; only their presence is checked here
+HTTPX_AVAILABLE = importlib.util.find_spec("httpx") is not None
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+httpx = None  # the module, once _import_httpx() has run
 
 try:
-    import httpx
-    HTTPX_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    HTTPX_AVAILABLE = False
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +38,107 @@ LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "1000"))
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
 LLM_TIMEOUT = int(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
 
+# Connection pool: idle connections (and their TLS sessions) are kept alive and
+# reused across generate() calls; HTTP/2 multiplexes concurrent requests on one
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() in ("1", "true", "yes")
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "30"))
+LLM_CONNECT_RETRIES = int(os.getenv("LLM_CONNECT_RETRIES", "2"))  # Retries of failed connects only
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "10"))  # In-flight async generations
+LLM_WARMUP_TIMEOUT = float(os.getenv("LLM_WARMUP_TIMEOUT_SECONDS", "2"))  # Per attempt in warm_connection()
+
+# Transient failures (transport errors, these statuses) are retried with
+# jittered exponential backoff, honoring Retry-After when the server sends it
+LLM_RETRY_STATUSES = (429, 500, 502, 503, 504)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "0.25"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY_SECONDS", "8"))
+
+# Circuit breaker: after this many consecutive failed generations, fail fast
+# without calling the API until the cooldown has passed; then one call at a
+# time is let through as a probe (half-open) until one closes or reopens it
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+
+def _import_httpx() -> Any:
+    """Import httpx on first use and return it."""
+    global httpx
+    if httpx is None:
+        import httpx as _httpx
+        httpx = _httpx
+    return httpx
+
+
+def _pool_limits() -> "httpx.Limits":
+    """Connection pool limits shared by the sync and async clients."""
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+    )
+
+
+def _retry_delay(attempt: int, response: Optional["httpx.Response"] = None) -> float:
+    """Seconds to wait before retry number attempt + 1 (Retry-After if given, else jittered backoff)."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), LLM_RETRY_MAX_DELAY)
+    delay = min(LLM_RETRY_BASE_DELAY * 2 ** attempt, LLM_RETRY_MAX_DELAY)
+    return min(delay + random.uniform(0, delay), LLM_RETRY_MAX_DELAY)
+
+
+def _is_transient(e: BaseException) -> bool:
+    """True for failures worth retrying that also count against the circuit breaker."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code in LLM_RETRY_STATUSES
+    return isinstance(e, httpx.TransportError)
+
+
+_SSE_DONE = "data: [DONE]"  # Last event of a streamed completion
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    """Serialize a request payload to JSON bytes (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _loads(body: Any) -> Any:
+    """Parse a JSON response body or SSE data line (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _sse_delta(line: str) -> Optional[str]:
+    """
+    Text delta from one server-sent event line of a streamed completion.
+    
+    Returns None for lines without content (comments, role-only deltas,
+    the terminating "data: [DONE]").
+    """
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return None
+    choices = _loads(data).get("choices") or []
+    if not choices:
+        return None
+    return (choices[0].get("delta") or {}).get("content") or None
+
 
 class LLMClient:
     """
     Client for interacting with LLM via AIPipe/OpenRouter API.
+    
+    Holds a keep-alive connection pool; share one instance (get_llm_client())
+    and do not close() it between requests, or every call pays a new
+    TCP + TLS handshake.
     """
     
     def __init__(
@@ -51,6 +159,7 @@ class LLMClient:
         """
         if not HTTPX_AVAILABLE:
             raise ImportError("httpx is required for LLMClient. Install with: pip install httpx")
+        _import_httpx()
         
         self.base_url = (base_url or AIPIPE_BASE_URL or "").rstrip("/")
         self.api_key = api_key or AIPIPE_API_KEY
@@ -62,30 +171,177 @@ class LLMClient:
         if not self.api_key:
             raise ValueError("AIPIPE_API_KEY must be set")
         
+        self._http2 = LLM_HTTP2 and H2_AVAILABLE
+        if LLM_HTTP2 and not H2_AVAILABLE:
+            logger.debug("h2 not installed, LLMClient using HTTP/1.1 (pip install 'httpx[http2]')")
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        # Request parts that are the same for every call
+        self._url = f"{self.base_url}/chat/completions"
+        self._base_payload = {"model": self.model, "max_tokens": LLM_MAX_TOKENS, "temperature": LLM_TEMPERATURE}
+        
+        # Pool settings live on the transport (httpx ignores the client's
+        # http2/limits arguments when a transport is given)
         self.client = httpx.Client(
             timeout=self.timeout,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+            transport=httpx.HTTPTransport(http2=self._http2, limits=_pool_limits(), retries=LLM_CONNECT_RETRIES),
+            headers=self._headers
         )
         
-        logger.info(f"LLMClient initialized: model={self.model}, base_url={self.base_url[:50]}...")
+        # Circuit breaker state, shared by sync and async calls
+        self._breaker_lock = threading.Lock()
+        self._failures = 0
+        self._opened_until = 0.0
+        self._probing = False
+        
+        # Async client and concurrency cap, created per event loop by _async_client()
+        self._aclient = None
+        self._asem = None
+        self._aloop = None
+        
+        logger.info(
+            f"LLMClient initialized: model={self.model}, base_url={self.base_url[:50]}..., "
+            f"http2={self._http2}"
+        )
+    
+    def _build_payload(
+        self,
+        prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        messages: Optional[List[Dict[str, str]]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build the chat completions request body on top of the env defaults."""
+        if messages is None:
+            if prompt is None:
+                raise ValueError("prompt or messages is required")
+            messages = [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        payload = {**self._base_payload, "messages": messages, **kwargs}
+        # Only override the defaults the caller actually set
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        if temperature is not None:
+            payload["temperature"] = temperature
+        return payload
+    
+    def _parse_response(self, data: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """Extract the answer from a chat completions response body."""
+        choices = data.get("choices", [])
+        if not choices:
+            raise ValueError("No choices in LLM response")
+        
+        answer = choices[0].get("message", {}).get("content", "")
+        
+        if not answer:
+            raise ValueError("Empty answer from LLM")
+        
+        latency = (time.time() - start_time) * 1000  # Convert to ms
+        
+        result = {
+            "answer": answer.strip(),
+            "model": data.get("model", self.model),
+            "usage": data.get("usage", {}),
+            "latency_ms": latency
+        }
+        
+        logger.info(
+            f"LLM generation successful: {len(answer)} chars, "
+            f"{latency:.0f}ms, model={result['model']}"
+        )
+        
+        return result
+    
+    def _error_result(self, e: BaseException) -> Dict[str, Any]:
+        """Log a failed generation and build the error result dict."""
+        if isinstance(e, httpx.HTTPStatusError):
+            error_msg = f"HTTP error {e.response.status_code}: {e.response.text}"
+            logger.error(error_msg)
+        else:
+            error_msg = f"LLM generation failed: {str(e)}"
+            logger.error(error_msg, exc_info=e)
+        return {
+            "answer": "",
+            "error": error_msg,
+            "model": self.model
+        }
+    
+    def _breaker_admit(self) -> Optional[bool]:
+        """
+        Decide whether a call may go to the API.
+        
+        Returns None while the circuit breaker is rejecting calls, True for
+        the single probe let through once the cooldown has passed (every
+        other caller is still rejected until it finishes), and False when
+        the breaker is closed. Pass the value to _record_outcome() and
+        _end_probe().
+        """
+        with self._breaker_lock:
+            if self._failures < LLM_BREAKER_THRESHOLD:
+                return False
+            if self._probing or time.monotonic() < self._opened_until:
+                return None
+            self._probing = True
+            return True
+    
+    def _end_probe(self, probe: Optional[bool]) -> None:
+        """Release the half-open probe slot (also when the call was cancelled)."""
+        if probe:
+            with self._breaker_lock:
+                self._probing = False
+    
+    def _record_outcome(self, error: Optional[BaseException], probe: Optional[bool] = False) -> None:
+        """Update the circuit breaker after a generation (error=None on success)."""
+        with self._breaker_lock:
+            if error is None:
+                self._failures = 0
+            elif _is_transient(error):
+                self._failures += 1
+                if self._failures >= LLM_BREAKER_THRESHOLD:
+                    # (Re)open; after the cooldown one call is let through as a probe
+                    self._opened_until = time.monotonic() + LLM_BREAKER_COOLDOWN
+                    logger.warning(
+                        f"LLM circuit breaker open for {LLM_BREAKER_COOLDOWN:.0f}s "
+                        f"after {self._failures} consecutive failures"
+                    )
+            elif probe:
+                # The API answered the probe (e.g. a 4xx for this request), so it is up again
+                self._failures = 0
+    
+    def _unavailable_result(self) -> Dict[str, Any]:
+        """Error result returned without an API call while the breaker is open."""
+        error_msg = "LLM service temporarily unavailable after repeated failures; please retry shortly"
+        logger.warning(error_msg)
+        return {
+            "answer": "",
+            "error": error_msg,
+            "model": self.model
+        }
     
     def generate(
         self,
-        prompt: str,
+        prompt: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
         Generate response from LLM.
         
         Args:
-            prompt: Input prompt string
+            prompt: Input prompt string, sent as a single user message
             max_tokens: Maximum tokens for response (default: from env)
             temperature: Sampling temperature (default: from env)
+            messages: Chat messages to send instead of prompt (e.g. from
+                PromptBuilder.create_messages)
             **kwargs: Additional parameters for API
             
         Returns:
@@ -95,81 +351,259 @@ class LLMClient:
                 - usage: Token usage info (if available)
                 - error: Error message (if failed)
         """
-        max_tokens = max_tokens or LLM_MAX_TOKENS
-        temperature = temperature if temperature is not None else LLM_TEMPERATURE
-        
-        # Prepare request payload
-        payload = {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            **kwargs
-        }
+        # Serialized once, so retries resend the same bytes
+        body = _dumps(self._build_payload(prompt, max_tokens, temperature, messages, **kwargs))
+        url = self._url
         
-        url = f"{self.base_url}/chat/completions"
+        probe = self._breaker_admit()
+        if probe is None:
+            return self._unavailable_result()
         
         try:
             start_time = time.time()
             
-            response = self.client.post(url, json=payload)
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                try:
+                    response = self.client.post(url, content=body)
+                except httpx.TransportError as e:
+                    if attempt == LLM_MAX_RETRIES:
+                        raise
+                    delay = _retry_delay(attempt)
+                    logger.warning(f"LLM request failed ({e!r}), retrying in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                if response.status_code in LLM_RETRY_STATUSES and attempt < LLM_MAX_RETRIES:
+                    delay = _retry_delay(attempt, response)
+                    logger.warning(f"LLM API returned {response.status_code}, retrying in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                break
             response.raise_for_status()
             
-            data = response.json()
-            
-            # Extract answer from response
-            choices = data.get("choices", [])
-            if not choices:
-                raise ValueError("No choices in LLM response")
-            
-            answer = choices[0].get("message", {}).get("content", "")
-            
-            if not answer:
-                raise ValueError("Empty answer from LLM")
-            
-            latency = (time.time() - start_time) * 1000  # Convert to ms
-            
-            result = {
-                "answer": answer.strip(),
-                "model": data.get("model", self.model),
-                "usage": data.get("usage", {}),
-                "latency_ms": latency
-            }
+            result = self._parse_response(_loads(response.content), start_time)
+            self._record_outcome(None, probe)
+            return result
             
-            logger.info(
-                f"LLM generation successful: {len(answer)} chars, "
-                f"{latency:.0f}ms, model={result['model']}"
+        except Exception as e:
+            self._record_outcome(e, probe)
+            return self._error_result(e)
+        finally:
+            self._end_probe(probe)
+    
+    def _async_client(self) -> Tuple["httpx.AsyncClient", asyncio.Semaphore]:
+        """Return the AsyncClient and concurrency semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._aloop is not loop:
+            # httpx connection pools and asyncio primitives belong to one event loop
+            if self._aclient is not None:
+                self._close_stale_client(self._aclient, self._aloop)
+            self._aclient = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=httpx.AsyncHTTPTransport(
+                    http2=self._http2, limits=_pool_limits(), retries=LLM_CONNECT_RETRIES
+                ),
+                headers=self._headers
             )
+            self._asem = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+            self._aloop = loop
+        return self._aclient, self._asem
+    
+    @staticmethod
+    def _close_stale_client(aclient: "httpx.AsyncClient", aloop: asyncio.AbstractEventLoop) -> None:
+        """Close the AsyncClient of an event loop that is no longer the current one."""
+        async def _aclose() -> None:
+            try:
+                await aclient.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing stale async LLM client: {e}")
+        
+        if aloop.is_running():
+            # Loop still alive in another thread: close the pool there
+            asyncio.run_coroutine_threadsafe(_aclose(), aloop)
+        else:
+            # Its loop has ended: close the client and drop its pool from this
+            # loop (sockets already bound to the dead loop go when collected).
+            # Callers that run several loops should await aclose() before each ends.
+            asyncio.get_running_loop().create_task(_aclose())
+    
+    async def agenerate(
+        self,
+        prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Async variant of generate().
+        
+        At most LLM_MAX_CONCURRENCY requests per event loop are in flight;
+        further calls wait for a slot (backoff sleeps do not hold one).
+        Takes the same arguments, retries the same way and returns the same
+        dictionary as generate().
+        """
+        # Serialized once, so retries resend the same bytes
+        body = _dumps(self._build_payload(prompt, max_tokens, temperature, messages, **kwargs))
+        url = self._url
+        aclient, sem = self._async_client()
+        
+        probe = self._breaker_admit()
+        if probe is None:
+            return self._unavailable_result()
+        
+        try:
+            start_time = time.time()
+            
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                try:
+                    async with sem:
+                        response = await aclient.post(url, content=body)
+                except httpx.TransportError as e:
+                    if attempt == LLM_MAX_RETRIES:
+                        raise
+                    delay = _retry_delay(attempt)
+                    logger.warning(f"LLM request failed ({e!r}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                if response.status_code in LLM_RETRY_STATUSES and attempt < LLM_MAX_RETRIES:
+                    delay = _retry_delay(attempt, response)
+                    logger.warning(f"LLM API returned {response.status_code}, retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                break
+            response.raise_for_status()
             
+            result = self._parse_response(_loads(response.content), start_time)
+            self._record_outcome(None, probe)
             return result
             
-        except httpx.HTTPStatusError as e:
-            error_msg = f"HTTP error {e.response.status_code}: {e.response.text}"
-            logger.error(error_msg)
-            return {
-                "answer": "",
-                "error": error_msg,
-                "model": self.model
-            }
         except Exception as e:
-            error_msg = f"LLM generation failed: {str(e)}"
-            logger.exception(error_msg)
-            return {
-                "answer": "",
-                "error": error_msg,
-                "model": self.model
-            }
+            self._record_outcome(e, probe)
+            return self._error_result(e)
+        finally:
+            self._end_probe(probe)
+    
+    def _unavailable_error(self) -> RuntimeError:
+        """Exception raised by the streaming methods while the breaker is open."""
+        return RuntimeError(self._unavailable_result()["error"])
+    
+    def stream(
+        self,
+        prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        Stream a response from the LLM, yielding text deltas as they arrive.
+        
+        Takes the same arguments as generate(). Nothing is retried once
+        streaming has started; failures are raised (and counted by the
+        circuit breaker) instead of being returned as an error dict.
+        
+        Yields:
+            Pieces of the answer text, in order
+        """
+        body = _dumps(self._build_payload(prompt, max_tokens, temperature, messages, stream=True, **kwargs))
+        url = self._url
+        probe = self._breaker_admit()
+        if probe is None:
+            raise self._unavailable_error()
+        
+        try:
+            with self.client.stream("POST", url, content=body) as response:
+                if response.is_error:
+                    response.read()
+                    response.raise_for_status()
+                for line in response.iter_lines():
+                    if line == _SSE_DONE:
+                        break
+                    delta = _sse_delta(line)
+                    if delta:
+                        yield delta
+        except Exception as e:
+            self._record_outcome(e, probe)
+            raise
+        else:
+            self._record_outcome(None, probe)
+        finally:
+            self._end_probe(probe)
+    
+    async def astream(
+        self,
+        prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of stream(); holds one LLM_MAX_CONCURRENCY slot while streaming.
+        
+        Yields:
+            Pieces of the answer text, in order
+        """
+        body = _dumps(self._build_payload(prompt, max_tokens, temperature, messages, stream=True, **kwargs))
+        url = self._url
+        probe = self._breaker_admit()
+        if probe is None:
+            raise self._unavailable_error()
+        aclient, sem = self._async_client()
+        
+        try:
+            async with sem:
+                async with aclient.stream("POST", url, content=body) as response:
+                    if response.is_error:
+                        await response.aread()
+                        response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if line == _SSE_DONE:
+                            break
+                        delta = _sse_delta(line)
+                        if delta:
+                            yield delta
+        except Exception as e:
+            self._record_outcome(e, probe)
+            raise
+        else:
+            self._record_outcome(None, probe)
+        finally:
+            self._end_probe(probe)
+    
+    def warm_connection(self, timeout: float = LLM_WARMUP_TIMEOUT) -> bool:
+        """
+        Open a pooled connection to the API without generating anything.
+        
+        Sends one HEAD request to the base URL with a short timeout, outside
+        the retry loop and circuit breaker; any HTTP status counts, since only
+        the TCP + TLS (and HTTP/2) setup is paid up front. The transport still
+        retries failed connects (LLM_CONNECT_RETRIES), so this blocks for at
+        most about (LLM_CONNECT_RETRIES + 1) * timeout seconds.
+        
+        Returns:
+            True if a connection was made
+        """
+        try:
+            self.client.head(self.base_url, timeout=timeout)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"LLM connection warm-up failed: {e}")
+            return False
     
     def close(self):
         """Close HTTP client."""
         if hasattr(self, "client"):
             self.client.close()
     
+    async def aclose(self):
+        """Close the sync and async HTTP clients."""
+        self.close()
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+            self._aloop = None
+    
     def __enter__(self):
         return self
     
@@ -5,13 +5,50 @@ Purpose: Merge user question, retrieved chunks, and system instructions into fin
 Output: Fully formatted prompt string
 Returned to: llm_client.py
 """
+import os
+import re
+import importlib.util
 import logging
-from typing import List, Optional
+import threading
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from schema.retrieval_schema import RetrievedChunk
+from schema.retrieval_schema import RetrievedChunkRecord
 
 logger = logging.getLogger(__name__)
 
+# Optional: tiktoken for token-accurate context budgets (imported by _load_encoding)
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+# Optional: Hyperscan for a single-pass guardrail scan of context chunks
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Configuration
+MAX_CONTEXT_TOKENS = int(os.getenv("MAX_CONTEXT_TOKENS", "3000"))  # Context budget per prompt
+PROMPT_TOKENIZER_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
+PROMPT_TOKENIZER_FALLBACK = "o200k_base"  # Encoding for models tiktoken does not know
+CHARS_PER_TOKEN = 4  # Estimate used when no tokenizer can be loaded
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "4096"))  # Cached chunk/title counts
+# Redact prompt-injection phrases and personal data from chunk text before it enters a prompt
+PROMPT_SCRUB_ENABLED = os.getenv("PROMPT_SCRUB_ENABLED", "true").lower() in ("1", "true", "yes")
+PROMPT_SCRUB_REPLACEMENT = "[redacted]"
+
+# Guardrail patterns, matched case-insensitively: instruction-override phrases,
+# chat-template control tokens and email addresses. The email match only starts
+# at the beginning of a run of address characters, so the re fallback scans each
+# run once instead of retrying from every position inside it.
+PROMPT_GUARD_PATTERNS = [
+    r"\b(?:ignore|disregard|forget)\s+(?:all\s+)?(?:of\s+)?(?:the\s+|your\s+)?(?:previous|prior|above|earlier)\s+(?:instructions|prompts?|rules)\b",
+    r"\b(?:reveal|print|show|repeat)\s+(?:me\s+)?(?:your|the)\s+(?:system\s+prompt|instructions)\b",
+    r"<\|(?:im_start|im_end|endoftext|system|assistant|user)\|>",
+    r"(?<![\w.+-])[\w.+-]+@[\w-]+(?:\.[\w-]+)+",
+]
+_GUARD_RE = re.compile("|".join(f"(?:{p})" for p in PROMPT_GUARD_PATTERNS), re.IGNORECASE)
+
 # Default system prompt
 DEFAULT_SYSTEM_PROMPT = """You are a helpful assistant that answers questions based on the provided context from a Discourse forum discussion.
 
@@ -25,27 +62,242 @@ Your task is to:
 Context will be provided as numbered chunks from Discourse posts."""
 
 
+# Closing instruction; in the message form it is part of the system message
+# so the user message is the only part that changes between requests
+ANSWER_INSTRUCTIONS = "Please provide a helpful answer based on the provided context. If the context doesn't contain enough information to answer the question, please say so."
+
+
+# Context entry templates and their fixed character counts
+_format_entry = "[{}] {}".format
+_format_titled_entry = "[{}] {}\n   (Source: {})".format
+_ENTRY_OVERHEAD = len(_format_entry("", ""))
+_SOURCE_OVERHEAD = len(_format_titled_entry("", "", "")) - _ENTRY_OVERHEAD
+
+# Fixed pieces around the context and question; prompts are assembled with a
+# single "".join so the (possibly tens of KB) context is copied only once
+_CONTEXT_HEADER = "Context from Discourse forum:\n"
+_ENTRY_SEPARATOR = "\n\n"
+_NO_CONTEXT = "No relevant context found."
+_QUESTION_LABEL = "\n\nUser Question: "
+_PROMPT_TAIL = "\n\n" + ANSWER_INSTRUCTIONS
+
+
+def _load_encoding(model: str) -> Any:
+    """
+    Load the tiktoken encoding for model ("provider/model" names allowed).
+    
+    Returns:
+        tiktoken Encoding, or None if tiktoken or its BPE file is unavailable
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    name = model.rsplit("/", 1)[-1]
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(name)
+        except KeyError:
+            return tiktoken.get_encoding(PROMPT_TOKENIZER_FALLBACK)
+    except Exception as e:
+        # The BPE file is downloaded on first use, which fails offline
+        logger.warning(f"Could not load tokenizer for {model}, estimating tokens from characters: {e}")
+        return None
+
+
+def _compile_guard_database() -> Any:
+    """
+    Compile PROMPT_GUARD_PATTERNS into one Hyperscan database.
+    
+    Returns:
+        hyperscan.Database, or None if Hyperscan is unavailable
+    """
+    if not HYPERSCAN_AVAILABLE:
+        return None
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[p.encode("utf-8") for p in PROMPT_GUARD_PATTERNS],
+            ids=list(range(len(PROMPT_GUARD_PATTERNS))),
+            elements=len(PROMPT_GUARD_PATTERNS),
+            flags=[flags] * len(PROMPT_GUARD_PATTERNS)
+        )
+        return db
+    except Exception as e:
+        logger.warning(f"Could not compile Hyperscan guardrail database, using re only: {e}")
+        return None
+
+
+def _stop_scan(*_) -> bool:
+    """Hyperscan match handler: the first match ends the scan."""
+    return True
+
+
+def _static_prefix(system_prompt: str) -> str:
+    """Fixed start of a single-string prompt (everything before the context)."""
+    return f"{system_prompt}\n\n{_CONTEXT_HEADER}"
+
+
+def _system_content(system_prompt: str) -> str:
+    """System message content: system prompt plus the answer instructions."""
+    return f"{system_prompt}\n\n{ANSWER_INSTRUCTIONS}"
+
+
 class PromptBuilder:
     """
     Builds RAG prompts by combining user query, retrieved chunks, and system instructions.
+    
+    Everything that is the same for every request (system prompt and fixed
+    scaffolding) comes first and byte-identical, and all per-request content
+    follows as one contiguous suffix, so provider-side prompt caching can
+    reuse the prefix.
     """
     
-    def __init__(self, system_prompt: Optional[str] = None, max_context_length: int = 3000):
+    def __init__(
+        self,
+        system_prompt: Optional[str] = None,
+        max_context_length: Optional[int] = None,
+        max_context_tokens: int = MAX_CONTEXT_TOKENS,
+        model: str = PROMPT_TOKENIZER_MODEL,
+        scrub: bool = PROMPT_SCRUB_ENABLED
+    ):
         """
         Initialize prompt builder.
         
+        The context is capped at max_context_tokens, counted with the
+        model's tiktoken encoding (estimated as CHARS_PER_TOKEN characters
+        per token when no tokenizer is available).
+        
         Args:
             system_prompt: Custom system prompt (default: uses DEFAULT_SYSTEM_PROMPT)
-            max_context_length: Maximum characters for context (to avoid token limits)
+            max_context_length: Cap the context in characters instead of tokens (optional)
+            max_context_tokens: Maximum tokens for context
+            model: Model whose tokenizer counts the tokens
+            scrub: Redact PROMPT_GUARD_PATTERNS matches from chunk text
         """
         self.system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
         self.max_context_length = max_context_length
-        logger.debug("PromptBuilder initialized")
+        self.max_context_tokens = max_context_tokens
+        self._enc = _load_encoding(model) if max_context_length is None else None
+        if self._enc is not None:
+            self._context_budget, self._budget_unit = max_context_tokens, "tokens"
+            # Scaffolding around each entry: "[n] ", the "\n\n" separator and the source line
+            self._entry_token_overhead = len(self._enc.encode_ordinary("[10] \n\n"))
+            self._source_token_overhead = len(self._enc.encode_ordinary("\n   (Source: )"))
+        elif max_context_length is not None:
+            self._context_budget, self._budget_unit = max_context_length, "chars"
+        else:
+            self._context_budget, self._budget_unit = max_context_tokens * CHARS_PER_TOKEN, "chars"
+        # Token counts of chunk texts and titles, so repeated chunks are not re-encoded
+        self._token_counts: Dict[str, int] = {}
+        self._token_lock = threading.Lock()
+        self.scrub = scrub
+        self._hs_db = _compile_guard_database() if scrub else None
+        self._hs_local = threading.local()  # Hyperscan scratch space is per thread
+        # Static prefix of create_prompt() and system message of create_messages(), built once
+        self._static_prefix = _static_prefix(self.system_prompt)
+        self._system_message = {"role": "system", "content": _system_content(self.system_prompt)}
+        logger.debug(f"PromptBuilder initialized (context budget {self._context_budget} {self._budget_unit})")
+    
+    def _scrub(self, text: str) -> str:
+        """Redact PROMPT_GUARD_PATTERNS matches from text."""
+        if self._hs_db is not None:
+            # One Hyperscan pass tells whether the text needs the regex substitution at all
+            scratch = getattr(self._hs_local, "scratch", None)
+            if scratch is None:
+                scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+            try:
+                self._hs_db.scan(text.encode("utf-8"), match_event_handler=_stop_scan, scratch=scratch)
+                return text
+            except hyperscan.ScanTerminated:
+                pass
+        return _GUARD_RE.sub(PROMPT_SCRUB_REPLACEMENT, text)
+    
+    def _count_tokens(self, texts: Sequence[str]) -> Dict[str, int]:
+        """Token counts of texts, encoding only uncached ones (in one batch)."""
+        with self._token_lock:
+            counts = {text: self._token_counts.get(text) for text in texts}
+        missing = [text for text, count in counts.items() if count is None]
+        if not missing:
+            return counts
+        
+        # encode_ordinary: chunk text may contain special-token strings like <|endoftext|>
+        if len(missing) == 1:
+            encoded = [self._enc.encode_ordinary(missing[0])]
+        else:
+            encoded = self._enc.encode_ordinary_batch(missing)
+        with self._token_lock:
+            for text, tokens in zip(missing, encoded):
+                counts[text] = self._token_counts[text] = len(tokens)
+            overflow = len(self._token_counts) - TOKEN_COUNT_CACHE_SIZE
+            if overflow > 0:
+                # Drop the oldest counts
+                for text in list(islice(self._token_counts, overflow)):
+                    del self._token_counts[text]
+        return counts
+    
+    def _entry_sizes(self, entries: List[Tuple[int, str, Optional[str]]]) -> List[int]:
+        """Size of each (number, text, title) context entry in budget units, without building it."""
+        if self._enc is None:
+            return [
+                len(str(i)) + len(text) + _ENTRY_OVERHEAD + (len(title) + _SOURCE_OVERHEAD if title else 0)
+                for i, text, title in entries
+            ]
+        # Sum of the parts' token counts; BPE merges across the joins make this approximate
+        counts = self._count_tokens([text for _, text, _ in entries] + [title for _, _, title in entries if title])
+        return [
+            counts[text] + self._entry_token_overhead + (counts[title] + self._source_token_overhead if title else 0)
+            for _, text, title in entries
+        ]
+    
+    def _build_context(self, retrieved_chunks: List[RetrievedChunkRecord]) -> Tuple[List[str], int]:
+        """
+        Format retrieved chunks as numbered context.
+        
+        Returns:
+            (pieces, chunks used): the context as strings to concatenate
+            (entries with their separators), and how many chunks it holds
+        """
+        context_parts = []
+        used = 0
+        total_size = 0
+        
+        entries = []
+        for i, chunk in enumerate(retrieved_chunks, 1):
+            chunk_text = chunk.text.strip()
+            if not chunk_text:
+                continue
+            if self.scrub:
+                chunk_text = self._scrub(chunk_text)
+            title = (chunk.meta or {}).get("title")
+            entries.append((i, chunk_text, str(title) if title else None))
+        
+        # Entry sizes from their parts, so an entry that does not fit is never built
+        for (i, chunk_text, title), entry_size in zip(entries, self._entry_sizes(entries)):
+            # Check budget
+            if total_size + entry_size > self._context_budget:
+                logger.warning(
+                    f"Context limit reached ({self._context_budget} {self._budget_unit}), "
+                    f"truncating at chunk {i}"
+                )
+                break
+            
+            # Format chunk with metadata (source title if available)
+            if used:
+                context_parts.append(_ENTRY_SEPARATOR)
+            if title:
+                context_parts.append(_format_titled_entry(i, chunk_text, title))
+            else:
+                context_parts.append(_format_entry(i, chunk_text))
+            used += 1
+            total_size += entry_size
+        
+        return context_parts or [_NO_CONTEXT], used
     
     def create_prompt(
         self,
         user_query: str,
-        retrieved_chunks: List[RetrievedChunk],
+        retrieved_chunks: List[RetrievedChunkRecord],
         system_prompt: Optional[str] = None
     ) -> str:
         """
@@ -59,55 +311,50 @@ class PromptBuilder:
         Returns:
             Fully formatted prompt string
         """
-        system = system_prompt or self.system_prompt
+        prefix = _static_prefix(system_prompt) if system_prompt else self._static_prefix
+        context_parts, used = self._build_context(retrieved_chunks)
         
-        # Build context section from retrieved chunks
-        context_parts = []
-        total_length = 0
+        # Build final prompt: static prefix + one dynamic suffix
+        prompt = "".join([prefix, *context_parts, _QUESTION_LABEL, user_query, _PROMPT_TAIL])
         
-        for i, chunk in enumerate(retrieved_chunks, 1):
-            chunk_text = chunk.text.strip()
-            if not chunk_text:
-                continue
-            
-            # Format chunk with metadata
-            chunk_entry = f"[{i}] {chunk_text}"
-            
-            # Add metadata if available
-            meta = chunk.meta or {}
-            if meta.get("title"):
-                chunk_entry += f"\n   (Source: {meta.get('title')})"
-            
-            # Check length limit
-            if total_length + len(chunk_entry) > self.max_context_length:
-                logger.warning(
-                    f"Context length limit reached ({self.max_context_length} chars), "
-                    f"truncating at chunk {i}"
-                )
-                break
-            
-            context_parts.append(chunk_entry)
-            total_length += len(chunk_entry)
+        logger.debug(f"Created prompt with {used} chunks, {len(prompt)} characters")
+        return prompt
+    
+    def create_messages(
+        self,
+        user_query: str,
+        retrieved_chunks: List[RetrievedChunkRecord],
+        system_prompt: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Create chat messages for a RAG request.
         
-        context = "\n\n".join(context_parts) if context_parts else "No relevant context found."
+        The system message (system prompt plus answer instructions) is
+        identical on every call; context and question go in the user message.
         
-        # Build final prompt
-        prompt = f"""{system}
-
-Context from Discourse forum:
-{context}
-
-User Question: {user_query}
-
-Please provide a helpful answer based on the context above. If the context doesn't contain enough information to answer the question, please say so."""
+        Args:
+            user_query: User's question
+            retrieved_chunks: List of retrieved chunks with context
+            system_prompt: Override system prompt (optional)
+            
+        Returns:
+            [system message, user message] for a chat completions API
+        """
+        if system_prompt:
+            system_message = {"role": "system", "content": _system_content(system_prompt)}
+        else:
+            system_message = self._system_message
+        context_parts, used = self._build_context(retrieved_chunks)
         
-        logger.debug(f"Created prompt with {len(context_parts)} chunks, {len(prompt)} characters")
-        return prompt
+        user_content = "".join([_CONTEXT_HEADER, *context_parts, _QUESTION_LABEL, user_query])
+        
+        logger.debug(f"Created messages with {used} chunks, {len(user_content)} dynamic characters")
+        return [dict(system_message), {"role": "user", "content": user_content}]
     
     def create_simple_prompt(
         self,
         user_query: str,
-        retrieved_chunks: List[RetrievedChunk]
+        retrieved_chunks: List[RetrievedChunkRecord]
     ) -> str:
         """
         Create a simpler prompt format (alternative to full RAG prompt).
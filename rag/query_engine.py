@@ -4,20 +4,48 @@ Query Engine - Main RAG Controller.
 Purpose: Orchestrate the entire query pipeline
 Flow: Parse user query → Embed query → Retrieve chunks → Build prompt → Generate answer → Return response
 """
+import asyncio
 import logging
+import threading
 import time
 import os
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
 
-from embeddings.embedder import embed_query
+from pydantic import TypeAdapter
+
+from embeddings.embedder import embed_query, embed_queries
 from rag.retriever import Retriever
 from rag.prompt_builder import PromptBuilder
-from rag.llm_client import LLMClient, get_llm_client
+from rag.llm_client import LLMClient, get_llm_client, LLM_MAX_CONCURRENCY
+from rag.semantic_cache import SemanticCache, SEMANTIC_CACHE_ENABLED
 from schema.ask_request import AskRequest
 from schema.ask_response import AskResponse, Source
+from schema.retrieval_schema import RetrievedChunkRecord
 
 logger = logging.getLogger(__name__)
 
+# Open the vector store (client handshake, index load) when the engine is built
+# instead of on the first question
+QUERY_ENGINE_WARM_STORE = os.getenv("QUERY_ENGINE_WARM_STORE", "true").lower() in ("1", "true", "yes")
+# Run QueryEngine.warmup() when the WSGI/ASGI application starts
+QUERY_ENGINE_WARMUP = os.getenv("QUERY_ENGINE_WARMUP", "true").lower() in ("1", "true", "yes")
+# Also open the LLM connection during warmup() (off by default: every server
+# process, including runserver's autoreloader, would contact the API at startup)
+QUERY_ENGINE_WARMUP_LLM = os.getenv("QUERY_ENGINE_WARMUP_LLM", "false").lower() in ("1", "true", "yes")
+# Remember "no chunks found" and LLM-error outcomes briefly, so retries of the
+# same question do not rerun the whole pipeline (0 disables)
+NEGATIVE_CACHE_TTL_SECONDS = float(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "60"))
+NEGATIVE_CACHE_SIZE = int(os.getenv("NEGATIVE_CACHE_SIZE", "1024"))
+
+# Answer text when the LLM returns nothing (never cached)
+EMPTY_ANSWER_MESSAGE = "I couldn't generate a response. Please try again."
+
+# Serializes a whole source list in one pydantic-core call
+_SOURCES_ADAPTER = TypeAdapter(List[Source])
+
 # Get min similarity from settings
 # When running in Django context, this will be overridden by settings
 # Default to 0.0 to not filter results by default
@@ -32,6 +60,11 @@ def _get_min_similarity():
     return float(os.getenv("MIN_SIMILARITY_SCORE", "0.0"))
 
 
+def _preview(text: str, n: int = 200) -> str:
+    """First n characters of text, with "..." when it was cut."""
+    return text[:n] + "..." if len(text) > n else text
+
+
 class QueryEngine:
     """
     Main RAG query engine that orchestrates the entire query pipeline.
@@ -42,13 +75,17 @@ class QueryEngine:
     3. Prompt construction
     4. LLM generation
     5. Response formatting
+    
+    Answers to repeated or paraphrased questions are served from a
+    SemanticCache, skipping retrieval and generation.
     """
     
     def __init__(
         self,
         retriever: Optional[Retriever] = None,
         prompt_builder: Optional[PromptBuilder] = None,
-        llm_client: Optional[LLMClient] = None
+        llm_client: Optional[LLMClient] = None,
+        semantic_cache: Optional[SemanticCache] = None
     ):
         """
         Initialize query engine.
@@ -57,14 +94,266 @@ class QueryEngine:
             retriever: Retriever instance (default: creates new)
             prompt_builder: PromptBuilder instance (default: creates new)
             llm_client: LLMClient instance (default: creates new)
+            semantic_cache: SemanticCache instance (default: creates new
+                unless SEMANTIC_CACHE_ENABLED is off)
         """
         min_sim = _get_min_similarity()
         self.retriever = retriever or Retriever(min_similarity=min_sim)
         self.prompt_builder = prompt_builder or PromptBuilder()
         self.llm_client = llm_client
+        if semantic_cache is None and SEMANTIC_CACHE_ENABLED:
+            semantic_cache = SemanticCache()
+        self.semantic_cache = semantic_cache
+        # SemanticCache.make_key(request) -> (stored_at, response), oldest first
+        self._negative_cache: "OrderedDict[str, Tuple[float, AskResponse]]" = OrderedDict()
+        self._negative_lock = threading.Lock()
+        
+        if QUERY_ENGINE_WARM_STORE:
+            self._warm_vector_store()
         
         logger.info("QueryEngine initialized")
     
+    def _warm_vector_store(self) -> None:
+        """Touch the vector store once so its connection and index are loaded before the first query."""
+        store = getattr(self.retriever, "vector_store", None)
+        if store is None:
+            return
+        start_time = time.time()
+        try:
+            # count() is cheap on every store, unlike get_stats() which may scan the collection
+            count = store.count()
+            logger.info(f"Vector store warmed ({count} chunks) in {(time.time() - start_time) * 1000:.0f}ms")
+        except Exception as e:
+            logger.warning(f"Vector store warm-up failed (first query will pay it): {e}")
+    
+    def warmup(self) -> Dict[str, float]:
+        """
+        Pay the one-time costs of the first question up front.
+        
+        Loads the embedding model (one embed_query call) and opens the vector
+        store; with QUERY_ENGINE_WARMUP_LLM, also opens the LLM connection
+        (LLMClient.warm_connection(), no generation). Failures are logged and
+        never raised.
+        
+        Returns:
+            Milliseconds spent per step
+        """
+        timings = {}
+        
+        start_time = time.time()
+        try:
+            embed_query("warmup")
+        except Exception as e:
+            logger.warning(f"Embedder warm-up failed: {e}")
+        timings["embedder"] = (time.time() - start_time) * 1000
+        
+        if not QUERY_ENGINE_WARM_STORE:  # otherwise already done in __init__
+            start_time = time.time()
+            self._warm_vector_store()
+            timings["vector_store"] = (time.time() - start_time) * 1000
+        
+        if QUERY_ENGINE_WARMUP_LLM:
+            start_time = time.time()
+            client = self._resolve_client(None)
+            if client is not None:
+                client.warm_connection()
+            timings["llm"] = (time.time() - start_time) * 1000
+        
+        logger.info(
+            "QueryEngine warmed up: "
+            + ", ".join(f"{step} {ms:.0f}ms" for step, ms in timings.items())
+        )
+        return timings
+    
+    def _resolve_client(self, llm_client: Optional[LLMClient]) -> Optional[LLMClient]:
+        """Use provided client or instance client or get default (None if unavailable)."""
+        client = llm_client or self.llm_client
+        if not client:
+            try:
+                client = get_llm_client()
+            except Exception as e:
+                logger.error(f"Failed to initialize LLM client: {e}")
+                return None
+        return client
+    
+    def _negative_get(self, request: AskRequest) -> Optional[AskResponse]:
+        """Return the recent failed outcome for this request, if any."""
+        if NEGATIVE_CACHE_TTL_SECONDS <= 0:
+            return None
+        key = SemanticCache.make_key(request)
+        with self._negative_lock:
+            entry = self._negative_cache.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] < NEGATIVE_CACHE_TTL_SECONDS:
+                return entry[1]
+            del self._negative_cache[key]
+            return None
+    
+    def _negative_put(self, request: AskRequest, response: AskResponse) -> None:
+        """Remember a failed outcome for NEGATIVE_CACHE_TTL_SECONDS."""
+        if NEGATIVE_CACHE_TTL_SECONDS <= 0:
+            return
+        key = SemanticCache.make_key(request)
+        with self._negative_lock:
+            self._negative_cache.pop(key, None)
+            self._negative_cache[key] = (time.time(), response)
+            while len(self._negative_cache) > NEGATIVE_CACHE_SIZE:
+                self._negative_cache.popitem(last=False)
+    
+    @staticmethod
+    def _error_response(answer: str, start_time: float, chunks_retrieved: int = 0) -> AskResponse:
+        """Build an AskResponse that carries an error or fallback message."""
+        return AskResponse(
+            answer=answer,
+            sources=[],
+            latency_ms=(time.time() - start_time) * 1000,
+            chunks_retrieved=chunks_retrieved
+        )
+    
+    @classmethod
+    def _no_client_response(cls, start_time: float) -> AskResponse:
+        """Response when no LLM client can be created."""
+        return cls._error_response(
+            "Sorry, I'm unable to generate answers at the moment. Please try again later.",
+            start_time
+        )
+    
+    def _prepare(
+        self,
+        request: AskRequest,
+        start_time: float,
+        query_embedding: Any = None
+    ) -> Tuple[Optional[AskResponse], Any, List[RetrievedChunkRecord], List[Dict[str, str]]]:
+        """
+        Steps 1-3: embed the query, retrieve chunks and build the prompt messages.
+        
+        Args:
+            request: AskRequest to prepare
+            start_time: Request start (time.time())
+            query_embedding: Embedding computed by the caller (batch paths); embedded here if None
+        
+        Returns:
+            (response, query_embedding, retrieved_chunks, messages); response
+            is set when the pipeline ends early (error, cache hit, no chunks)
+        """
+        # Same question failed moments ago: answer the same without any work
+        failed = self._negative_get(request)
+        if failed is not None:
+            logger.info("Query answered from negative cache")
+            return failed.model_copy(update={"latency_ms": (time.time() - start_time) * 1000}), None, [], []
+        
+        # Step 1: Embed user query
+        if query_embedding is None:
+            logger.info(f"Embedding query: {request.query[:50]}...")
+            query_embedding = embed_query(request.query)
+        
+        if not query_embedding:
+            logger.error("Failed to generate query embedding")
+            return (
+                self._error_response("Sorry, I encountered an error processing your query.", start_time),
+                None, [], []
+            )
+        
+        # Serve repeated and paraphrased questions without retrieval or generation
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get(request, query_embedding)
+            if cached is not None:
+                latency = (time.time() - start_time) * 1000
+                logger.info(f"Query answered from semantic cache in {latency:.0f}ms")
+                return cached.model_copy(update={"latency_ms": latency}), query_embedding, [], []
+        
+        # Step 2: Retrieve similar chunks
+        logger.info(f"Retrieving top {request.top_k} chunks...")
+        retrieved_chunks = self.retriever.search(
+            query_embedding,
+            top_k=request.top_k
+        )
+        
+        if not retrieved_chunks:
+            logger.warning("No chunks retrieved from vector store")
+            response = self._error_response(
+                "I couldn't find any relevant information in the knowledge base to answer your question. Please try rephrasing your question or check if the data has been indexed.",
+                start_time
+            )
+            self._negative_put(request, response)
+            return response, query_embedding, [], []
+        
+        # Step 3: Build RAG prompt (static system message + dynamic user message)
+        logger.info(f"Building prompt with {len(retrieved_chunks)} chunks...")
+        messages = self.prompt_builder.create_messages(
+            user_query=request.query,
+            retrieved_chunks=retrieved_chunks
+        )
+        return None, query_embedding, retrieved_chunks, messages
+    
+    @staticmethod
+    def _format_sources(retrieved_chunks: List[RetrievedChunkRecord]) -> List[Source]:
+        """Build source citations for the retrieved chunks."""
+        return [
+            Source(
+                url=meta.get("url") or "",
+                title=meta.get("title") or "Untitled",
+                post_id=meta.get("post_id"),
+                topic_id=meta.get("topic_id"),
+                similarity=chunk.similarity,
+                chunk_text=_preview(chunk.text)
+            )
+            for chunk in retrieved_chunks
+            for meta in (chunk.meta or {},)
+        ]
+    
+    def _finish(
+        self,
+        request: AskRequest,
+        query_embedding: Any,
+        retrieved_chunks: List[RetrievedChunkRecord],
+        llm_result: Dict[str, Any],
+        start_time: float,
+        sources: Optional[List[Source]] = None
+    ) -> AskResponse:
+        """Step 5: turn the LLM result into an AskResponse (cached when the LLM returned text)."""
+        if llm_result.get("error"):
+            logger.error(f"LLM error: {llm_result['error']}")
+            response = self._error_response(
+                f"Sorry, I encountered an error: {llm_result['error']}",
+                start_time,
+                chunks_retrieved=len(retrieved_chunks)
+            )
+            self._negative_put(request, response)
+            return response
+        
+        answer = llm_result.get("answer", "")
+        generated = bool(answer)
+        if not generated:
+            answer = EMPTY_ANSWER_MESSAGE
+        
+        # Step 5: Format sources
+        if sources is None:
+            sources = self._format_sources(retrieved_chunks)
+        
+        # Calculate total latency
+        total_latency = (time.time() - start_time) * 1000
+        
+        # Build response
+        response = AskResponse(
+            answer=answer,
+            sources=sources,
+            latency_ms=total_latency,
+            chunks_retrieved=len(retrieved_chunks),
+            model_used=llm_result.get("model")
+        )
+        
+        logger.info(
+            f"Query answered successfully: {len(answer)} chars, "
+            f"{len(sources)} sources, {total_latency:.0f}ms"
+        )
+        
+        if generated and self.semantic_cache is not None:
+            self.semantic_cache.put(request, query_embedding, response)
+        
+        return response
+    
     def answer_question(
         self,
         request: AskRequest,
@@ -89,119 +378,318 @@ class QueryEngine:
         """
         start_time = time.time()
         
-        # Use provided client or instance client or get default
-        client = llm_client or self.llm_client
+        client = self._resolve_client(llm_client)
         if not client:
-            try:
-                client = get_llm_client()
-            except Exception as e:
-                logger.error(f"Failed to initialize LLM client: {e}")
-                return AskResponse(
-                    answer="Sorry, I'm unable to generate answers at the moment. Please try again later.",
-                    sources=[],
-                    latency_ms=(time.time() - start_time) * 1000,
-                    chunks_retrieved=0
-                )
-        
+            return self._no_client_response(start_time)
+        return self._answer(request, client, start_time)
+    
+    def _answer(
+        self,
+        request: AskRequest,
+        client: LLMClient,
+        start_time: float,
+        query_embedding: Any = None
+    ) -> AskResponse:
+        """Run the pipeline for one request with a resolved client; errors become error responses."""
         try:
-            # Step 1: Embed user query
-            logger.info(f"Embedding query: {request.query[:50]}...")
-            query_embedding = embed_query(request.query)
-            
-            if not query_embedding:
-                logger.error("Failed to generate query embedding")
-                return AskResponse(
-                    answer="Sorry, I encountered an error processing your query.",
-                    sources=[],
-                    latency_ms=(time.time() - start_time) * 1000,
-                    chunks_retrieved=0
-                )
+            response, query_embedding, retrieved_chunks, messages = self._prepare(
+                request, start_time, query_embedding
+            )
+            if response is not None:
+                return response
             
-            # Step 2: Retrieve similar chunks
-            logger.info(f"Retrieving top {request.top_k} chunks...")
-            retrieved_chunks = self.retriever.search(
-                query_embedding,
-                top_k=request.top_k
+            # Step 4: Generate answer via LLM
+            logger.info("Generating answer via LLM...")
+            llm_result = client.generate(
+                messages=messages,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature
             )
             
-            if not retrieved_chunks:
-                logger.warning("No chunks retrieved from vector store")
-                return AskResponse(
-                    answer="I couldn't find any relevant information in the knowledge base to answer your question. Please try rephrasing your question or check if the data has been indexed.",
-                    sources=[],
-                    latency_ms=(time.time() - start_time) * 1000,
-                    chunks_retrieved=0
-                )
+            return self._finish(request, query_embedding, retrieved_chunks, llm_result, start_time)
+            
+        except Exception as e:
+            logger.exception(f"Error in query pipeline: {e}")
+            return self._error_response(f"Sorry, I encountered an error: {str(e)}", start_time)
+    
+    async def aanswer_question(
+        self,
+        request: AskRequest,
+        llm_client: Optional[LLMClient] = None
+    ) -> AskResponse:
+        """
+        Async variant of answer_question for use inside an event loop (ASGI).
+        
+        Embedding and retrieval run in a worker thread and generation uses
+        LLMClient.agenerate, so concurrent questions overlap their LLM
+        round trips instead of blocking the loop.
+        
+        Args:
+            request: AskRequest with user query and parameters
+            llm_client: Optional LLM client (uses instance default if not provided)
             
-            # Step 3: Build RAG prompt
-            logger.info(f"Building prompt with {len(retrieved_chunks)} chunks...")
-            prompt = self.prompt_builder.create_prompt(
-                user_query=request.query,
-                retrieved_chunks=retrieved_chunks
+        Returns:
+            AskResponse with answer, sources, and metadata
+        """
+        start_time = time.time()
+        
+        client = self._resolve_client(llm_client)
+        if not client:
+            return self._no_client_response(start_time)
+        return await self._aanswer(request, client, start_time)
+    
+    async def _aanswer(
+        self,
+        request: AskRequest,
+        client: LLMClient,
+        start_time: float,
+        query_embedding: Any = None
+    ) -> AskResponse:
+        """Async _answer: preparation in a worker thread, generation via agenerate."""
+        try:
+            response, query_embedding, retrieved_chunks, messages = await asyncio.to_thread(
+                self._prepare, request, start_time, query_embedding
             )
+            if response is not None:
+                return response
             
             # Step 4: Generate answer via LLM
             logger.info("Generating answer via LLM...")
-            llm_result = client.generate(
-                prompt=prompt,
+            llm_result = await client.agenerate(
+                messages=messages,
                 max_tokens=request.max_tokens,
                 temperature=request.temperature
             )
             
-            if llm_result.get("error"):
-                logger.error(f"LLM error: {llm_result['error']}")
-                return AskResponse(
-                    answer=f"Sorry, I encountered an error: {llm_result['error']}",
-                    sources=[],
-                    latency_ms=(time.time() - start_time) * 1000,
-                    chunks_retrieved=len(retrieved_chunks)
-                )
+            return self._finish(request, query_embedding, retrieved_chunks, llm_result, start_time)
             
-            answer = llm_result.get("answer", "")
-            if not answer:
-                answer = "I couldn't generate a response. Please try again."
+        except Exception as e:
+            logger.exception(f"Error in query pipeline: {e}")
+            return self._error_response(f"Sorry, I encountered an error: {str(e)}", start_time)
+    
+    def _embed_batch(self, requests: List[AskRequest]) -> List[Any]:
+        """Embed all queries in one call; None entries (on failure) are embedded per request later."""
+        try:
+            return embed_queries([request.query for request in requests])
+        except Exception as e:
+            logger.warning(f"Batch query embedding failed, embedding per request: {e}")
+            return [None] * len(requests)
+    
+    def answer_batch(
+        self,
+        requests: List[AskRequest],
+        llm_client: Optional[LLMClient] = None
+    ) -> List[AskResponse]:
+        """
+        Answer several questions together.
+        
+        The queries are embedded in one batch call; retrieval and generation
+        then run concurrently (up to LLM_MAX_CONCURRENCY requests at a time)
+        over the client's shared connection pool.
+        
+        Args:
+            requests: AskRequests to answer
+            llm_client: Optional LLM client (uses instance default if not provided)
             
-            # Step 5: Format sources
-            sources = []
-            for chunk in retrieved_chunks:
-                meta = chunk.meta or {}
-                source = Source(
-                    url=meta.get("url", ""),
-                    title=meta.get("title", "Untitled"),
-                    post_id=meta.get("post_id"),
-                    topic_id=meta.get("topic_id"),
-                    similarity=chunk.similarity,
-                    chunk_text=chunk.text[:200] + "..." if len(chunk.text) > 200 else chunk.text
-                )
-                sources.append(source)
+        Returns:
+            One AskResponse per request, in request order
+        """
+        start_time = time.time()
+        if not requests:
+            return []
+        
+        client = self._resolve_client(llm_client)
+        if not client:
+            return [self._no_client_response(start_time) for _ in requests]
+        
+        embeddings = self._embed_batch(requests)
+        workers = min(len(requests), LLM_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ask-batch") as pool:
+            return list(pool.map(self._answer, requests, repeat(client), repeat(start_time), embeddings))
+    
+    async def aanswer_batch(
+        self,
+        requests: List[AskRequest],
+        llm_client: Optional[LLMClient] = None
+    ) -> List[AskResponse]:
+        """
+        Async variant of answer_batch; generations share the client's
+        LLM_MAX_CONCURRENCY limit for the running event loop.
+        
+        Args:
+            requests: AskRequests to answer
+            llm_client: Optional LLM client (uses instance default if not provided)
             
-            # Calculate total latency
-            total_latency = (time.time() - start_time) * 1000
+        Returns:
+            One AskResponse per request, in request order
+        """
+        start_time = time.time()
+        if not requests:
+            return []
+        
+        client = self._resolve_client(llm_client)
+        if not client:
+            return [self._no_client_response(start_time) for _ in requests]
+        
+        embeddings = await asyncio.to_thread(self._embed_batch, requests)
+        return list(await asyncio.gather(*(
+            self._aanswer(request, client, start_time, embedding)
+            for request, embedding in zip(requests, embeddings)
+        )))
+    
+    @staticmethod
+    def _sources_event(sources: List[Source], chunks_retrieved: int) -> Dict[str, Any]:
+        """First stream event: source citations."""
+        return {
+            "event": "sources",
+            "sources": _SOURCES_ADAPTER.dump_python(sources),
+            "chunks_retrieved": chunks_retrieved
+        }
+    
+    @staticmethod
+    def _done_event(response: AskResponse) -> Dict[str, Any]:
+        """Last stream event: totals for the finished answer."""
+        return {"event": "done", "latency_ms": response.latency_ms, "model_used": response.model_used}
+    
+    def _response_events(self, response: AskResponse) -> Iterator[Dict[str, Any]]:
+        """Stream events for a response that is already complete (cache hit, error)."""
+        yield self._sources_event(response.sources, response.chunks_retrieved)
+        yield {"event": "token", "text": response.answer}
+        yield self._done_event(response)
+    
+    def stream_answer(
+        self,
+        request: AskRequest,
+        llm_client: Optional[LLMClient] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Answer a user question, streaming the answer as it is generated.
+        
+        Runs the same pipeline as answer_question but yields events:
+            {"event": "sources", "sources": [...], "chunks_retrieved": n}  (first)
+            {"event": "token", "text": "..."}  (one per answer piece)
+            {"event": "done", "latency_ms": ..., "model_used": ...}  (last)
+        or {"event": "error", "error": "..."} if generation fails midway or
+        produces no text. Cached answers and early errors arrive as a single
+        token event.
+        
+        Args:
+            request: AskRequest with user query and parameters
+            llm_client: Optional LLM client (uses instance default if not provided)
             
-            # Build response
-            response = AskResponse(
-                answer=answer,
-                sources=sources,
-                latency_ms=total_latency,
-                chunks_retrieved=len(retrieved_chunks),
-                model_used=llm_result.get("model")
-            )
+        Yields:
+            Event dictionaries
+        """
+        start_time = time.time()
+        
+        client = self._resolve_client(llm_client)
+        if not client:
+            yield from self._response_events(self._no_client_response(start_time))
+            return
+        
+        try:
+            response, query_embedding, retrieved_chunks, messages = self._prepare(request, start_time)
+        except Exception as e:
+            logger.exception(f"Error in query pipeline: {e}")
+            response = self._error_response(f"Sorry, I encountered an error: {str(e)}", start_time)
+        if response is not None:
+            yield from self._response_events(response)
+            return
+        
+        # Sources go out before generation starts
+        sources = self._format_sources(retrieved_chunks)
+        yield self._sources_event(sources, len(retrieved_chunks))
+        
+        # Step 4: Stream answer from LLM
+        logger.info("Streaming answer via LLM...")
+        parts = []
+        try:
+            for delta in client.stream(
+                messages=messages,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature
+            ):
+                parts.append(delta)
+                yield {"event": "token", "text": delta}
+        except Exception as e:
+            logger.exception(f"Error streaming answer: {e}")
+            yield {"event": "error", "error": f"Sorry, I encountered an error: {str(e)}"}
+            return
+        
+        answer = "".join(parts).strip()
+        if not answer:
+            logger.error("LLM stream produced no text")
+            yield {"event": "error", "error": f"Sorry, {EMPTY_ANSWER_MESSAGE}"}
+            return
+        
+        llm_result = {"answer": answer, "model": client.model}
+        response = self._finish(request, query_embedding, retrieved_chunks, llm_result, start_time, sources)
+        yield self._done_event(response)
+    
+    async def astream_answer(
+        self,
+        request: AskRequest,
+        llm_client: Optional[LLMClient] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async variant of stream_answer (same events), using LLMClient.astream.
+        
+        Args:
+            request: AskRequest with user query and parameters
+            llm_client: Optional LLM client (uses instance default if not provided)
             
-            logger.info(
-                f"Query answered successfully: {len(answer)} chars, "
-                f"{len(sources)} sources, {total_latency:.0f}ms"
+        Yields:
+            Event dictionaries
+        """
+        start_time = time.time()
+        
+        client = self._resolve_client(llm_client)
+        if not client:
+            for event in self._response_events(self._no_client_response(start_time)):
+                yield event
+            return
+        
+        try:
+            response, query_embedding, retrieved_chunks, messages = await asyncio.to_thread(
+                self._prepare, request, start_time
             )
-            
-            return response
-            
         except Exception as e:
             logger.exception(f"Error in query pipeline: {e}")
-            return AskResponse(
-                answer=f"Sorry, I encountered an error: {str(e)}",
-                sources=[],
-                latency_ms=(time.time() - start_time) * 1000,
-                chunks_retrieved=0
-            )
+            response = self._error_response(f"Sorry, I encountered an error: {str(e)}", start_time)
+        if response is not None:
+            for event in self._response_events(response):
+                yield event
+            return
+        
+        # Sources go out before generation starts
+        sources = self._format_sources(retrieved_chunks)
+        yield self._sources_event(sources, len(retrieved_chunks))
+        
+        # Step 4: Stream answer from LLM
+        logger.info("Streaming answer via LLM...")
+        parts = []
+        try:
+            async for delta in client.astream(
+                messages=messages,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature
+            ):
+                parts.append(delta)
+                yield {"event": "token", "text": delta}
+        except Exception as e:
+            logger.exception(f"Error streaming answer: {e}")
+            yield {"event": "error", "error": f"Sorry, I encountered an error: {str(e)}"}
+            return
+        
+        answer = "".join(parts).strip()
+        if not answer:
+            logger.error("LLM stream produced no text")
+            yield {"event": "error", "error": f"Sorry, {EMPTY_ANSWER_MESSAGE}"}
+            return
+        
+        llm_result = {"answer": answer, "model": client.model}
+        response = self._finish(request, query_embedding, retrieved_chunks, llm_result, start_time, sources)
+        yield self._done_event(response)
 
 
 # Singleton instance (optional)
@@ -222,3 +710,12 @@ def get_query_engine(**kwargs) -> QueryEngine:
         _query_engine_instance = QueryEngine(**kwargs)
     return _query_engine_instance
 
+
+def warmup_query_engine() -> None:
+    """Build the query engine singleton and warm it up, unless QUERY_ENGINE_WARMUP is off."""
+    if not QUERY_ENGINE_WARMUP:
+        return
+    try:
+        get_query_engine().warmup()
+    except Exception as e:
+        logger.exception(f"Query engine warm-up failed: {e}")
@@ -3,17 +3,30 @@ Retriever - Perform semantic search in vector DB.
 
 Purpose: Perform semantic search in vector DB
 Input: A query embedding
-Output: A list of RetrievedChunk objects
+Output: A list of RetrievedChunkRecord objects
 Used by: query_engine.py
 """
+import os
 import logging
 from typing import List, Optional
 
+import numpy as np
+
 from vectorstore.vector_store import get_vector_store
-from schema.retrieval_schema import RetrievedChunk
+from schema.retrieval_schema import RetrievedChunkRecord
 
 logger = logging.getLogger(__name__)
 
+# Drop near-duplicate hits (the same post chunked twice, quoted replies) so the
+# prompt budget goes to distinct content
+RETRIEVER_DEDUP = os.getenv("RETRIEVER_DEDUP", "true").lower() in ("1", "true", "yes")
+RETRIEVER_DEDUP_WORDS = int(os.getenv("RETRIEVER_DEDUP_WORDS", "32"))  # Leading words compared
+
+
+def _fingerprint(text: str) -> int:
+    """Fingerprint of a chunk: its first RETRIEVER_DEDUP_WORDS words, lowercased, whitespace-normalized."""
+    return hash(tuple(text.lower().split()[:RETRIEVER_DEDUP_WORDS]))
+
 
 class Retriever:
     """
@@ -39,20 +52,22 @@ class Retriever:
         self,
         query_embedding: List[float],
         top_k: int = 5,
-        min_similarity: Optional[float] = None
-    ) -> List[RetrievedChunk]:
+        min_similarity: Optional[float] = None,
+        dedup: bool = RETRIEVER_DEDUP
+    ) -> List[RetrievedChunkRecord]:
         """
         Search for similar chunks in vector database.
         
         Args:
-            query_embedding: Query vector embedding
+            query_embedding: Query vector embedding (list or 1D numpy array)
             top_k: Number of results to return
             min_similarity: Override instance min_similarity (optional)
+            dedup: Drop hits whose fingerprint matches a higher-scoring hit
             
         Returns:
-            List of RetrievedChunk objects sorted by similarity (highest first)
+            List of RetrievedChunkRecord objects sorted by similarity (highest first)
         """
-        if not query_embedding:
+        if query_embedding is None or len(query_embedding) == 0:
             logger.warning("Empty query embedding provided")
             return []
         
@@ -63,32 +78,44 @@ class Retriever:
         min_sim = min_similarity if min_similarity is not None else self.min_similarity
         
         try:
-            # Search vector store
-            results = self.vector_store.search(query_embedding, top_k=top_k)
+            # Search vector store; it applies min_similarity and returns hits nearest first
+            results = self.vector_store.search(query_embedding, top_k=top_k, min_similarity=min_sim)
             
             if not results:
                 logger.debug("No results found in vector store")
                 return []
             
-            # Convert to RetrievedChunk objects
-            retrieved_chunks = []
-            for result in results:
-                similarity = result.get("score", 0.0)
-                
-                # Filter by minimum similarity
-                if similarity < min_sim:
-                    continue
-                
-                chunk = RetrievedChunk(
-                    text=result.get("text", ""),
-                    similarity=float(similarity),
-                    meta=result.get("meta", {}),
+            if dedup:
+                # Hits come best first, so the highest-scoring copy is the one kept
+                seen = set()
+                unique = []
+                for result in results:
+                    fingerprint = _fingerprint(result.get("text") or "")
+                    if fingerprint not in seen:
+                        seen.add(fingerprint)
+                        unique.append(result)
+                if len(unique) < len(results):
+                    logger.debug(f"Dropped {len(results) - len(unique)} duplicate chunks")
+                results = unique
+            
+            # Scores as one array, clipped to the 0..1 similarity range
+            scores = np.fromiter(
+                (result.get("score", 0.0) for result in results),
+                dtype=np.float64,
+                count=len(results)
+            )
+            similarities = np.clip(scores, 0.0, 1.0).tolist()
+            
+            # Convert to RetrievedChunkRecord objects (slotted, unvalidated)
+            retrieved_chunks = [
+                RetrievedChunkRecord(
+                    text=result.get("text") or "",
+                    similarity=similarity,
+                    meta=result.get("meta") or {},
                     chunk_id=result.get("chunk_id")
                 )
-                retrieved_chunks.append(chunk)
-            
-            # Sort by similarity (highest first) - should already be sorted, but ensure it
-            retrieved_chunks.sort(key=lambda x: x.similarity, reverse=True)
+                for result, similarity in zip(results, similarities)
+            ]
             
             logger.info(
                 f"Retrieved {len(retrieved_chunks)} chunks "
@@ -109,3 +136,22 @@ class Retriever:
             logger.exception(f"Error getting stats: {e}")
             return {}
 
+
+
+# Singleton instance (optional)
+_retriever_instance = None
+
+def get_retriever(**kwargs) -> Retriever:
+    """
+    Get or create retriever singleton.
+    
+    Args:
+        **kwargs: Arguments to pass to Retriever constructor
+        
+    Returns:
+        Retriever instance
+    """
+    global _retriever_instance
+    if _retriever_instance is None:
+        _retriever_instance = Retriever(**kwargs)
+    return _retriever_instance
@@ -0,0 +1,208 @@
+"""
+Semantic Cache - Reuse answers for repeated or paraphrased questions.
+
+Purpose: Skip retrieval and LLM generation for queries answered recently
+Input: An AskRequest and its query embedding
+Output: A cached AskResponse, or None on a miss
+Used by: query_engine.py
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from schema.ask_request import AskRequest
+from schema.ask_response import AskResponse
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1024"))  # Max cached answers
+# Cosine similarity at or above which a different query counts as a paraphrase
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+# Answers expire so a re-ingested knowledge base is picked up
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+
+
+class SemanticCache:
+    """
+    Thread-safe TTL + LRU cache of answers, looked up in two tiers.
+
+    1. Exact: SHA1 of the normalized (stripped, lowercased) query plus the
+       generation parameters (top_k, max_tokens, temperature).
+    2. Semantic: cosine similarity of the query embedding against all cached
+       query embeddings (one matrix-vector product over a preallocated
+       (max_size, dim) float32 matrix); the best match with the same
+       parameters is a hit if it reaches the threshold.
+    """
+
+    def __init__(
+        self,
+        max_size: int = SEMANTIC_CACHE_SIZE,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of cached answers (LRU eviction beyond)
+            threshold: Minimum cosine similarity for a semantic hit
+            ttl_seconds: Age after which an answer is no longer served
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # exact key -> row of the embedding matrix, in LRU order
+        self._rows: "OrderedDict[str, int]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None  # (max_size, dim), allocated on first put
+        self._row_params = np.full(max_size, -1, dtype=np.int64)  # params id per row, -1 = free
+        self._row_keys: List[Optional[str]] = [None] * max_size
+        self._row_entries: List[Optional[Tuple[float, AskResponse]]] = [None] * max_size
+        self._free = list(range(max_size - 1, -1, -1))
+        self._used = 0  # rows below this index have been written at least once
+        self._param_ids: Dict[Tuple[Any, ...], int] = {}
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(request: AskRequest) -> str:
+        """Build the exact-tier key from the normalized query and generation parameters."""
+        raw = f"{request.query.strip().lower()}|{request.top_k}|{request.max_tokens}|{request.temperature}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _params(request: AskRequest) -> Tuple[Any, ...]:
+        return (request.top_k, request.max_tokens, request.temperature)
+
+    @staticmethod
+    def _normalize(query_embedding: Sequence[float]) -> np.ndarray:
+        q = np.asarray(query_embedding, dtype=np.float32).ravel()
+        return q / (np.linalg.norm(q) + 1e-12)
+
+    def get(self, request: AskRequest, query_embedding: Sequence[float]) -> Optional[AskResponse]:
+        """
+        Look up a cached answer for request.
+
+        Args:
+            request: Incoming AskRequest
+            query_embedding: Embedding of request.query
+
+        Returns:
+            The cached AskResponse (latency_ms is that of the original
+            request), or None on a miss
+        """
+        key = self.make_key(request)
+        now = time.time()
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None and self._fresh(row, now):
+                self._rows.move_to_end(key)
+                self.exact_hits += 1
+                return self._row_entries[row][1]
+
+            param_id = self._param_ids.get(self._params(request))
+            if param_id is not None and self._vectors is not None and self._used:
+                q = self._normalize(query_embedding)
+                if q.shape[0] == self._vectors.shape[1]:
+                    sims = self._vectors[:self._used] @ q
+                    sims[self._row_params[:self._used] != param_id] = -np.inf
+                    best = int(np.argmax(sims))
+                    if sims[best] >= self.threshold and self._fresh(best, now):
+                        self._rows.move_to_end(self._row_keys[best])
+                        self.semantic_hits += 1
+                        return self._row_entries[best][1]
+
+            self.misses += 1
+            return None
+
+    def put(self, request: AskRequest, query_embedding: Sequence[float], response: AskResponse) -> None:
+        """
+        Cache the answer to request.
+
+        Args:
+            request: AskRequest that was answered
+            query_embedding: Embedding of request.query
+            response: Successful AskResponse to serve for matching queries
+        """
+        if self.max_size <= 0 or query_embedding is None or len(query_embedding) == 0:
+            return
+        q = self._normalize(query_embedding)
+        key = self.make_key(request)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != q.shape[0]:
+                # First entry, or the embedding model changed: start over at this dimension
+                self._reset()
+                self._vectors = np.zeros((self.max_size, q.shape[0]), dtype=np.float32)
+
+            row = self._rows.pop(key, None)
+            if row is None:
+                if not self._free:
+                    # Evict the least recently used answer and reuse its row
+                    _, row = self._rows.popitem(last=False)
+                else:
+                    row = self._free.pop()
+
+            param_id = self._param_ids.setdefault(self._params(request), len(self._param_ids))
+            self._vectors[row] = q
+            self._row_params[row] = param_id
+            self._row_keys[row] = key
+            self._row_entries[row] = (time.time(), response)
+            self._rows[key] = row
+            self._used = max(self._used, row + 1)
+
+    def _fresh(self, row: int, now: float) -> bool:
+        """True if row holds an unexpired answer; frees it otherwise (lock held)."""
+        entry = self._row_entries[row]
+        if entry is None:
+            return False
+        if now - entry[0] <= self.ttl_seconds:
+            return True
+        del self._rows[self._row_keys[row]]
+        self._row_params[row] = -1
+        self._row_keys[row] = None
+        self._row_entries[row] = None
+        self._free.append(row)
+        return False
+
+    def _reset(self) -> None:
+        """Drop all entries (lock held)."""
+        self._rows.clear()
+        self._vectors = None
+        self._row_params.fill(-1)
+        self._row_keys = [None] * self.max_size
+        self._row_entries = [None] * self.max_size
+        self._free = list(range(self.max_size - 1, -1, -1))
+        self._used = 0
+        self._param_ids.clear()
+
+    def clear(self) -> None:
+        """Drop all cached answers and reset statistics (e.g. after re-ingestion)."""
+        with self._lock:
+            self._reset()
+            self.exact_hits = 0
+            self.semantic_hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return size and hit statistics."""
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            total = hits + self.misses
+            return {
+                "size": len(self._rows),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0
+            }
@@ -5,8 +5,8 @@ Purpose: Validate and structure the incoming user query
 Input: JSON body from frontend
 Returns to: query_engine.py
 """
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import List, Optional
 
 
 class AskRequest(BaseModel):
@@ -24,18 +24,36 @@ class AskRequest(BaseModel):
     max_tokens: Optional[int] = Field(default=None, ge=1, le=4000, description="Max tokens for response")
     temperature: Optional[float] = Field(default=None, ge=0.0, le=2.0, description="LLM temperature")
     
-    @validator('query')
+    @field_validator('query')
+    @classmethod
     def query_not_empty(cls, v):
         """Ensure query is not just whitespace."""
         if not v or not v.strip():
             raise ValueError("Query cannot be empty")
         return v.strip()
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "What is the reading club about?",
-                "top_k": 3
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "query": "What is the reading club about?",
+            "top_k": 3
         }
+    })
 
+
+class AskBatchRequest(BaseModel):
+    """
+    Request schema for the /ask/batch endpoint.
+    
+    Attributes:
+        requests: Questions to answer together (1 to 32)
+    """
+    requests: List[AskRequest] = Field(..., min_length=1, max_length=32, description="Questions to answer")
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "requests": [
+                {"query": "What is the reading club about?", "top_k": 3},
+                {"query": "When does the club meet?"}
+            ]
+        }
+    })
@@ -4,7 +4,7 @@ Ask Response Schema - Structures the final API response.
 Purpose: Structure the final API response
 Returns to: frontend UI
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Any, Optional
 
 
@@ -35,20 +35,30 @@ class AskResponse(BaseModel):
     chunks_retrieved: int = Field(default=0, ge=0, description="Number of chunks retrieved")
     model_used: Optional[str] = Field(None, description="LLM model identifier")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "answer": "The reading club is a community discussion forum...",
-                "sources": [
-                    {
-                        "url": "https://discourse.example.com/t/topic/123",
-                        "title": "Reading Club Introduction",
-                        "similarity": 0.85
-                    }
-                ],
-                "latency_ms": 1532.5,
-                "chunks_retrieved": 3,
-                "model_used": "gpt-4"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "answer": "The reading club is a community discussion forum...",
+            "sources": [
+                {
+                    "url": "https://discourse.example.com/t/topic/123",
+                    "title": "Reading Club Introduction",
+                    "similarity": 0.85
+                }
+            ],
+            "latency_ms": 1532.5,
+            "chunks_retrieved": 3,
+            "model_used": "gpt-4"
         }
+    })
 
+
+class AskBatchResponse(BaseModel):
+    """
+    Response schema for the /ask/batch endpoint.
+    
+    Attributes:
+        responses: One AskResponse per request, in request order
+        latency_ms: Processing time of the whole batch in milliseconds
+    """
+    responses: List[AskResponse] = Field(default_factory=list, description="Answers in request order")
+    latency_ms: float = Field(..., ge=0, description="Batch latency in milliseconds")
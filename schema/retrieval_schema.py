@@ -3,9 +3,38 @@ Retrieval schema for vector database chunks.
 
 This schema ensures every chunk inserted into vector DB is structured uniformly.
 Also includes schema for retrieved chunks during query time.
+
+The pydantic models validate data at API boundaries; ChunkRecord and
+RetrievedChunkRecord are their slotted dataclass counterparts for passing
+chunks between pipeline stages, where per-object validation and __dict__
+are pure overhead.
 """
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from dataclasses import dataclass, field
+from typing import Annotated, List, Dict, Any, Optional
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, PlainValidator, WithJsonSchema
+
+
+def _to_vector(value: Any) -> np.ndarray:
+    """Validate an embedding as a 1-D float32 ndarray (float32 arrays are not copied)."""
+    try:
+        vector = np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"embedding must be a sequence of numbers: {e}") from e
+    if vector.ndim != 1:
+        raise ValueError(f"embedding must be one-dimensional, got shape {vector.shape}")
+    return vector
+
+
+# Embedding vector: validated to a 1-D float32 ndarray (typically a row view
+# of one (N, D) matrix); a list of floats in JSON
+Vector = Annotated[
+    np.ndarray,
+    PlainValidator(_to_vector),
+    PlainSerializer(lambda vector: vector.tolist(), return_type=List[float], when_used="json"),
+    WithJsonSchema({"type": "array", "items": {"type": "number"}}),
+]
 
 
 class ChunkSchema(BaseModel):
@@ -15,7 +44,12 @@ class ChunkSchema(BaseModel):
     Attributes:
         chunk_id: Unique identifier for the chunk (e.g., "post_12_chunk_0")
         text: The actual text content of the chunk
-        embedding: Vector embedding of the text (List[float])
+        embedding: Vector embedding of the text, validated to a float32
+            ndarray of shape (D,) (lists are converted); empty when
+            embedding_int8 is set
+        embedding_int8: int8 embedding (ndarray.tobytes()), optional; the
+            vector is embedding_int8 * embedding_scale
+        embedding_scale: Per-vector scale of embedding_int8, optional
         meta: Metadata dictionary containing:
             - post_id: Discourse post ID
             - topic_id: Discourse topic ID
@@ -27,29 +61,33 @@ class ChunkSchema(BaseModel):
     """
     chunk_id: str = Field(..., description="Unique chunk identifier")
     text: str = Field(..., description="Chunk text content")
-    embedding: List[float] = Field(..., description="Embedding vector")
+    embedding: Vector = Field(
+        default_factory=lambda: np.empty(0, dtype=np.float32),
+        description="Embedding vector (float32)"
+    )
+    embedding_int8: Optional[bytes] = Field(None, description="int8 embedding vector")
+    embedding_scale: Optional[float] = Field(None, description="Scale of the int8 embedding vector")
     meta: Dict[str, Any] = Field(
         default_factory=dict,
         description="Metadata dictionary with post_id, topic_id, url, title, timestamp, chunk_index"
     )
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "chunk_id": "post_12_chunk_0",
-                "text": "This is paragraph one...",
-                "embedding": [0.123, 0.532, 0.891, ...],
-                "meta": {
-                    "post_id": "12",
-                    "topic_id": "5",
-                    "url": "https://discourse.example.com/t/topic-slug/5/1",
-                    "title": "Topic Title",
-                    "timestamp": "2024-01-01T00:00:00Z",
-                    "chunk_index": 0,
-                    "author": "username"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "chunk_id": "post_12_chunk_0",
+            "text": "This is paragraph one...",
+            "embedding": [0.123, 0.532, 0.891, ...],
+            "meta": {
+                "post_id": "12",
+                "topic_id": "5",
+                "url": "https://discourse.example.com/t/topic-slug/5/1",
+                "title": "Topic Title",
+                "timestamp": "2024-01-01T00:00:00Z",
+                "chunk_index": 0,
+                "author": "username"
             }
         }
+    })
 
 
 class RetrievedChunk(BaseModel):
@@ -77,21 +115,73 @@ class RetrievedChunk(BaseModel):
     )
     chunk_id: Optional[str] = Field(None, description="Chunk identifier")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "text": "The reading club is a community discussion forum...",
-                "similarity": 0.85,
-                "chunk_id": "post_12_chunk_0",
-                "meta": {
-                    "post_id": "12",
-                    "topic_id": "5",
-                    "url": "https://discourse.example.com/t/topic-slug/5/1",
-                    "title": "Topic Title",
-                    "timestamp": "2024-01-01T00:00:00Z",
-                    "chunk_index": 0,
-                    "author": "username"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "text": "The reading club is a community discussion forum...",
+            "similarity": 0.85,
+            "chunk_id": "post_12_chunk_0",
+            "meta": {
+                "post_id": "12",
+                "topic_id": "5",
+                "url": "https://discourse.example.com/t/topic-slug/5/1",
+                "title": "Topic Title",
+                "timestamp": "2024-01-01T00:00:00Z",
+                "chunk_index": 0,
+                "author": "username"
             }
         }
+    })
+
+
+@dataclass(slots=True)
+class ChunkRecord:
+    """
+    Internal chunk ready for vector DB insertion (fields as in ChunkSchema).
+    
+    Built by embed_chunks; not validated.
+    """
+    chunk_id: str
+    text: str
+    embedding: Any = field(default_factory=list)  # float32 ndarray row view, or list
+    embedding_int8: Optional[bytes] = None
+    embedding_scale: Optional[float] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+    # Row of a PostMetaTable holding this chunk's post metadata (meta is
+    # then left empty and joined in at insert time)
+    post_ref: Optional[int] = None
+    chunk_index: int = 0
 
+
+@dataclass(slots=True)
+class PostMetaTable:
+    """
+    Post-level metadata stored once per post.
+    
+    Every chunk of a post has the same post_id, topic_id, url, title,
+    timestamp and author; ChunkRecords refer to the post's row (post_ref)
+    instead of each carrying a copy, and the per-chunk meta dict is only
+    built when the chunk is inserted.
+    """
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    
+    def add(self, post_meta: Dict[str, Any]) -> int:
+        """Append a post's metadata and return its row (post_ref)."""
+        self.rows.append(post_meta)
+        return len(self.rows) - 1
+    
+    def chunk_meta(self, post_ref: int, chunk_index: int) -> Dict[str, Any]:
+        """Full metadata dict for chunk chunk_index of the post in row post_ref."""
+        return {**self.rows[post_ref], "chunk_index": chunk_index}
+
+
+@dataclass(slots=True)
+class RetrievedChunkRecord:
+    """
+    Internal chunk retrieved at query time (fields as in RetrievedChunk).
+    
+    Built by the retriever, which clips similarity to 0..1; not validated.
+    """
+    text: str
+    similarity: float
+    meta: Dict[str, Any] = field(default_factory=dict)
+    chunk_id: Optional[str] = None
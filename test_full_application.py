@@ -13,6 +13,7 @@ import os
 import sys
 import json
 import time
+import itertools
 from pathlib import Path
 
 # Add project to path
@@ -39,10 +40,9 @@ if '*' not in settings.ALLOWED_HOSTS:
 from django.test import Client
 
 # Import application modules
-from ingestion.html_parser import html_to_text
-from ingestion.cleaner import normalize_text
-from ingestion.chunker import split_into_chunks
+from ingestion.ingest_pipeline import process_posts_parallel
 from embeddings.embedder import embed_chunks
+from schema.retrieval_schema import PostMetaTable
 from vectorstore.vector_store import get_vector_store, insert_chunks
 from dotenv import load_dotenv
 
@@ -235,75 +235,27 @@ def run_ingestion_demo():
         print_error(f"Vector store initialization failed: {e}")
         return False
     
-    # Process posts
-    all_chunks = []
-    processed_count = 0
-    
+    # Process posts: parse, clean and chunk all posts as one batch
+    # (spread over worker processes when there are enough posts)
     print_info("Processing posts through pipeline...")
-    for i, post in enumerate(posts, 1):
-        try:
-            # Parse HTML
-            html_content = post.get("content", "")
-            print("html_content : ", html_content)
-            time.sleep(10)
-
-            parsed = html_to_text(html_content)
-            print("parsed : ", parsed)
-            time.sleep(10)
-
-            text = parsed.get("text", "")
-            print("text : ", text)
-            time.sleep(10)
-
-
-            if not text:
-                print_warning(f"Post {i}: No text extracted")
-                continue
-            
-            # Clean text
-            cleaned_text = normalize_text(text)
-            print("cleaned_text : ", cleaned_text)
-            
-            if not cleaned_text:
-                print_warning(f"Post {i}: Text too short after cleaning")
-                continue
-            
-            # Chunk text
-            chunks = split_into_chunks(cleaned_text)
-            print("chunks : ", chunks)
-            time.sleep(10)
-
-            if not chunks:
-                print_warning(f"Post {i}: No chunks created")
-                continue
-            
-            # Enrich chunks with metadata
-            for chunk in chunks:
-                print("chunk : ", chunk)
-                time.sleep(10)
-                print("post : ", post)
-                time.sleep(10)
-
-                chunk["meta"] = {
-                    "post_id": str(post.get("id", "")),
-                    "topic_id": str(post.get("topic_id", "")),
-                    "url": post.get("url", ""),
-                    "title": post.get("title", ""),
-                    "timestamp": post.get("created_at", ""),
-                    "chunk_index": chunk.get("chunk_index", 0),
-                    "author": post.get("username") or post.get("name", ""),
-                }
-            
-            all_chunks.extend(chunks)
-            print("all_chunks : ", all_chunks)
-            time.sleep(10)
-
-            processed_count += 1
+    try:
+        results = process_posts_parallel(posts)
+    except Exception as e:
+        print_error(f"Processing failed - {e}")
+        return False
+    
+    # A post that fails is reported and skipped; the rest carry on
+    for i, (chunks, error_msg) in enumerate(results, 1):
+        if error_msg:
+            print_error(f"Post {i}: Processing failed - {error_msg}")
+        elif chunks:
             print_success(f"Post {i}: Created {len(chunks)} chunks")
-            
-        except Exception as e:
-            print_error(f"Post {i}: Processing failed - {e}")
-            continue
+        else:
+            print_warning(f"Post {i}: Skipped (too short or no chunks created)")
+    
+    chunk_lists = [chunks for chunks, _ in results]
+    all_chunks = list(itertools.chain.from_iterable(chunk_lists))
+    processed_count = sum(1 for chunks in chunk_lists if chunks)
     
     if not all_chunks:
         print_error("No chunks created. Cannot continue.")
@@ -315,7 +267,9 @@ def run_ingestion_demo():
     # Generate embeddings
     print_info("Generating embeddings...")
     try:
-        embedded_chunks = embed_chunks(all_chunks)
+        # Post metadata is kept once per post and joined in at insert
+        post_table = PostMetaTable()
+        embedded_chunks = embed_chunks(all_chunks, cache=True, post_table=post_table)
         print("embedded_chunks : ", embedded_chunks)
         time.sleep(10)
         print_success(f"Generated embeddings for {len(embedded_chunks)} chunks")
@@ -326,7 +280,7 @@ def run_ingestion_demo():
     # Insert into vector store
     print_info("Inserting chunks into vector store...")
     try:
-        result = insert_chunks(store, embedded_chunks)
+        result = insert_chunks(store, embedded_chunks, post_table=post_table)
         print("result : ", result)
         time.sleep(10)
 
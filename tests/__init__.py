@@ -0,0 +1,5 @@
+"""
+Unit tests for the RAG pipeline components.
+
+Run with: python -m unittest discover tests
+"""
@@ -0,0 +1,110 @@
+"""Tests for the persistent sqlite embedding cache (embeddings.cache, embed_texts_cached)."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from embeddings import cache as embed_cache
+from embeddings import embedder
+
+
+class _StubClient:
+    """Remote-style client: every text embeds to a constant vector, batches with "bad" fail."""
+    use_remote = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.texts = []
+
+    def embed_many_np(self, batches):
+        self.texts.extend(t for batch in batches for t in batch)
+        return [
+            RuntimeError("embedding API down") if any("bad" in t for t in batch)
+            else np.full((len(batch), self.dim), 0.5, dtype=np.float32)
+            for batch in batches
+        ]
+
+
+class EmbeddingCacheTestCase(unittest.TestCase):
+    """Points embeddings.cache at a fresh database in a temp directory."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for patcher in (
+            mock.patch.object(embed_cache, "EMBED_CACHE_DB", str(Path(tmp.name) / "embeddings.sqlite")),
+            mock.patch.object(embed_cache, "_conn", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self._close)
+
+    @staticmethod
+    def _close():
+        if embed_cache._conn is not None:
+            embed_cache._conn.close()
+
+
+class SqliteCacheTests(EmbeddingCacheTestCase):
+    def test_round_trip_as_float16(self):
+        hashes = [embed_cache.text_hash(t) for t in ("a", "b")]
+        vectors = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float32)
+        embed_cache.put_cached_many(hashes, vectors, model="m")
+        found = embed_cache.get_cached_many(hashes + [embed_cache.text_hash("c")], model="m")
+        self.assertEqual(set(found), set(hashes))
+        self.assertEqual(found[hashes[1]].dtype, np.float16)
+        np.testing.assert_allclose(found[hashes[1]], vectors[1], atol=1e-3)
+
+    def test_models_do_not_share_vectors(self):
+        h = embed_cache.text_hash("a")
+        embed_cache.put_cached(h, [1.0, 2.0], model="m1")
+        self.assertIsNone(embed_cache.get_cached(h, model="m2"))
+        self.assertEqual(embed_cache.get_cached(h, model="m1"), [1.0, 2.0])
+
+    def test_put_replaces_and_clear_is_per_model(self):
+        h = embed_cache.text_hash("a")
+        embed_cache.put_cached(h, [1.0], model="m1")
+        embed_cache.put_cached(h, [2.0], model="m1")
+        embed_cache.put_cached(h, [3.0], model="m2")
+        self.assertEqual(embed_cache.get_cached(h, model="m1"), [2.0])
+        embed_cache.clear("m1")
+        self.assertIsNone(embed_cache.get_cached(h, model="m1"))
+        self.assertEqual(embed_cache.get_cached(h, model="m2"), [3.0])
+
+    def test_lookups_larger_than_one_query(self):
+        n = embed_cache._SQLITE_MAX_PARAMS * 2 + 7
+        hashes = [embed_cache.text_hash(str(i)) for i in range(n)]
+        embed_cache.put_cached_many(hashes, np.arange(n, dtype=np.float32).reshape(-1, 1), model="m")
+        found = embed_cache.get_cached_many(hashes, model="m")
+        self.assertEqual(len(found), n)
+        self.assertEqual(float(found[hashes[-1]][0]), float(np.float16(n - 1)))
+
+
+class EmbedTextsCachedTests(EmbeddingCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = _StubClient(embedder.EMBEDDING_DIMENSION)
+        patcher = mock.patch.object(embedder, "_get_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_second_run_only_embeds_misses(self):
+        first = embedder.embed_texts_cached(["x", "y"], batch_size=1)
+        self.client.texts.clear()
+        second = embedder.embed_texts_cached(["y", "z", "x"], batch_size=1)
+        self.assertEqual(self.client.texts, ["z"])
+        np.testing.assert_array_equal(second[[2, 0]], first)
+
+    def test_fallback_rows_are_not_cached(self):
+        first = embedder.embed_texts_cached(["good", "bad"], batch_size=1)
+        self.assertEqual(first.shape, (2, embedder.EMBEDDING_DIMENSION))
+        self.client.texts.clear()
+        embedder.embed_texts_cached(["good", "bad"], batch_size=1)
+        # The failed text goes back to the model instead of being served its fallback vector
+        self.assertEqual(self.client.texts, ["bad"])
+
+
+if __name__ == "__main__":
+    unittest.main()
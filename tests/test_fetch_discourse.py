@@ -0,0 +1,56 @@
+"""Tests for the Discourse fetcher (ingestion.fetch_discourse): Post records and the raw post dump."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ingestion import fetch_discourse
+from ingestion.fetch_discourse import Post
+
+
+def _posts():
+    return [
+        Post(id=i, topic_id=1, post_number=i, content=f"<p>post {i}</p>", created_at="2024-01-01T00:00:00Z",
+             username="user", name="User", title="Topic", slug="topic", url=f"https://forum.example/t/topic/1/{i}")
+        for i in (1, 2)
+    ]
+
+
+class RawDumpTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # Keep the dump out of the source tree
+        self.sample_dir = Path(tmp.name) / "sample_data"
+        for patcher in (
+            mock.patch.object(fetch_discourse, "SAMPLE_DIR", self.sample_dir),
+            mock.patch.object(fetch_discourse, "HTTPX_AVAILABLE", False),
+            mock.patch.object(fetch_discourse, "CACHE_TTL_HOURS", 0),
+            mock.patch.object(fetch_discourse, "_iter_discourse_sync", lambda category, min_posts: iter(_posts())),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_fetch_writes_one_dump_that_round_trips(self):
+        posts = fetch_discourse.fetch_discourse_posts(category="topic", min_posts=2)
+        self.assertEqual(posts, _posts())
+        dumps = list(self.sample_dir.glob("discourse_raw_*.json"))
+        self.assertEqual(len(dumps), 1)
+        records = fetch_discourse._parse_json(dumps[0].read_bytes())
+        self.assertEqual([Post.from_dict(record) for record in records], posts)
+
+
+class PostFromDictTests(unittest.TestCase):
+    def test_unknown_keys_are_ignored(self):
+        post = Post.from_dict({"id": 5, "topic_id": 1, "content": "<p>hi</p>", "like_count": 3})
+        self.assertEqual((post.id, post.topic_id, post.content, post.url), (5, 1, "<p>hi</p>", ""))
+
+    def test_missing_ids_raise(self):
+        with self.assertRaisesRegex(ValueError, "id, topic_id"):
+            Post.from_dict({"content": "<p>hi</p>"})
+        with self.assertRaisesRegex(ValueError, "topic_id"):
+            Post.from_dict({"id": 5, "topic_id": ""})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+"""Tests for the ingestion pipeline (post streaming, content-hash dedupe and the staged parse/embed/insert run)."""
+import importlib.util
+import itertools
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ingestion import ingest_pipeline as pipeline
+from ingestion.fetch_discourse import Post
+
+
+def _sentence_chunks(text):
+    """Deterministic stand-in for split_into_chunks: one chunk per sentence."""
+    return [
+        {"chunk_id": f"seq_{i}", "chunk_index": i, "text": sentence, "meta": {}}
+        for i, sentence in enumerate(s.strip() for s in text.split(". ") if s.strip())
+    ]
+
+
+def _post(post_id, content):
+    return Post(
+        id=post_id, topic_id=100 + post_id, post_number=1, content=content,
+        created_at="2024-01-01T00:00:00Z", username="user", name="User",
+        title="Password reset", slug="password-reset", url=f"https://forum.example/t/{post_id}",
+    )
+
+
+def _new_stats():
+    return {"posts_processed": 0, "chunks_created": 0, "chunks_duplicate": 0, "errors": [], "timings": {}}
+
+
+SHARED = "open the account settings page and choose the reset option"
+POSTS = [
+    _post(1, f"<p>to reset your password you need a verified email address. {SHARED}</p>"),
+    _post(2, f"<p>{SHARED}. then follow the link that arrives in your inbox shortly</p>"),
+]
+
+
+class ContentHashDedupeTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(pipeline, "split_into_chunks", _sentence_chunks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_chunk_text_is_yielded_once(self):
+        stats = _new_stats()
+        with mock.patch.object(pipeline, "DEDUPE_CHUNKS", True):
+            chunks = list(pipeline._iter_post_chunks(POSTS, stats))
+        texts = [chunk["text"] for chunk in chunks]
+        self.assertEqual(len(texts), 3)
+        self.assertEqual(len(set(texts)), 3)
+        self.assertEqual(stats["chunks_created"], 3)
+        self.assertEqual(stats["chunks_duplicate"], 1)
+        self.assertEqual(stats["posts_processed"], 2)
+        for chunk in chunks:
+            self.assertEqual(chunk["chunk_id"], pipeline._content_id(chunk["text"]))
+
+    def test_content_ids_are_stable_across_runs(self):
+        with mock.patch.object(pipeline, "DEDUPE_CHUNKS", True):
+            first = [c["chunk_id"] for c in pipeline._iter_post_chunks(POSTS, _new_stats())]
+            second = [c["chunk_id"] for c in pipeline._iter_post_chunks(POSTS, _new_stats())]
+        self.assertEqual(first, second)
+
+    def test_parallel_batch_reports_a_failed_post_and_keeps_the_rest(self):
+        def split(text):
+            if "inbox" in text:
+                raise ValueError("tokenizer crashed")
+            return _sentence_chunks(text)
+
+        with mock.patch.object(pipeline, "split_into_chunks", split), \
+                self.assertLogs(pipeline.logger, "ERROR"):
+            results = pipeline.process_posts_parallel(POSTS)
+        (first_chunks, first_error), (second_chunks, second_error) = results
+        self.assertEqual(len(first_chunks), 2)
+        self.assertIsNone(first_error)
+        self.assertEqual(second_chunks, [])
+        self.assertIn("tokenizer crashed", second_error)
+
+    def test_dedupe_disabled_keeps_every_chunk(self):
+        stats = _new_stats()
+        with mock.patch.object(pipeline, "DEDUPE_CHUNKS", False):
+            chunks = list(pipeline._iter_post_chunks(POSTS, stats))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(stats["chunks_duplicate"], 0)
+
+
+@unittest.skipUnless(importlib.util.find_spec("faiss"), "faiss is not installed")
+class FaissStoreIdempotencyTests(unittest.TestCase):
+    def setUp(self):
+        from vectorstore.faiss_store import FaissStore
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = FaissStore(store_path=tmp.name)
+        self.store_path = tmp.name
+
+    def _add(self, ids):
+        vectors = np.random.default_rng(0).random((len(ids), 8), dtype=np.float32)
+        return self.store.add_columns(ids, [f"text {i}" for i in ids], vectors, [{} for _ in ids])
+
+    def test_existing_and_repeated_ids_are_skipped(self):
+        self.assertEqual(self._add(["a", "b", "a"])["inserted"], 2)
+        result = self._add(["b", "c"])
+        self.assertEqual((result["inserted"], result["skipped"]), (1, 1))
+        self.assertEqual(self.store.count(), 3)
+
+    def test_reloaded_store_still_skips_stored_ids(self):
+        from vectorstore.faiss_store import FaissStore
+
+        self._add(["a", "b"])
+        reloaded = FaissStore(store_path=self.store_path)
+        vectors = np.zeros((2, 8), dtype=np.float32)
+        result = reloaded.add_columns(["a", "z"], ["x", "y"], vectors, [{}, {}])
+        self.assertEqual((result["inserted"], result["skipped"]), (1, 1))
+        self.assertEqual(reloaded.count(), 3)
+
+
+class StreamPostsTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(pipeline, "FETCH_QUEUE_SIZE", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stats = {"posts_fetched": 0, "timings": {}}
+        self.fetched = 0
+
+    def _fetcher(self, count=None, error=None):
+        async def iter_discourse_posts(category=None, min_posts=None):
+            for i in itertools.count() if count is None else range(count):
+                self.fetched += 1
+                yield _post(i, "<p>post</p>")
+            if error is not None:
+                raise error
+        return mock.patch.object(pipeline, "iter_discourse_posts", iter_discourse_posts)
+
+    @staticmethod
+    def _fetch_thread_alive():
+        return any(t.name == "ingest-fetch" for t in threading.enumerate())
+
+    def test_yields_every_post(self):
+        with self._fetcher(count=7):
+            posts = list(pipeline._stream_posts(None, None, self.stats))
+        self.assertEqual([post.id for post in posts], list(range(7)))
+        self.assertEqual(self.stats["posts_fetched"], 7)
+        self.assertIn("fetch", self.stats["timings"])
+
+    def test_closing_early_stops_the_download(self):
+        with self._fetcher():
+            stream = pipeline._stream_posts(None, None, self.stats)
+            self.assertEqual([post.id for post in itertools.islice(stream, 3)], [0, 1, 2])
+            stream.close()
+        self.assertFalse(self._fetch_thread_alive())
+        # Only what fits in the bounded queue was fetched ahead of the consumer
+        self.assertLessEqual(self.fetched, 3 + pipeline.FETCH_QUEUE_SIZE + 1)
+
+    def test_fetch_error_is_raised_after_the_posts(self):
+        with self._fetcher(count=2, error=RuntimeError("discourse down")):
+            stream = pipeline._stream_posts(None, None, self.stats)
+            self.assertEqual(len([next(stream), next(stream)]), 2)
+            with self.assertRaisesRegex(RuntimeError, "discourse down"):
+                next(stream)
+        self.assertFalse(self._fetch_thread_alive())
+
+
+class _RecordingStore:
+    """Vector store stand-in that records inserted ids."""
+
+    def __init__(self):
+        self.ids = []
+
+    def add_columns(self, ids, texts, embeddings, metas):
+        self.ids.extend(ids)
+        return {"status": "ok", "inserted": len(ids)}
+
+
+def _numbered_chunks(count):
+    def iter_post_chunks(posts, stats):
+        for i in range(count):
+            yield {"chunk_id": f"c{i}", "chunk_index": 0, "text": f"chunk {i}", "_post_meta": {}}
+    return iter_post_chunks
+
+
+class StagedPipelineTests(unittest.TestCase):
+    def setUp(self):
+        for name, value in (
+            ("EMBED_BATCH_SIZE", 4),
+            ("INSERT_BATCH_SIZE", 6),
+            ("STAGE_QUEUE_SIZE", 1),
+            ("EMBED_CACHE", False),
+        ):
+            patcher = mock.patch.object(pipeline, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.store = _RecordingStore()
+        self.stats = {"chunks_inserted": 0, "errors": [], "timings": {}}
+
+    def _run(self, iter_post_chunks, embed):
+        """Run _run_stages in a thread so a deadlock fails the test instead of hanging it."""
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = pipeline._run_stages([], self.store, self.stats)
+            except BaseException as e:
+                outcome["error"] = e
+
+        with mock.patch.object(pipeline, "_iter_post_chunks", iter_post_chunks), \
+                mock.patch.object(pipeline, "embed_texts_batched", embed):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            thread.join(timeout=10)
+        self.assertFalse(thread.is_alive(), "_run_stages did not return")
+        return outcome
+
+    def test_all_chunks_are_embedded_and_inserted(self):
+        embed = lambda texts, batch_size=None: np.ones((len(texts), 8), dtype=np.float32)
+        outcome = self._run(_numbered_chunks(23), embed)
+        self.assertEqual(outcome, {"result": 23})
+        self.assertEqual(self.store.ids, [f"c{i}" for i in range(23)])
+        self.assertEqual(self.stats["chunks_inserted"], 23)
+
+    def test_insert_stage_error_is_raised(self):
+        calls = []
+
+        def embed(texts, batch_size=None):
+            # The third batch has a different width, so regrouping it for insert fails
+            calls.append(texts)
+            return np.ones((len(texts), 8 if len(calls) < 3 else 16), dtype=np.float32)
+
+        outcome = self._run(_numbered_chunks(200), embed)
+        self.assertIsInstance(outcome.get("error"), ValueError)
+
+    def test_parse_stage_error_is_raised(self):
+        def iter_post_chunks(posts, stats):
+            yield from _numbered_chunks(9)(posts, stats)
+            raise RuntimeError("parse failed")
+
+        embed = lambda texts, batch_size=None: np.ones((len(texts), 8), dtype=np.float32)
+        outcome = self._run(iter_post_chunks, embed)
+        self.assertIsInstance(outcome.get("error"), RuntimeError)
+        self.assertEqual(str(outcome["error"]), "parse failed")
+
+    def test_embed_errors_are_recorded_not_raised(self):
+        def embed(texts, batch_size=None):
+            if "chunk 0" in texts:
+                raise RuntimeError("model unavailable")
+            return np.ones((len(texts), 8), dtype=np.float32)
+
+        with self.assertLogs(pipeline.logger, "ERROR"):
+            outcome = self._run(_numbered_chunks(12), embed)
+        self.assertEqual(outcome, {"result": 8})
+        self.assertEqual(len(self.stats["errors"]), 1)
+        self.assertNotIn("c0", self.store.ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Tests for the LLM client's circuit breaker (rag.llm_client)."""
+import importlib.util
+import threading
+import unittest
+from unittest import mock
+
+from rag import llm_client
+
+HTTPX_AVAILABLE = importlib.util.find_spec("httpx") is not None
+
+
+@unittest.skipUnless(HTTPX_AVAILABLE, "httpx is not installed")
+class CircuitBreakerTests(unittest.TestCase):
+    def setUp(self):
+        import httpx
+
+        for name, value in (("LLM_BREAKER_THRESHOLD", 2), ("LLM_MAX_RETRIES", 0)):
+            patcher = mock.patch.object(llm_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # The failures below are expected; keep their warnings out of the test output
+        patcher = mock.patch.object(llm_client.logger, "disabled", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.status = 503
+        self.requests = 0
+        self.hold = None  # Event a request waits on before answering
+        self.client = llm_client.LLMClient(base_url="https://llm.example/v1", api_key="key")
+        self.client.client.close()
+        self.client.client = httpx.Client(transport=httpx.MockTransport(self._handle))
+        self.addCleanup(self.client.close)
+
+    def _handle(self, request):
+        import httpx
+
+        self.requests += 1
+        if self.hold is not None:
+            self.hold.wait(5)
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": "unavailable"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}], "model": "m"})
+
+    def _open_breaker(self):
+        for _ in range(2):
+            self.assertIn("error", self.client.generate("q"))
+        self.requests = 0
+
+    def _end_cooldown(self):
+        self.client._opened_until = 0.0
+
+    def test_open_breaker_rejects_without_calling_the_api(self):
+        self._open_breaker()
+        self.assertIn("temporarily unavailable", self.client.generate("q")["error"])
+        self.assertEqual(self.requests, 0)
+
+    def test_one_probe_at_a_time_after_the_cooldown(self):
+        self._open_breaker()
+        self._end_cooldown()
+        self.status = 200
+        self.hold = threading.Event()
+        probe_result = {}
+        probe = threading.Thread(target=lambda: probe_result.update(self.client.generate("q")))
+        probe.start()
+        try:
+            while self.requests == 0:
+                probe.join(0.01)
+            # Other callers are rejected while the probe is in flight
+            self.assertIn("temporarily unavailable", self.client.generate("q")["error"])
+            self.assertEqual(self.requests, 1)
+        finally:
+            self.hold.set()
+            probe.join(5)
+        self.assertEqual(probe_result.get("answer"), "ok")
+        self.hold = None
+        self.assertEqual(self.client.generate("q").get("answer"), "ok")
+
+    def test_failed_probe_reopens_the_breaker(self):
+        self._open_breaker()
+        self._end_cooldown()
+        self.assertIn("error", self.client.generate("q"))
+        self.assertEqual(self.requests, 1)
+        self.assertIn("temporarily unavailable", self.client.generate("q")["error"])
+        self.assertEqual(self.requests, 1)
+
+    def test_failed_stream_probe_reopens_the_breaker(self):
+        self._open_breaker()
+        self._end_cooldown()
+        with self.assertRaises(Exception):
+            next(self.client.stream("q"))
+        self.assertIsNone(self.client._breaker_admit())
+        self._end_cooldown()
+        self.status = 200
+        self.assertEqual(self.client.generate("q").get("answer"), "ok")
+
+    def test_stream_probe_closed_early_frees_the_slot(self):
+        import httpx
+
+        self._open_breaker()
+        self._end_cooldown()
+        self.client.client = httpx.Client(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text='data: {"choices": [{"delta": {"content": "o"}}]}\n\n')
+        ))
+        stream = self.client.stream("q")
+        self.assertEqual(next(stream), "o")
+        stream.close()
+        self.assertIs(self.client._breaker_admit(), True)
+
+
+if __name__ == "__main__":
+    unittest.main()
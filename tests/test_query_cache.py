@@ -0,0 +1,71 @@
+"""Tests for the persisted query-embedding cache (embeddings.embedder._QueryEmbedCache)."""
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from embeddings.embedder import _QueryEmbedCache
+
+
+class QueryCachePersistenceTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+
+    def _cache(self, **kwargs) -> _QueryEmbedCache:
+        return _QueryEmbedCache(cache_dir=self.cache_dir, **kwargs)
+
+    def test_save_then_load_round_trip(self):
+        cache = self._cache()
+        keys = [_QueryEmbedCache.make_key(q) for q in ("what is rag", "how do i ingest")]
+        vectors = [[0.1, -0.2, 0.3], [0.25, 0.5, -0.75]]
+        for key, vector in zip(keys, vectors):
+            cache.put(key, vector)
+        cache.save()
+
+        restored = self._cache()
+        restored.load()
+        self.assertEqual(restored.get_stats()["size"], 2)
+        for key, vector in zip(keys, vectors):
+            # Stored on disk as float16
+            np.testing.assert_allclose(restored.get(key), vector, atol=1e-3)
+
+    def test_make_key_normalizes_query(self):
+        self.assertEqual(_QueryEmbedCache.make_key("  What is RAG "), _QueryEmbedCache.make_key("what is rag"))
+
+    def test_load_drops_expired_entries(self):
+        cache = self._cache(ttl_seconds=60)
+        cache.put(1, [1.0, 2.0])
+        with mock.patch("embeddings.embedder.time.time", return_value=time.time() - 120):
+            cache.put(2, [3.0, 4.0])
+        cache.save()
+
+        restored = self._cache(ttl_seconds=60)
+        restored.load()
+        self.assertIsNotNone(restored.get(1))
+        self.assertIsNone(restored.get(2))
+
+    def test_load_honours_max_size(self):
+        cache = self._cache()
+        for key in range(5):
+            cache.put(key, [float(key)])
+        cache.save()
+
+        restored = self._cache(max_size=2)
+        restored.load()
+        self.assertEqual(restored.get_stats()["size"], 2)
+        # Oldest entries are evicted first
+        self.assertIsNone(restored.get(0))
+        self.assertEqual(restored.get(4), [4.0])
+
+    def test_load_without_files_is_a_no_op(self):
+        cache = self._cache()
+        cache.load()
+        self.assertEqual(cache.get_stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
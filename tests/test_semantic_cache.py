@@ -0,0 +1,78 @@
+"""Tests for rag.semantic_cache.SemanticCache."""
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from rag.semantic_cache import SemanticCache
+from schema.ask_request import AskRequest
+from schema.ask_response import AskResponse
+
+
+def _response(answer: str) -> AskResponse:
+    return AskResponse(answer=answer, sources=[], latency_ms=10.0, chunks_retrieved=1)
+
+
+class SemanticCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = SemanticCache(max_size=4, threshold=0.95, ttl_seconds=60)
+        self.vec = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+
+    def test_exact_hit_ignores_case_and_whitespace(self):
+        self.cache.put(AskRequest(query="What is RAG?"), self.vec, _response("a"))
+        hit = self.cache.get(AskRequest(query="  what is rag?  "), [0.0, 1.0, 0.0])
+        self.assertEqual(hit.answer, "a")
+        self.assertEqual(self.cache.get_stats()["exact_hits"], 1)
+
+    def test_semantic_hit_above_threshold(self):
+        self.cache.put(AskRequest(query="What is RAG?"), self.vec, _response("a"))
+        close = [0.99, 0.1, 0.0]  # cosine ~0.995
+        hit = self.cache.get(AskRequest(query="Explain RAG"), close)
+        self.assertEqual(hit.answer, "a")
+        self.assertEqual(self.cache.get_stats()["semantic_hits"], 1)
+
+    def test_semantic_miss_below_threshold(self):
+        self.cache.put(AskRequest(query="What is RAG?"), self.vec, _response("a"))
+        self.assertIsNone(self.cache.get(AskRequest(query="Who runs the club?"), [0.7, 0.7, 0.0]))
+        self.assertEqual(self.cache.get_stats()["misses"], 1)
+
+    def test_generation_params_isolate_entries(self):
+        self.cache.put(AskRequest(query="What is RAG?", top_k=5), self.vec, _response("a"))
+        # Same text and embedding, different parameters: neither tier may match
+        self.assertIsNone(self.cache.get(AskRequest(query="What is RAG?", top_k=3), self.vec))
+        self.assertIsNone(self.cache.get(AskRequest(query="What is RAG?", temperature=0.1), self.vec))
+        self.cache.put(AskRequest(query="What is RAG?", top_k=3), self.vec, _response("b"))
+        self.assertEqual(self.cache.get(AskRequest(query="What is RAG?", top_k=5), self.vec).answer, "a")
+        self.assertEqual(self.cache.get(AskRequest(query="Explain RAG", top_k=3), self.vec).answer, "b")
+
+    def test_entries_expire_after_ttl(self):
+        with mock.patch("rag.semantic_cache.time.time", return_value=1000.0):
+            self.cache.put(AskRequest(query="What is RAG?"), self.vec, _response("a"))
+        with mock.patch("rag.semantic_cache.time.time", return_value=1059.0):
+            self.assertIsNotNone(self.cache.get(AskRequest(query="What is RAG?"), self.vec))
+        with mock.patch("rag.semantic_cache.time.time", return_value=1061.0):
+            self.assertIsNone(self.cache.get(AskRequest(query="What is RAG?"), self.vec))
+            self.assertIsNone(self.cache.get(AskRequest(query="Explain RAG"), self.vec))
+        self.assertEqual(self.cache.get_stats()["size"], 0)
+
+    def test_lru_eviction_keeps_recently_used(self):
+        cache = SemanticCache(max_size=2, threshold=0.95, ttl_seconds=60)
+        vectors = np.eye(3, dtype=np.float32)
+        for i, name in enumerate("ab"):
+            cache.put(AskRequest(query=name), vectors[i], _response(name))
+        self.assertIsNotNone(cache.get(AskRequest(query="a"), vectors[0]))  # a is now most recent
+        cache.put(AskRequest(query="c"), vectors[2], _response("c"))
+        self.assertIsNone(cache.get(AskRequest(query="b"), vectors[1]))
+        self.assertEqual(cache.get(AskRequest(query="a"), vectors[0]).answer, "a")
+        self.assertEqual(cache.get(AskRequest(query="c"), vectors[2]).answer, "c")
+        self.assertEqual(cache.get_stats()["size"], 2)
+
+    def test_dimension_change_starts_over(self):
+        self.cache.put(AskRequest(query="What is RAG?"), self.vec, _response("a"))
+        self.cache.put(AskRequest(query="Other"), [1.0, 0.0], _response("b"))
+        self.assertIsNone(self.cache.get(AskRequest(query="What is RAG?"), self.vec))
+        self.assertEqual(self.cache.get(AskRequest(query="Other"), [1.0, 0.0]).answer, "b")
+
+
+if __name__ == "__main__":
+    unittest.main()
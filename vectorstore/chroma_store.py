@@ -21,10 +21,21 @@ DEFAULT_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "./data/vectorstore")
 DEFAULT_COLLECTION = os.getenv("VECTOR_STORE_COLLECTION", "discourse_posts")
 _CHROMA_DB_IMPL = os.getenv("CHROMA_DB_IMPL", "duckdb+parquet")  # recommended for local persistence
 
+# sqlite settings for one-shot bulk loads: no rollback journal or fsync, and
+# one connection holding the file lock (a crash mid-load means re-ingesting)
+_BULK_PRAGMAS = ("journal_mode=OFF", "synchronous=OFF", "temp_store=MEMORY", "locking_mode=EXCLUSIVE")
+
+def _as_list(vector: Sequence[float]) -> List[float]:
+    """Convert a list or numpy vector to a plain list of floats."""
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+
 class ChromaStore:
-    def __init__(self, persist_directory: Optional[str] = None, collection_name: Optional[str] = None):
+    def __init__(self, persist_directory: Optional[str] = None, collection_name: Optional[str] = None,
+                 bulk_mode: bool = False):
         """
         Initialize Chroma client and collection. Raises ImportError if chromadb isn't installed.
+        With bulk_mode=True, adds skip the per-call client.persist(); call persist() at the end.
         """
         try:
             import chromadb
@@ -76,6 +87,7 @@ class ChromaStore:
 
         self.persist_directory = persist_directory
         self.collection_name = collection_name
+        self.bulk_mode = bulk_mode
         logger.info("ChromaStore initialized: collection=%s persist_directory=%s", collection_name, persist_directory)
 
     def _validate_docs(self, docs: List[Dict[str, Any]]):
@@ -96,10 +108,48 @@ class ChromaStore:
           - meta (dict) optional
         """
         self._validate_docs(docs)
-        ids = [d["chunk_id"] for d in docs]
-        documents = [d.get("text", "") for d in docs]
-        metadatas = [d.get("meta", {}) for d in docs]
-        embeddings = [list(d["embedding"]) for d in docs]
+        return self.add_columns(
+            [d["chunk_id"] for d in docs],
+            [d.get("text", "") for d in docs],
+            [d["embedding"] for d in docs],
+            [d.get("meta", {}) for d in docs]
+        )
+
+    def add_columns(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: Any,
+        metadatas: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Add a columnar batch: parallel id/document/metadata lists and an
+        (N, D) embedding matrix (or a sequence of vectors).
+
+        Ids already in the collection (or repeated within the batch) are
+        skipped, so re-adding content-hash ids does not duplicate them; use
+        upsert_documents to replace them.
+        """
+        if not (len(ids) == len(documents) == len(metadatas) == len(embeddings)):
+            raise ValueError("ids, documents, embeddings and metadatas must have the same length")
+        # One tolist() for the whole matrix instead of one per vector
+        embeddings = embeddings.tolist() if hasattr(embeddings, "tolist") else [_as_list(e) for e in embeddings]
+
+        existing = self._existing_ids(ids)
+        keep = []
+        for i, cid in enumerate(ids):
+            if cid not in existing:
+                existing.add(cid)
+                keep.append(i)
+        skipped = len(ids) - len(keep)
+        if skipped:
+            logger.debug("Skipping %d chunk ids already in the collection", skipped)
+            if not keep:
+                return {"status": "ok", "inserted": 0, "skipped": skipped}
+            ids = [ids[i] for i in keep]
+            documents = [documents[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            embeddings = [embeddings[i] for i in keep]
 
         try:
             self._collection.add(
@@ -109,38 +159,56 @@ class ChromaStore:
                 embeddings=embeddings
             )
             # attempt persist (no-op if client does it automatically)
-            try:
-                self._client.persist()
-            except Exception:
-                # not fatal
-                pass
-            return {"status": "ok", "inserted": len(ids)}
+            if not self.bulk_mode:
+                try:
+                    self._client.persist()
+                except Exception:
+                    # not fatal
+                    pass
+            return {"status": "ok", "inserted": len(ids), "skipped": skipped}
         except Exception as e:
-            logger.exception("Chroma add_documents failed: %s", e)
+            logger.exception("Chroma add failed: %s", e)
             raise
 
+    def _existing_ids(self, ids: List[str]) -> set:
+        """Subset of ids already stored in the collection (empty if the lookup fails)."""
+        try:
+            return set(self._collection.get(ids=list(ids), include=[]).get("ids", []))
+        except Exception:
+            logger.debug("Chroma id lookup failed; adding without the existing-id check", exc_info=True)
+            return set()
+
     def upsert_documents(self, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Upsert semantics: if id exists, update; else insert.
         Chroma client does not have a single upsert method in all versions;
-        using add (which may error on existing ids) + delete+add fallback.
+        clients without one get delete + add.
         """
         self._validate_docs(docs)
         ids = [d["chunk_id"] for d in docs]
+        upsert = getattr(self._collection, "upsert", None)
+        if upsert is not None:
+            upsert(
+                ids=ids,
+                documents=[d.get("text", "") for d in docs],
+                metadatas=[d.get("meta", {}) for d in docs],
+                embeddings=[_as_list(d["embedding"]) for d in docs]
+            )
+            if not self.bulk_mode:
+                try:
+                    self._client.persist()
+                except Exception:
+                    pass
+            return {"status": "ok", "upserted": len(ids)}
         try:
-            # try simple add; if it fails due to duplicates, fallback to delete+add
-            return self.add_documents(docs)
+            self.delete(ids)
         except Exception:
-            logger.warning("Chroma add failed; attempting delete+add for upsert")
-            try:
-                self.delete(ids)
-            except Exception:
-                logger.exception("delete during upsert failed; continuing with add")
-            return self.add_documents(docs)
+            logger.exception("delete during upsert failed; continuing with add")
+        return self.add_documents(docs)
 
-    def search(self, query_vector: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def search(self, query_vector: Sequence[float], top_k: int = 5, min_similarity: float = 0.0) -> List[Dict[str, Any]]:
         """
-        Query by embedding. Returns list of hits:
+        Query by embedding. Returns list of hits (nearest first, score >= min_similarity):
         [
             {"chunk_id": id, "score": similarity_score (0..1), "text": doc, "meta": metadata}
         ]
@@ -150,7 +218,7 @@ class ChromaStore:
         if not hasattr(self, "_collection"):
             raise RuntimeError("Chroma collection not initialized")
         try:
-            results = self._collection.query(query_embeddings=[list(query_vector)], n_results=top_k)
+            results = self._collection.query(query_embeddings=[_as_list(query_vector)], n_results=top_k)
             ids = results.get("ids", [[]])[0]
             metadatas = results.get("metadatas", [[]])[0]
             documents = results.get("documents", [[]])[0]
@@ -165,6 +233,8 @@ class ChromaStore:
                         score = 1.0 / (1.0 + float(dist))
                     except Exception:
                         score = 0.0
+                if score < min_similarity:
+                    continue
                 hits.append({"chunk_id": cid, "score": float(score), "text": doc, "meta": meta})
             return hits
         except Exception as e:
@@ -212,6 +282,60 @@ class ChromaStore:
             logger.exception("Chroma clear failed: %s", e)
             raise
 
+    def _sqlite_connection(self) -> Any:
+        """
+        Best-effort access to the sqlite connection behind the collection.
+        Relies on chromadb internals, so returns None when they differ.
+        """
+        for owner in (self._client, getattr(self._client, "_server", None)):
+            pool = getattr(getattr(owner, "_sysdb", None), "_conn_pool", None)
+            if pool is not None:
+                try:
+                    return pool.connect()
+                except Exception:
+                    logger.debug("Could not get Chroma sqlite connection", exc_info=True)
+                    return None
+        return None
+
+    def tune_for_bulk_load(self) -> bool:
+        """
+        Apply bulk-load PRAGMAs to this thread's sqlite connection.
+        Returns True if applied; undo with restore_after_bulk_load().
+        """
+        conn = self._sqlite_connection()
+        if conn is None:
+            return False
+        try:
+            row = conn.execute("PRAGMA journal_mode").fetchone()
+            self._saved_journal_mode = row[0] if row else "delete"
+            for pragma in _BULK_PRAGMAS:
+                conn.execute(f"PRAGMA {pragma}")
+            logger.info("Applied sqlite bulk-load PRAGMAs to Chroma")
+            return True
+        except Exception as e:
+            logger.warning("Could not apply sqlite bulk-load PRAGMAs: %s", e)
+            return False
+
+    def restore_after_bulk_load(self) -> None:
+        """
+        Restore normal durability after tune_for_bulk_load().
+        """
+        conn = self._sqlite_connection()
+        if conn is None:
+            return
+        try:
+            conn.execute("PRAGMA locking_mode=NORMAL")
+            conn.execute(f"PRAGMA journal_mode={getattr(self, '_saved_journal_mode', 'delete')}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except Exception as e:
+            logger.warning("Could not restore sqlite PRAGMAs: %s", e)
+
+    def count(self) -> int:
+        """
+        Number of stored chunks (cheap; does not fetch documents).
+        """
+        return self._collection.count()
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Return basic stats: count, dimension (if known), path info.
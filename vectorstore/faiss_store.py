@@ -5,7 +5,8 @@ FAISS-backed vector store implementation with JSON metadata persistence.
 Requirements:
     pip install faiss-cpu numpy
 
-This implementation keeps a FAISS IndexFlatL2 in memory and persists:
+This implementation keeps a FAISS IndexFlatL2 in memory (or a scalar-quantized
+fp16/int8 flat L2 index with FAISS_QUANTIZATION) and persists:
     - the FAISS index file at <store_path>/faiss_index.index
     - metadata mapping file at <store_path>/faiss_meta.json
 
@@ -29,9 +30,13 @@ logger = logging.getLogger(__name__)
 DEFAULT_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "./data/vectorstore")
 META_FILENAME = "faiss_meta.json"
 INDEX_FILENAME = "faiss_index.index"
+# Vector storage for new indexes: "none" (float32), "fp16" (half the bytes) or
+# "int8" (a quarter; ranges trained on the first batch). Existing index files
+# keep the type they were written with.
+FAISS_QUANTIZATION = os.getenv("FAISS_QUANTIZATION", "none").lower()
 
 class FaissStore:
-    def __init__(self, store_path: Optional[str] = None):
+    def __init__(self, store_path: Optional[str] = None, bulk_mode: bool = False):
         try:
             import faiss
             import numpy as np
@@ -48,8 +53,13 @@ class FaissStore:
 
         self.index = None  # faiss.Index
         self.dim = None
+        # bulk_mode: keep inserts in memory until persist() instead of rewriting
+        # the index and meta files on every insert (O(N^2) over a bulk load)
+        self.bulk_mode = bulk_mode
         # meta mapping: idx (int) -> {"chunk_id":..., "meta":..., "text":...}
         self.meta: Dict[str, Dict[str, Any]] = {}
+        # chunk_ids present in the index, so adds can skip ones already stored
+        self._ids: set = set()
         self._load_index_and_meta()
         logger.info("FaissStore initialized at %s", str(self.store_path))
 
@@ -64,6 +74,7 @@ class FaissStore:
                 self.meta = {}
         else:
             self.meta = {}
+        self._ids = {rec["chunk_id"] for rec in self.meta.values()}
 
         # load index if available
         if self.index_path.exists():
@@ -75,6 +86,18 @@ class FaissStore:
                 logger.exception("Failed to load faiss index; starting fresh")
                 self.index = None
 
+    def _new_index(self, dim: int, train_vecs: Any) -> Any:
+        """Create an empty L2 index for dim-sized vectors, quantized per FAISS_QUANTIZATION."""
+        if FAISS_QUANTIZATION == "fp16":
+            index = self.faiss.IndexScalarQuantizer(dim, self.faiss.ScalarQuantizer.QT_fp16, self.faiss.METRIC_L2)
+        elif FAISS_QUANTIZATION == "int8":
+            index = self.faiss.IndexScalarQuantizer(dim, self.faiss.ScalarQuantizer.QT_8bit, self.faiss.METRIC_L2)
+        else:
+            return self.faiss.IndexFlatL2(dim)
+        if not index.is_trained:
+            index.train(train_vecs)
+        return index
+
     def _save_index_and_meta(self):
         if self.index is not None:
             try:
@@ -99,12 +122,51 @@ class FaissStore:
         Append vectors to the FAISS index. chunk_id -> new internal numeric id.
         """
         self._validate_docs(docs)
+        return self.add_columns(
+            [d["chunk_id"] for d in docs],
+            [d.get("text", "") for d in docs],
+            [d["embedding"] for d in docs],
+            [d.get("meta", {}) for d in docs]
+        )
+
+    def add_columns(
+        self,
+        ids: List[str],
+        texts: List[str],
+        embeddings: Any,
+        metas: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Append a columnar batch: parallel id/text/meta lists and an (N, D)
+        embedding matrix (or a sequence of vectors).
+
+        Ids already in the index (or repeated within the batch) are skipped,
+        so re-adding content-hash ids does not duplicate vectors; use
+        upsert_documents to replace them.
+        """
+        if not (len(ids) == len(texts) == len(metas) == len(embeddings)):
+            raise ValueError("ids, texts, embeddings and metas must have the same length")
         # prepare array
-        vecs = self.np.array([list(d["embedding"]) for d in docs], dtype="float32")
+        vecs = self.np.asarray(embeddings, dtype="float32")
+        keep = []
+        seen = set()
+        for i, cid in enumerate(ids):
+            if cid not in self._ids and cid not in seen:
+                seen.add(cid)
+                keep.append(i)
+        skipped = len(ids) - len(keep)
+        if skipped:
+            logger.debug("Skipping %d chunk ids already in the index", skipped)
+            if not keep:
+                return {"status": "ok", "inserted": 0, "skipped": skipped}
+            vecs = vecs[keep]
+            ids = [ids[i] for i in keep]
+            texts = [texts[i] for i in keep]
+            metas = [metas[i] for i in keep]
         n, dim = vecs.shape
         if self.index is None:
             # create flat L2 index
-            self.index = self.faiss.IndexFlatL2(dim)
+            self.index = self._new_index(dim, vecs)
             self.dim = dim
         elif dim != self.dim:
             raise ValueError(f"Dimension mismatch: index dim {self.dim}, docs dim {dim}")
@@ -112,11 +174,13 @@ class FaissStore:
         start_idx = len(self.meta)
         self.index.add(vecs)
         # update meta mapping for new indices
-        for i, d in enumerate(docs):
+        for i, (cid, text, meta) in enumerate(zip(ids, texts, metas)):
             idx = start_idx + i
-            self.meta[str(idx)] = {"chunk_id": d["chunk_id"], "meta": d.get("meta", {}), "text": d.get("text", "")}
-        self._save_index_and_meta()
-        return {"status": "ok", "inserted": n}
+            self.meta[str(idx)] = {"chunk_id": cid, "meta": meta, "text": text}
+        self._ids.update(ids)
+        if not self.bulk_mode:
+            self._save_index_and_meta()
+        return {"status": "ok", "inserted": n, "skipped": skipped}
 
     def upsert_documents(self, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -168,7 +232,7 @@ class FaissStore:
                         raise ValueError("Cannot rebuild index: missing embedding for existing chunk_id " + rec["chunk_id"])
             # rebuild index
             vecs_np = self.np.array(vectors, dtype="float32")
-            self.index = self.faiss.IndexFlatL2(vecs_np.shape[1])
+            self.index = self._new_index(vecs_np.shape[1], vecs_np)
             self.index.add(vecs_np)
             # rebuild meta mapping
             new_meta = {}
@@ -182,25 +246,31 @@ class FaissStore:
                 start = len(self.meta)
                 for i, d in enumerate(new_docs):
                     self.meta[str(start + i)] = {"chunk_id": d["chunk_id"], "meta": d.get("meta", {}), "text": d.get("text", "")}
-            self._save_index_and_meta()
+            self._ids = {rec["chunk_id"] for rec in self.meta.values()}
+            if not self.bulk_mode:
+                self._save_index_and_meta()
             return {"status": "ok", "upserted": len(docs)}
         else:
             # just append new docs
             return self.add_documents(new_docs)
 
-    def search(self, query_vector: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def search(self, query_vector: Sequence[float], top_k: int = 5, min_similarity: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Return up to top_k hits with score >= min_similarity, best first.
+        """
         if self.index is None:
             return []
-        q = self.np.array([list(query_vector)], dtype="float32")
+        q = self.np.asarray(query_vector, dtype="float32").reshape(1, -1)
         D, I = self.index.search(q, top_k)
+        dists, idxs = D[0], I[0]
+        # convert L2 distances to a heuristic similarity, all hits at once
+        scores = self.np.where(dists >= 0, 1.0 / (1.0 + self.np.maximum(dists, 0)), 0.0)
+        # drop padding (-1) ids and hits below min_similarity; order stays nearest first
+        keep = self.np.flatnonzero((idxs >= 0) & (scores >= min_similarity))
         hits = []
-        for dist, idx in zip(D[0], I[0]):
-            if idx < 0:
-                continue
-            rec = self.meta.get(str(int(idx)), {})
-            # convert L2 distance to a heuristic similarity
-            score = 1.0 / (1.0 + float(dist)) if float(dist) >= 0 else 0.0
-            hits.append({"chunk_id": rec.get("chunk_id"), "score": float(score), "text": rec.get("text"), "meta": rec.get("meta")})
+        for idx, score in zip(idxs[keep].tolist(), scores[keep].tolist()):
+            rec = self.meta.get(str(idx), {})
+            hits.append({"chunk_id": rec.get("chunk_id"), "score": score, "text": rec.get("text"), "meta": rec.get("meta")})
         return hits
 
     def delete(self, ids: List[str]) -> Dict[str, Any]:
@@ -219,6 +289,7 @@ class FaissStore:
             # delete all
             self.index = None
             self.meta = {}
+            self._ids = set()
             # remove persisted files
             try:
                 if self.index_path.exists():
@@ -248,8 +319,12 @@ class FaissStore:
             logger.exception("Failed to remove persisted faiss files")
         self.index = None
         self.meta = {}
+        self._ids = set()
         self.dim = None
 
+    def count(self) -> int:
+        return len(self.meta)
+
     def get_stats(self) -> Dict[str, Any]:
         return {"store_type": "faiss", "store_path": str(self.store_path), "count": len(self.meta), "dim": self.dim}
 
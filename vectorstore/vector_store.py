@@ -12,17 +12,21 @@ Usage:
 from __future__ import annotations
 import os
 import logging
+import dataclasses
 from typing import List, Dict, Any, Sequence, Optional
 
 logger = logging.getLogger(__name__)
 
 _STORE_TYPE = os.getenv("VECTOR_STORE_TYPE", "chroma").lower()
 
-def get_vector_store(store_type: Optional[str] = None, **kwargs) -> Any:
+def get_vector_store(store_type: Optional[str] = None, bulk_mode: bool = False, **kwargs) -> Any:
     """
     Factory that returns a store instance based on configuration or explicit store_type arg.
+    With bulk_mode=True inserts are only written to disk by persist() (call it once
+    after a bulk load) instead of on every insert.
     Additional kwargs forwarded to the backend constructors.
     """
+    kwargs["bulk_mode"] = bulk_mode
     st = (store_type or _STORE_TYPE).lower()
     if st == "chroma":
         try:
@@ -62,30 +66,36 @@ def get_default_store() -> Any:
     return _store_instance
 
 
-def insert_chunks(store: Any, chunk_schemas: List[Any]) -> Dict[str, Any]:
+def insert_chunks(store: Any, chunk_schemas: List[Any], post_table: Optional[Any] = None) -> Dict[str, Any]:
     """
-    Insert ChunkSchema objects into vector store.
+    Insert ChunkRecord / ChunkSchema objects into vector store.
     
-    This is a convenience wrapper that converts ChunkSchema objects
+    This is a convenience wrapper that converts chunk objects
     to the format expected by add_documents.
     
     Args:
         store: Vector store instance (ChromaStore or FaissStore)
-        chunk_schemas: List of ChunkSchema objects
+        chunk_schemas: List of ChunkRecord or ChunkSchema objects (or dicts)
+        post_table: PostMetaTable that ChunkRecords with a post_ref point
+            into (see embed_chunks); their meta is joined from it here
         
     Returns:
         Dict with status and inserted count
     """
     if not chunk_schemas:
         return {"status": "ok", "inserted": 0}
+    import numpy as np
     
-    # Convert ChunkSchema to dict format expected by store
-    docs = []
+    # Convert chunk objects to columns
+    chunk_ids, texts, embeddings, metas = [], [], [], []
     for chunk_schema in chunk_schemas:
-        # Handle both ChunkSchema objects and dicts
-        if hasattr(chunk_schema, 'dict'):
+        # Handle ChunkRecord/ChunkSchema objects and dicts
+        if dataclasses.is_dataclass(chunk_schema):
+            # Slotted dataclass: no __dict__, and asdict() would deep-copy
+            doc = {f.name: getattr(chunk_schema, f.name) for f in dataclasses.fields(chunk_schema)}
+        elif hasattr(chunk_schema, 'model_dump'):
             # Pydantic model
-            doc = chunk_schema.dict()
+            doc = chunk_schema.model_dump()
         elif hasattr(chunk_schema, '__dict__'):
             # Object with __dict__
             doc = chunk_schema.__dict__
@@ -93,12 +103,61 @@ def insert_chunks(store: Any, chunk_schemas: List[Any]) -> Dict[str, Any]:
             # Already a dict
             doc = chunk_schema
         
-        docs.append({
-            "chunk_id": doc.get("chunk_id"),
-            "text": doc.get("text", ""),
-            "embedding": doc.get("embedding", []),
-            "meta": doc.get("meta", {})
-        })
+        embedding = doc.get("embedding", [])
+        if doc.get("embedding_int8"):
+            # int8 embedding with a per-vector scale
+            embedding = np.frombuffer(doc["embedding_int8"], dtype=np.int8) * np.float32(doc["embedding_scale"])
+        
+        chunk_ids.append(doc.get("chunk_id"))
+        texts.append(doc.get("text", ""))
+        embeddings.append(embedding)
+        if post_table is not None and doc.get("post_ref") is not None:
+            metas.append(post_table.chunk_meta(doc["post_ref"], doc.get("chunk_index", 0)))
+        else:
+            metas.append(doc.get("meta", {}))
+    
+    # One (N, D) float32 matrix for the store (ndarray rows from embed_chunks
+    # are stacked in C); ragged input is passed through for the store to reject
+    try:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+    except ValueError:
+        pass
+    return insert_columns(store, chunk_ids, texts, embeddings, metas)
+
+
+def insert_columns(
+    store: Any,
+    chunk_ids: List[str],
+    texts: List[str],
+    embeddings: Any,
+    metas: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Insert one columnar batch into vector store.
+    
+    Takes parallel lists plus an (N, D) embedding matrix, skipping the
+    per-chunk ChunkSchema/dict round trip of insert_chunks. Stores without
+    add_columns receive the equivalent documents through add_documents.
+    
+    Args:
+        store: Vector store instance (ChromaStore or FaissStore)
+        chunk_ids: Chunk ids
+        texts: Chunk texts
+        embeddings: (N, D) array (any float dtype) or sequence of vectors
+        metas: Metadata dict per chunk
+        
+    Returns:
+        Dict with status and inserted count
+    """
+    if not chunk_ids:
+        return {"status": "ok", "inserted": 0}
+    
+    add_columns = getattr(store, "add_columns", None)
+    if add_columns is not None:
+        return add_columns(chunk_ids, texts, embeddings, metas)
     
-    # Use add_documents method
+    docs = [
+        {"chunk_id": cid, "text": text, "embedding": embedding, "meta": meta}
+        for cid, text, embedding, meta in zip(chunk_ids, texts, embeddings, metas)
+    ]
     return store.add_documents(docs)
\ No newline at end of file